@@ -11,10 +11,13 @@ project_root = Path(__file__).parent
 os.chdir(project_root)
 sys.path.insert(0, str(project_root / 'src'))
 
-try:
-    from src.main import cli
-    cli()
-except ImportError as e:
-    print(f"Import error: {e}")
-    print("Make sure you're running from the project root directory.")
-    sys.exit(1)
\ No newline at end of file
+# guarded so spawned worker processes (setup --workers) can import this
+# file as their main module without re-running the CLI
+if __name__ == "__main__":
+    try:
+        from src.main import cli
+        cli()
+    except ImportError as e:
+        print(f"Import error: {e}")
+        print("Make sure you're running from the project root directory.")
+        sys.exit(1)
\ No newline at end of file
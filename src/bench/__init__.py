@@ -0,0 +1 @@
+# Benchmark scenarios and reporting
@@ -0,0 +1,211 @@
+"""
+hnsw parameter sweep - recall against exact ground truth versus latency,
+build time and index memory
+"""
+import json
+import shutil
+import tempfile
+import time
+import click
+import numpy as np
+from src.core.config import RedisConfig
+from src.core.embeddings import vectors_to_storage
+from src.data.indexer import vector_field_args, wait_for_indexing, _drop_index_if_exists
+from src.search.flat_index import FlatIndex
+from src.search.vector import parse_search_results, exclude_keys
+from src.utils.metrics import latency_summary
+
+DEFAULT_M = (8, 16, 32)
+DEFAULT_EF_CONSTRUCTION = (100, 200)
+DEFAULT_EF_RUNTIME = (10, 20, 50, 100)
+
+SWEEP_INDEX_PREFIX = "idx:sweep:"
+
+# FT.INFO fields holding vector index memory, the first one present wins
+MEMORY_FIELDS = ('vector_index_sz_mb', 'total_index_memory_sz_mb')
+
+
+def run_hnsw_sweep(m_values=DEFAULT_M, ef_construction_values=DEFAULT_EF_CONSTRUCTION,
+                   ef_runtime_values=DEFAULT_EF_RUNTIME, k=10, queries=200, seed=42,
+                   include_flat=True, timeout=600):
+    """
+    build a temporary vector index per setting and measure it, returns a json-ready report
+
+    query vectors are a seeded sample of the stored movie vectors. each
+    movie is left out of its own results, so recall@k is not inflated by
+    the trivial self match. EF_RUNTIME is a query-time setting and is swept
+    without rebuilding
+    """
+    config = RedisConfig()
+    text_client = config.get_text_client()
+    binary_client = config.get_binary_client()
+    workdir = tempfile.mkdtemp(prefix='hnsw-sweep-')
+
+    try:
+        click.echo("Computing exact ground truth...", err=True)
+        flat_index = FlatIndex.build_from_redis(binary_client, workdir, config.embedding_model, config.vector_type)
+        rows = np.random.default_rng(seed).choice(len(flat_index), size=min(queries, len(flat_index)), replace=False)
+        query_vectors = np.ascontiguousarray(flat_index.vectors[np.sort(rows)], dtype=np.float32)
+        seeds = [str(flat_index.keys[row]) for row in np.sort(rows)]
+        truth = [
+            {key.decode('utf-8') for key, _, _ in exclude_keys(result, [seed_key], k)}
+            for seed_key, result in zip(seeds, flat_index.search(query_vectors, k + 1))
+        ]
+        query_blobs = [row.tobytes() for row in vectors_to_storage(query_vectors, config.vector_type)]
+        workload = list(zip(query_blobs, seeds, truth))
+
+        settings = [('FLAT', {}, [None])] if include_flat else []
+        settings += [
+            ('HNSW', {'M': m, 'EF_CONSTRUCTION': ef_construction}, list(ef_runtime_values))
+            for m in m_values for ef_construction in ef_construction_values
+        ]
+
+        results = []
+        for algorithm, params, runtimes in settings:
+            click.echo(f"Building {' '.join([algorithm] + _params_label(params))}...", err=True)
+            results.extend(_sweep_setting(text_client, binary_client, flat_index.dimension, config.vector_type,
+                                          algorithm, params, runtimes, workload, k, timeout))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    _mark_pareto(results)
+    return {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'redis_host': f"{config.host}:{config.port}",
+            'movies': len(flat_index),
+            'dimension': flat_index.dimension,
+            'vector_type': config.vector_type,
+            'queries': len(workload),
+            'k': k,
+            'seed': seed,
+        },
+        'results': results,
+    }
+
+
+def display_sweep_table(report):
+    """
+    print results sorted by recall, pareto-optimal rows marked with *
+    """
+    k = report['meta']['k']
+    click.echo(f"\n{report['meta']['movies']} movies, {report['meta']['queries']} queries, "
+               f"{report['meta']['dimension']}D {report['meta']['vector_type']}, recall@{k}")
+    header = (f"{'':1} {'index':5} {'M':>4} {'EF_C':>5} {'EF_RT':>5} {'build s':>8} {'mem MB':>7} "
+              f"{'p50 ms':>7} {'p95 ms':>7} {'p99 ms':>7} {'recall':>7}")
+    click.echo(header)
+    click.echo("-" * len(header))
+    for row in sorted(report['results'], key=lambda row: (-row['recall'], row['p95_ms'])):
+        click.echo(
+            f"{'*' if row['pareto'] else ' ':1} {row['algorithm']:5} {_cell(row.get('M')):>4} "
+            f"{_cell(row.get('EF_CONSTRUCTION')):>5} {_cell(row.get('EF_RUNTIME')):>5} "
+            f"{row['build_seconds']:8.2f} {_cell(row['memory_mb'], '.2f'):>7} "
+            f"{row['p50_ms']:7.2f} {row['p95_ms']:7.2f} {row['p99_ms']:7.2f} {row['recall']:7.3f}"
+        )
+    click.echo("\n* pareto-optimal: no other setting has both higher recall and lower p95 latency")
+
+
+def write_sweep_report(report, output):
+    """
+    write the report as indented json
+    """
+    output.write(json.dumps(report, indent=2) + "\n")
+
+
+def _sweep_setting(text_client, binary_client, dimension, vector_type, algorithm, params, runtimes, workload, k, timeout):
+    """
+    build one index, then time every query once per EF_RUNTIME value
+    """
+    index_name = SWEEP_INDEX_PREFIX + algorithm.lower() + ''.join(f"_{value}" for value in params.values())
+    _drop_index_if_exists(text_client, index_name)
+
+    try:
+        start = time.perf_counter()
+        text_client.execute_command(
+            "FT.CREATE", index_name, "ON", "HASH", "PREFIX", "1", "movie:",
+            "SCHEMA", *vector_field_args(dimension, algorithm, params, vector_type)
+        )
+        info = wait_for_indexing(text_client, index_name, timeout)
+        build_seconds = time.perf_counter() - start
+        memory_mb = _index_memory_mb(info)
+
+        results = []
+        for ef_runtime in runtimes:
+            latencies = []
+            hits = 0
+            run_start = time.perf_counter()
+            for query_bytes, seed_key, expected in workload:
+                query_start = time.perf_counter()
+                reply = binary_client.execute_command(*_knn_command(index_name, query_bytes, k + 1, ef_runtime))
+                latencies.append(time.perf_counter() - query_start)
+                found = exclude_keys(parse_search_results(reply), [seed_key], k)
+                hits += len({key.decode('utf-8') for key, _, _ in found} & expected)
+
+            row = {'algorithm': algorithm, **params}
+            if ef_runtime is not None:
+                row['EF_RUNTIME'] = ef_runtime
+            row.update(latency_summary(latencies, time.perf_counter() - run_start))
+            row['build_seconds'] = round(build_seconds, 3)
+            row['memory_mb'] = memory_mb
+            row['recall'] = round(hits / (k * len(workload)), 4) if workload else 0.0
+            results.append(row)
+        return results
+    finally:
+        # never DD - the movie hashes belong to the real indexes
+        _drop_index_if_exists(text_client, index_name)
+
+
+def _knn_command(index_name, query_bytes, k, ef_runtime=None):
+    """
+    FT.SEARCH arguments for a pure KNN query returning keys and scores only
+    """
+    ef_clause = f" EF_RUNTIME {ef_runtime}" if ef_runtime is not None else ""
+    return (
+        "FT.SEARCH", index_name,
+        f"*=>[KNN {k} @plot_embedding $query_vec{ef_clause} AS score]",
+        "PARAMS", "2", "query_vec", query_bytes,
+        "RETURN", "1", "score",
+        "SORTBY", "score",
+        "LIMIT", "0", str(k),
+        "DIALECT", "2"
+    )
+
+
+def _index_memory_mb(info):
+    """
+    vector index memory reported by FT.INFO, None when the server does not report it
+    """
+    for field in MEMORY_FIELDS:
+        if field in info:
+            value = info[field]
+            try:
+                return round(float(value.decode('utf-8') if isinstance(value, bytes) else value), 3)
+            except (TypeError, ValueError):
+                continue
+    return None
+
+
+def _mark_pareto(results):
+    """
+    flag rows that no other row beats on recall and p95 latency at once
+    """
+    for row in results:
+        row['pareto'] = not any(
+            other['recall'] >= row['recall'] and other['p95_ms'] <= row['p95_ms']
+            and (other['recall'] > row['recall'] or other['p95_ms'] < row['p95_ms'])
+            for other in results
+        )
+
+
+def _params_label(params):
+    """
+    M=16 EF_CONSTRUCTION=200 style labels for progress output
+    """
+    return [f"{name}={value}" for name, value in params.items()]
+
+
+def _cell(value, spec=''):
+    """
+    table cell, '-' for settings that do not apply
+    """
+    return '-' if value is None else format(value, spec)
@@ -0,0 +1,202 @@
+"""
+index layout comparison - the two-index layout against the lean combined
+index, measured on a scratch copy of the movies
+"""
+import json
+import time
+import click
+from src.core.config import RedisConfig
+from src.core.embeddings import embedding_dimension
+from src.core.indexes import MOVIE_INDEX, MOVIE_VECTOR_INDEX, LEAN_MOVIE_INDEX, INDEX_LAYOUTS, get_vector_profile
+from src.data.indexer import index_create_args, vector_field_args, wait_for_indexing, index_info, _drop_index_if_exists
+from src.data.loader import _get_all_movie_keys, _chunk_keys
+
+LAYOUT_PREFIX = "layout:"  # scratch copies live under layout:movie:N, outside every real index
+LAYOUT_INDEX_PREFIX = "idx:layout:"
+WRITE_CHUNK_SIZE = 500  # movies per pipeline when copying
+
+# FT.INFO memory fields summed per index when total_index_memory_sz_mb is not reported
+MEMORY_FIELDS = (
+    'inverted_sz_mb', 'offset_vectors_sz_mb', 'doc_table_size_mb', 'sortable_values_size_mb',
+    'key_table_size_mb', 'tag_overhead_sz_mb', 'text_overhead_sz_mb', 'vector_index_sz_mb',
+)
+
+
+def run_layout_comparison(sample=None, timeout=600):
+    """
+    build each layout over a scratch copy of the movies, returns a json-ready report
+
+    ingest is the time to write every movie with the layout's indexes in
+    place, so it includes synchronous indexing of each write. rebuild is the
+    time for FT.CREATE to scan the already written copies
+    """
+    config = RedisConfig()
+    text_client = config.get_text_client()
+    binary_client = config.get_binary_client()
+    profile = get_vector_profile(config.vector_profile)
+    dimension = embedding_dimension(config.embedding_model, config.embedding_dim)
+
+    keys = sorted(_get_all_movie_keys(text_client))[:sample]
+    if not keys:
+        raise RuntimeError("no movie:* keys found - run setup first")
+    movies = _read_movies(binary_client, keys)
+
+    results = []
+    for layout in INDEX_LAYOUTS:
+        click.echo(f"Measuring {layout} layout...", err=True)
+        results.append(_measure_layout(text_client, binary_client, layout, movies, profile, dimension, timeout))
+
+    return {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'redis_host': f"{config.host}:{config.port}",
+            'movies': len(movies),
+            'vector_profile': config.vector_profile,
+        },
+        'results': results,
+    }
+
+
+def display_layout_table(report):
+    """
+    print one row per layout and the lean layout's savings
+    """
+    click.echo(f"\n{report['meta']['movies']} movies, vector profile {report['meta']['vector_profile']}")
+    header = (f"{'layout':9} {'indexes':>7} {'ingest s':>9} {'docs/s':>9} {'rebuild s':>10} "
+              f"{'text MB':>8} {'vector MB':>10} {'total MB':>9}")
+    click.echo(header)
+    click.echo("-" * len(header))
+    for row in report['results']:
+        click.echo(
+            f"{row['layout']:9} {row['indexes']:>7} {row['ingest_seconds']:9.2f} {row['ingest_per_second']:9.1f} "
+            f"{row['rebuild_seconds']:10.2f} {row['text_memory_mb']:8.2f} {row['vector_memory_mb']:10.2f} "
+            f"{row['memory_mb']:9.2f}"
+        )
+
+    rows = {row['layout']: row for row in report['results']}
+    if 'separate' in rows and 'lean' in rows and rows['separate']['memory_mb'] and rows['separate']['ingest_seconds']:
+        separate, lean = rows['separate'], rows['lean']
+        click.echo(f"\nlean saves {1 - lean['memory_mb'] / separate['memory_mb']:.0%} index memory and "
+                   f"{1 - lean['ingest_seconds'] / separate['ingest_seconds']:.0%} ingest time")
+
+
+def write_layout_report(report, output):
+    """
+    write the report as indented json
+    """
+    output.write(json.dumps(report, indent=2) + "\n")
+
+
+def _layout_indexes(layout, profile, dimension):
+    """
+    (suffix, FT.CREATE arguments) of every movie index a layout maintains
+    """
+    prefixes = [LAYOUT_PREFIX + prefix for prefix in MOVIE_INDEX["prefix"]]
+    vector_args = vector_field_args(dimension, profile["algorithm"], profile["params"], profile["type"],
+                                    profile["metric"], MOVIE_VECTOR_INDEX["vector_field"])
+    if layout == "lean":
+        return [("lean", index_create_args(LEAN_MOVIE_INDEX, vector_args, prefixes))]
+    return [
+        ("movies", index_create_args(MOVIE_INDEX, prefixes=prefixes)),
+        ("movies_vector", index_create_args(MOVIE_VECTOR_INDEX, vector_args, prefixes)),
+    ]
+
+
+def _measure_layout(text_client, binary_client, layout, movies, profile, dimension, timeout):
+    """
+    ingest into a layout's indexes, read their memory, then time a rebuild
+    """
+    indexes = [(LAYOUT_INDEX_PREFIX + suffix, args) for suffix, args in _layout_indexes(layout, profile, dimension)]
+    try:
+        for name, args in indexes:
+            _drop_index_if_exists(text_client, name)
+            text_client.execute_command("FT.CREATE", name, *args)
+
+        start = time.perf_counter()
+        _write_movies(binary_client, movies)
+        for name, _ in indexes:
+            wait_for_indexing(text_client, name, timeout)
+        ingest_seconds = time.perf_counter() - start
+
+        memory = [_index_memory(index_info(text_client, name)) for name, _ in indexes]
+
+        for name, _ in indexes:
+            _drop_index_if_exists(text_client, name)
+        start = time.perf_counter()
+        for name, args in indexes:
+            text_client.execute_command("FT.CREATE", name, *args)
+        for name, _ in indexes:
+            wait_for_indexing(text_client, name, timeout)
+        rebuild_seconds = time.perf_counter() - start
+    finally:
+        # drop without DD, then remove the copies so the next layout ingests into an empty keyspace
+        for name, _ in indexes:
+            _drop_index_if_exists(text_client, name)
+        _delete_layout_keys(binary_client)
+
+    vector_mb = sum(vector for _, vector in memory)
+    total_mb = sum(total for total, _ in memory)
+    return {
+        'layout': layout,
+        'indexes': len(indexes),
+        'ingest_seconds': round(ingest_seconds, 3),
+        'ingest_per_second': round(len(movies) / ingest_seconds, 1) if ingest_seconds else 0.0,
+        'rebuild_seconds': round(rebuild_seconds, 3),
+        'memory_mb': round(total_mb, 3),
+        'vector_memory_mb': round(vector_mb, 3),
+        'text_memory_mb': round(total_mb - vector_mb, 3),
+    }
+
+
+def _index_memory(info):
+    """
+    (total, vector) memory of one index in MB from FT.INFO
+    """
+    values = {name: _to_float(info.get(name)) for name in MEMORY_FIELDS + ('total_index_memory_sz_mb',)}
+    total = values['total_index_memory_sz_mb'] or sum(values[name] for name in MEMORY_FIELDS)
+    return total, values['vector_index_sz_mb']
+
+
+def _read_movies(client, keys):
+    """
+    every field of every movie, read once before anything is timed
+    """
+    movies = []
+    for chunk in _chunk_keys(keys, WRITE_CHUNK_SIZE):
+        pipe = client.pipeline(transaction=False)
+        for key in chunk:
+            pipe.hgetall(key)
+        movies.extend((key, fields) for key, fields in zip(chunk, pipe.execute()) if fields)
+    return movies
+
+
+def _write_movies(client, movies):
+    """
+    write the scratch copies, one pipeline per chunk
+    """
+    for chunk in _chunk_keys(movies, WRITE_CHUNK_SIZE):
+        pipe = client.pipeline(transaction=False)
+        for key, fields in chunk:
+            pipe.hset(LAYOUT_PREFIX + key, mapping=fields)
+        pipe.execute()
+
+
+def _delete_layout_keys(client):
+    """
+    remove the scratch copies
+    """
+    pipe = client.pipeline(transaction=False)
+    for key in client.scan_iter(match=LAYOUT_PREFIX + "movie:*", count=1000):
+        pipe.unlink(key)
+    pipe.execute()
+
+
+def _to_float(value):
+    """
+    parse an FT.INFO number, 0.0 when missing or nan
+    """
+    try:
+        value = float(value.decode('utf-8') if isinstance(value, bytes) else value)
+    except (TypeError, ValueError):
+        return 0.0
+    return value if value == value else 0.0
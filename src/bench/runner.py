@@ -0,0 +1,371 @@
+"""
+repeatable benchmark scenarios for the search, load and embedding paths
+"""
+import json
+import platform
+import random
+import time
+import click
+from src.core.config import RedisConfig
+from src.utils.metrics import latency_summary, peak_rss_mb
+
+SCENARIOS = ['traditional', 'knn', 'hybrid', 'similar', 'encode', 'load', 'embed']  # also listed in src/main.py
+
+BENCH_PREFIX = "bench:"
+
+NATURAL_LANGUAGE_QUERIES = [
+    "space adventure with aliens",
+    "romantic comedy in Paris",
+    "movies about time travel",
+    "psychological thriller",
+    "superhero saves the world",
+    "heist gone wrong",
+    "coming of age story",
+    "haunted house horror",
+]
+
+
+def run_benchmarks(scenarios=None, iterations=50, warmup=5, seed=42, dataset_size=200, data_file="data/import_movies.redis"):
+    """
+    run the selected scenarios against the configured redis and return a json-ready report
+
+    every scenario draws its inputs from a random.Random(seed), so two runs
+    over the same data issue the same queries in the same order
+    """
+    config = RedisConfig()
+    text_client = config.get_text_client()
+    binary_client = config.get_binary_client()
+    context = _BenchContext(config, text_client, binary_client, seed, dataset_size, data_file)
+
+    report = {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'redis_host': f"{config.host}:{config.port}",
+            'seed': seed,
+            'iterations': iterations,
+            'warmup': warmup,
+            'dataset_size': dataset_size,
+        },
+        'scenarios': {},
+    }
+
+    for name in scenarios or SCENARIOS:
+        click.echo(f"Running {name}...", err=True)
+        runner = _SCENARIO_RUNNERS[name]
+        try:
+            result = runner(context, iterations, warmup)
+        except Exception as e:
+            result = {'error': str(e)}
+        # the process peak never goes down, so this covers every scenario run so far
+        result['cumulative_peak_rss_mb'] = peak_rss_mb()
+        report['scenarios'][name] = result
+
+    report['meta']['peak_rss_mb'] = peak_rss_mb()
+    return report
+
+
+def compare_reports(current, baseline, max_regression=0.2):
+    """
+    compare p95 latency per scenario against a baseline report
+
+    returns a list of (scenario, baseline_ms, current_ms) regressions, a
+    scenario that failed to run counts as one with current_ms None
+    """
+    regressions = []
+    for name, result in current['scenarios'].items():
+        previous = baseline.get('scenarios', {}).get(name, {})
+        if 'error' in result:
+            regressions.append((name, previous.get('p95_ms'), None))
+        elif 'p95_ms' in result and 'p95_ms' in previous:
+            if result['p95_ms'] > previous['p95_ms'] * (1 + max_regression):
+                regressions.append((name, previous['p95_ms'], result['p95_ms']))
+    return regressions
+
+
+def write_report(report, output):
+    """
+    write the report as indented json
+    """
+    output.write(json.dumps(report, indent=2) + "\n")
+
+
+class _BenchContext:
+    """
+    shared clients, lazily loaded model and seeded dataset sample
+    """
+    def __init__(self, config, text_client, binary_client, seed, dataset_size, data_file):
+        self.config = config
+        self.text_client = text_client
+        self.binary_client = binary_client
+        self.seed = seed
+        self.dataset_size = dataset_size
+        self.data_file = data_file
+        self._embeddings_model = None
+        self._movies = None
+
+    def rng(self):
+        """
+        fresh seeded generator so scenario order does not change inputs
+        """
+        return random.Random(self.seed)
+
+    @property
+    def embeddings_model(self):
+        """
+        embedding model, loaded on first use
+        """
+        if self._embeddings_model is None:
+            from src.core.embeddings import MovieEmbeddings
+            self._embeddings_model = MovieEmbeddings(self.config.embedding_model,
+                                                     vector_type=self.config.vector_type)
+        return self._embeddings_model
+
+    def movies(self):
+        """
+        sorted, seeded sample of dataset_size movies with their filter fields
+        """
+        if self._movies is None:
+            from src.data.loader import _get_all_movie_keys
+            keys = sorted(_get_all_movie_keys(self.text_client))
+            keys = self.rng().sample(keys, min(self.dataset_size, len(keys)))
+
+            pipe = self.text_client.pipeline(transaction=False)
+            for key in keys:
+                pipe.hmget(key, 'title', 'genre', 'release_year', 'rating')
+            self._movies = [
+                {'key': key, 'title': title or '', 'genre': genre or '',
+                 'year': _to_int(year), 'rating': _to_float(rating)}
+                for key, (title, genre, year, rating) in zip(keys, pipe.execute())
+            ]
+            if not self._movies:
+                raise RuntimeError("no movie:* keys found - run setup first")
+        return self._movies
+
+
+def _measure(operation, inputs, iterations, warmup, cleanup=None):
+    """
+    run operation over cycling inputs, returns latency summary of the measured calls
+
+    cleanup, when given, runs after every call outside the timed region
+    """
+    for i in range(warmup):
+        operation(inputs[i % len(inputs)])
+        if cleanup:
+            cleanup()
+
+    latencies = []
+    cleanup_seconds = 0.0
+    start = time.perf_counter()
+    for i in range(iterations):
+        op_start = time.perf_counter()
+        operation(inputs[i % len(inputs)])
+        latencies.append(time.perf_counter() - op_start)
+        if cleanup:
+            cleanup_start = time.perf_counter()
+            cleanup()
+            cleanup_seconds += time.perf_counter() - cleanup_start
+    return latency_summary(latencies, time.perf_counter() - start - cleanup_seconds)
+
+
+def _bench_traditional(context, iterations, warmup):
+    """
+    FT.SEARCH field queries built from sampled movies
+    """
+    rng = context.rng()
+    queries = []
+    for movie in context.movies():
+        queries.append(f"@genre:{{{movie['genre']}}} @rating:[{int(movie['rating'])} +inf]")
+        queries.append(f"@release_year:[{movie['year'] - 5} {movie['year'] + 5}]")
+        words = [word for word in movie['title'].split() if word.isalpha() and len(word) > 3]
+        if words:
+            queries.append(f"@title:{rng.choice(words)}")
+    rng.shuffle(queries)
+
+    def search(query):
+        context.text_client.execute_command(
+            "FT.SEARCH", "idx:movies", query,
+            "RETURN", "5", "title", "plot", "genre", "release_year", "rating"
+        )
+
+    return _measure(search, queries, iterations, warmup)
+
+
+def _query_vectors(context):
+    """
+    pre-encoded query vectors so search scenarios exclude model time
+    """
+    model = context.embeddings_model
+    return [model.embedding_to_bytes(vector)
+            for vector in model.generate_embeddings(NATURAL_LANGUAGE_QUERIES)]
+
+
+def _bench_knn(context, iterations, warmup):
+    """
+    pure KNN queries with pre-encoded vectors
+    """
+    from src.search.vector import semantic_search_command, parse_search_results
+
+    vectors = _query_vectors(context)
+    context.rng().shuffle(vectors)
+
+    def search(query_bytes):
+        parse_search_results(context.binary_client.execute_command(
+            *semantic_search_command("idx:movies_vector", query_bytes, 10)
+        ))
+
+    return _measure(search, vectors, iterations, warmup)
+
+
+def _bench_hybrid(context, iterations, warmup):
+    """
+    KNN queries pre-filtered by genre, year and rating drawn from sampled movies
+    """
+    from src.search.vector import hybrid_search_command, parse_search_results
+
+    rng = context.rng()
+    vectors = _query_vectors(context)
+    inputs = []
+    for movie in context.movies():
+        filters = {'genre': movie['genre'], 'year_min': movie['year'] - 10}
+        if rng.random() < 0.5:
+            filters['rating_min'] = max(0, int(movie['rating']) - 1)
+        inputs.append((rng.choice(vectors), filters))
+
+    def search(item):
+        query_bytes, filters = item
+        parse_search_results(context.binary_client.execute_command(
+            *hybrid_search_command("idx:movies_vector", query_bytes, filters, 10)
+        ))
+
+    return _measure(search, inputs, iterations, warmup)
+
+
+def _bench_similar(context, iterations, warmup):
+    """
+    find_similar_movies for sampled movies
+    """
+    from src.search.vector import VectorSearch
+
+    vector_search = VectorSearch(context.binary_client, context.embeddings_model)
+    keys = [movie['key'] for movie in context.movies()]
+    return _measure(lambda key: vector_search.find_similar_movies(key, k=5), keys, iterations, warmup)
+
+
+def _bench_encode(context, iterations, warmup):
+    """
+    query encoding alone, no cache
+    """
+    model = context.embeddings_model
+    return _measure(model.generate_embedding, NATURAL_LANGUAGE_QUERIES, iterations, warmup)
+
+
+def _bench_load(context, iterations, warmup):
+    """
+    bulk load of dataset_size commands into a throwaway bench: keyspace
+    """
+    from src.data.loader import load_data_file
+
+    commands = []  # per call, the file may hold fewer than dataset_size
+
+    def load(_):
+        stats = load_data_file(context.data_file, context.binary_client,
+                               key_prefix=BENCH_PREFIX, max_commands=context.dataset_size)
+        if stats['errors'] and not stats['commands']:
+            raise RuntimeError(stats['errors'][0][1])
+        commands.append(stats['commands'])
+
+    # whole-file loads are slow, so cap the repetitions and clean up untimed
+    try:
+        result = _measure(load, [None], min(iterations, 5), min(warmup, 1),
+                          cleanup=lambda: _delete_bench_keys(context.binary_client))
+    finally:
+        _delete_bench_keys(context.binary_client)
+    measured = commands[-result['count']:] if result.get('count') else []
+    result['commands_per_second'] = round(
+        sum(measured) / len(measured) / (result['mean_ms'] / 1000), 1
+    ) if measured and result.get('mean_ms') else 0.0
+    return result
+
+
+def _bench_embed(context, iterations, warmup):
+    """
+    full embedding pass (read plots, encode, write vectors) over the sampled movies
+
+    runs on bench:movie:N copies of the plots, outside every index, so the
+    live vectors are never rewritten
+    """
+    from src.data.loader import _process_embeddings, _new_embedding_stats, _chunk_keys, DEFAULT_BATCH_SIZE
+
+    source_keys = [movie['key'] for movie in context.movies()]
+    pipe = context.text_client.pipeline(transaction=False)
+    for key in source_keys:
+        pipe.hget(key, 'plot')
+    plots = pipe.execute()
+    keys = [BENCH_PREFIX + key for key in source_keys]
+    batches = [(batch, None) for batch in _chunk_keys(keys, DEFAULT_BATCH_SIZE)]
+    model = context.embeddings_model  # loaded outside the timed region, no disk cache
+
+    def embed(_):
+        # force, or every run after the first would skip the unchanged plots
+        stats = _process_embeddings(batches, len(keys), _new_embedding_stats(), context.text_client,
+                                    context.binary_client, model, False, force=True)
+        if stats['errors']:
+            raise RuntimeError(f"{stats['errors']} movies failed to embed")
+
+    pipe = context.text_client.pipeline(transaction=False)
+    for key, plot in zip(keys, plots):
+        if plot:
+            pipe.hset(key, 'plot', plot)
+    pipe.execute()
+    try:
+        result = _measure(embed, [None], min(iterations, 3), min(warmup, 1))
+    finally:
+        _delete_bench_keys(context.binary_client)
+    result['movies_per_second'] = round(
+        len(keys) / (result['mean_ms'] / 1000), 1
+    ) if result.get('mean_ms') else 0.0
+    return result
+
+
+_SCENARIO_RUNNERS = {
+    'traditional': _bench_traditional,
+    'knn': _bench_knn,
+    'hybrid': _bench_hybrid,
+    'similar': _bench_similar,
+    'encode': _bench_encode,
+    'load': _bench_load,
+    'embed': _bench_embed,
+}
+
+
+def _delete_bench_keys(client):
+    """
+    remove everything written under the bench: prefix
+    """
+    pipe = client.pipeline(transaction=False)
+    for key in client.scan_iter(match=BENCH_PREFIX + "*", count=1000):
+        pipe.unlink(key)
+    pipe.execute()
+
+
+def _to_int(value):
+    """
+    parse a numeric hash field, 0 when missing
+    """
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return 0
+
+
+def _to_float(value):
+    """
+    parse a numeric hash field, 0.0 when missing
+    """
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
@@ -2,15 +2,23 @@
 redis connection configuration
 """
 import os
+import tempfile
+import threading
 from dotenv import load_dotenv
 import redis
+from src.core.indexes import DEFAULT_VECTOR_PROFILE, DEFAULT_INDEX_LAYOUT, get_vector_profile, get_index_layout
 
 load_dotenv()
 
 class RedisConfig:
     """
     redis connection configuration from environment variables
+    
+    owns process-wide connection pools, one per response mode, so every
+    binary and text client handed out shares the same sockets
     """
+    _pools = {}
+    _pools_lock = threading.Lock()
     
     def __init__(self, decode_responses=False):
         self.host = os.getenv('REDIS_HOST', 'localhost')
@@ -18,16 +26,147 @@ class RedisConfig:
         self.password = os.getenv('REDIS_PASSWORD', '')
         self.decode_responses = decode_responses
         
+        # connection pool settings, empty timeouts mean block forever
+        self.max_connections = int(os.getenv('REDIS_MAX_CONNECTIONS', 50))
+        self.pool_timeout = float(os.getenv('REDIS_POOL_TIMEOUT', 20))
+        self.socket_timeout = _optional_float(os.getenv('REDIS_SOCKET_TIMEOUT'))
+        self.socket_connect_timeout = _optional_float(os.getenv('REDIS_SOCKET_CONNECT_TIMEOUT', '5'))
+        self.socket_keepalive = os.getenv('REDIS_SOCKET_KEEPALIVE', 'true').lower() in ('1', 'true', 'yes')
+        self.health_check_interval = int(os.getenv('REDIS_HEALTH_CHECK_INTERVAL', 30))
+        
+        # embedding model, EMBEDDING_DIM skips loading unknown models just to size indexes
+        self.embedding_model = os.getenv('EMBEDDING_MODEL', 'all-MiniLM-L6-v2')
+        self.embedding_dim = os.getenv('EMBEDDING_DIM') or None
+        
+        # unix socket of the shared embedding daemon, used when it is running
+        self.embedding_socket = (
+            os.getenv('EMBEDDING_SOCKET') or os.path.join(tempfile.gettempdir(), 'redis-movie-search-embed.sock')
+        )
+        
+        # on-disk plot embedding cache, size 0 disables it
+        self.embedding_cache_dir = os.getenv('EMBEDDING_CACHE_DIR', '.cache/embeddings')
+        self.embedding_cache_size = int(os.getenv('EMBEDDING_CACHE_SIZE', 50000))
+        
+        # in-process query embedding cache, size 0 disables it and ttl 0 never expires
+        self.query_cache_size = int(os.getenv('QUERY_CACHE_SIZE', 1024))
+        self.query_cache_ttl = float(os.getenv('QUERY_CACHE_TTL', 0))
+        
+        # redis-side search result cache, ttl 0 disables it
+        self.result_cache_ttl = int(os.getenv('RESULT_CACHE_TTL', 0))
+        
+        # local exact vector index, the fallback when redis has no vector index
+        self.flat_index_dir = os.getenv('FLAT_INDEX_DIR', '.cache/flat_index')
+        
+        # vector index profile (see src/core/indexes.py), also sets the stored vector type
+        self.vector_profile = os.getenv('VECTOR_PROFILE', DEFAULT_VECTOR_PROFILE)
+        
+        # hybrid planner: at most exact_limit filter matches are scored on the client,
+        # at most adhoc_limit are brute-forced by redis, more go through HNSW in batches
+        self.hybrid_exact_limit = int(os.getenv('HYBRID_EXACT_LIMIT', 1000))
+        self.hybrid_adhoc_limit = int(os.getenv('HYBRID_ADHOC_LIMIT', 10000))
+        
+        # rows per FT.CURSOR READ when streaming or exporting large result sets
+        self.search_page_size = int(os.getenv('SEARCH_PAGE_SIZE', 100))
+        
+        # separate keyword and vector indexes, or one lean index serving both
+        self.index_layout_name = os.getenv('INDEX_LAYOUT', DEFAULT_INDEX_LAYOUT)
+    
+    @property
+    def vector_type(self):
+        """
+        element type of stored vectors under the configured profile
+        """
+        return get_vector_profile(self.vector_profile)['type']
+    
+    @property
+    def index_layout(self):
+        """
+        validated index layout, raises ValueError for an unknown INDEX_LAYOUT
+        """
+        return get_index_layout(self.index_layout_name)
+    
+    @property
+    def vector_algorithm(self):
+        """
+        vector index algorithm (HNSW or FLAT) under the configured profile
+        """
+        return get_vector_profile(self.vector_profile)['algorithm']
+        
     def get_client(self):
         """
-        create redis client with configured settings
+        redis client in this config's response mode, backed by the shared pool
         """
-        return redis.Redis(
+        return redis.Redis(connection_pool=self.get_pool(self.decode_responses))
+    
+    def get_binary_client(self):
+        """
+        client returning raw bytes, needed for vector fields
+        """
+        return redis.Redis(connection_pool=self.get_pool(False))
+    
+    def get_text_client(self):
+        """
+        client decoding replies to str
+        """
+        return redis.Redis(connection_pool=self.get_pool(True))
+    
+    def get_pool(self, decode_responses):
+        """
+        return the process-wide pool for these settings, creating it on first use
+        """
+        key = (self.host, self.port, self.password, decode_responses)
+        with RedisConfig._pools_lock:
+            pool = RedisConfig._pools.get(key)
+            if pool is None:
+                pool = redis.BlockingConnectionPool(
+                    host=self.host,
+                    port=self.port,
+                    password=self.password,
+                    decode_responses=decode_responses,
+                    max_connections=self.max_connections,
+                    timeout=self.pool_timeout,
+                    socket_timeout=self.socket_timeout,
+                    socket_connect_timeout=self.socket_connect_timeout,
+                    socket_keepalive=self.socket_keepalive,
+                    health_check_interval=self.health_check_interval
+                )
+                RedisConfig._pools[key] = pool
+            return pool
+    
+    def get_async_client(self, decode_responses=None):
+        """
+        redis.asyncio client with the same pool settings
+        
+        async pools are bound to the running event loop, so each call builds
+        a new one - keep the client for the life of the loop and aclose() it
+        """
+        import redis.asyncio
+        
+        if decode_responses is None:
+            decode_responses = self.decode_responses
+        pool = redis.asyncio.BlockingConnectionPool(
             host=self.host,
             port=self.port,
             password=self.password,
-            decode_responses=self.decode_responses
+            decode_responses=decode_responses,
+            max_connections=self.max_connections,
+            timeout=self.pool_timeout,
+            socket_timeout=self.socket_timeout,
+            socket_connect_timeout=self.socket_connect_timeout,
+            socket_keepalive=self.socket_keepalive,
+            health_check_interval=self.health_check_interval
         )
+        return redis.asyncio.Redis(connection_pool=pool)
+    
+    @classmethod
+    def close_pools(cls):
+        """
+        disconnect and forget every shared pool
+        """
+        with cls._pools_lock:
+            for pool in cls._pools.values():
+                pool.disconnect()
+            cls._pools.clear()
         
     def test_connection(self):
         """
@@ -39,4 +178,11 @@ class RedisConfig:
             return True
         except Exception as e:
             print(f"Failed to connect to Redis: {e}")
-            return False
\ No newline at end of file
+            return False
+
+
+def _optional_float(value):
+    """
+    parse an optional numeric setting, empty means unset
+    """
+    return float(value) if value else None
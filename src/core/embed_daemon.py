@@ -0,0 +1,206 @@
+"""
+long-lived local embedding service on a unix socket
+
+the daemon loads the sentence transformer once and serves encode requests,
+so cli sessions stop reloading the model from disk
+
+wire format, both directions: 4-byte big-endian length + json header.
+requests are {"op": "encode", "model": ..., "texts": [...]} or {"op": "ping"};
+encode replies {"ok": true, "count": n, "dim": d} followed by n * d
+float32 values as raw bytes, failures reply {"ok": false, "error": ...}
+"""
+import json
+import os
+import socket
+import socketserver
+import struct
+import threading
+import numpy as np
+
+_HEADER = struct.Struct('>I')
+
+
+class EmbeddingDaemonClient:
+    """
+    client for the embedding daemon, keeps one connection open between calls
+    """
+    def __init__(self, socket_path, timeout=30.0):
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self._sock = None
+        self._lock = threading.Lock()
+
+    def available(self):
+        """
+        true when a daemon answers on the socket
+        """
+        try:
+            return self.ping().get('ok', False)
+        except OSError:
+            return False
+
+    def ping(self):
+        """
+        daemon status - loaded model and dimension
+        """
+        header, _ = self._request({'op': 'ping'})
+        return header
+
+    def encode(self, model_name, texts, batch_size=64):
+        """
+        encode texts remotely, returns a (len(texts), dim) float32 matrix
+
+        raises OSError when the daemon is unreachable
+        """
+        header, payload = self._request(
+            {'op': 'encode', 'model': model_name, 'texts': list(texts), 'batch_size': batch_size}
+        )
+        if not header.get('ok'):
+            raise OSError(f"embedding daemon error: {header.get('error')}")
+        return np.frombuffer(payload, dtype=np.float32).reshape(header['count'], header['dim'])
+
+    def close(self):
+        """
+        drop the connection
+        """
+        with self._lock:
+            if self._sock is not None:
+                self._sock.close()
+                self._sock = None
+
+    def _request(self, message):
+        """
+        send one request, reconnecting once if the kept connection went stale
+        """
+        with self._lock:
+            for attempt in (1, 2):
+                try:
+                    if self._sock is None:
+                        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                        self._sock.settimeout(self.timeout)
+                        self._sock.connect(self.socket_path)
+                    _send_frame(self._sock, json.dumps(message).encode('utf-8'))
+                    header = json.loads(_recv_frame(self._sock))
+                    payload = b''
+                    if header.get('ok') and 'count' in header:
+                        payload = _recv_exact(self._sock, header['count'] * header['dim'] * 4)
+                    return header, payload
+                except OSError:
+                    if self._sock is not None:
+                        self._sock.close()
+                        self._sock = None
+                    if attempt == 2:
+                        raise
+
+
+def serve(socket_path, model_name):
+    """
+    load the model and serve encode requests until interrupted
+    """
+    from src.core.embeddings import MovieEmbeddings
+
+    embeddings_model = MovieEmbeddings(model_name)
+    embeddings_model.model  # load now, not on the first request
+
+    if os.path.exists(socket_path):
+        if EmbeddingDaemonClient(socket_path, timeout=1.0).available():
+            raise RuntimeError(f"an embedding daemon is already running on {socket_path}")
+        os.unlink(socket_path)  # stale socket from a crashed daemon
+
+    # defined here, UnixStreamServer does not exist on platforms without unix sockets
+    class _DaemonServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        """
+        one thread per client connection
+        """
+        daemon_threads = True
+
+    server = _DaemonServer(socket_path, _DaemonHandler)
+    server.embeddings_model = embeddings_model
+    server.encode_lock = threading.Lock()
+    os.chmod(socket_path, 0o600)
+
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+
+
+class _DaemonHandler(socketserver.BaseRequestHandler):
+    """
+    serves requests on one client connection until it closes
+    """
+    def handle(self):
+        """
+        read framed requests until the client disconnects
+        """
+        while True:
+            try:
+                message = json.loads(_recv_frame(self.request))
+            except (OSError, ValueError):
+                return
+
+            try:
+                header, payload = self._dispatch(message)
+            except Exception as e:
+                header, payload = {'ok': False, 'error': str(e)}, b''
+
+            try:
+                _send_frame(self.request, json.dumps(header).encode('utf-8'))
+                if payload:
+                    self.request.sendall(payload)
+            except OSError:
+                return
+
+    def _dispatch(self, message):
+        """
+        run one request, returns (header, raw payload)
+        """
+        model = self.server.embeddings_model
+        op = message.get('op')
+
+        if op == 'ping':
+            return {'ok': True, 'model': model.model_name, 'dim': model.dimension}, b''
+
+        if op == 'encode':
+            if message.get('model', model.model_name) != model.model_name:
+                raise ValueError(f"daemon serves {model.model_name}, not {message['model']}")
+            texts = message.get('texts') or []
+            # one model call at a time keeps torch from oversubscribing cores
+            with self.server.encode_lock:
+                matrix = model.generate_embeddings(texts, batch_size=message.get('batch_size', 64))
+            matrix = np.ascontiguousarray(matrix, dtype=np.float32)
+            return {'ok': True, 'count': len(texts), 'dim': model.dimension}, matrix.tobytes()
+
+        raise ValueError(f"unknown op: {op}")
+
+
+def _send_frame(sock, data):
+    """
+    write one length-prefixed frame
+    """
+    sock.sendall(_HEADER.pack(len(data)) + data)
+
+
+def _recv_frame(sock):
+    """
+    read one length-prefixed frame
+    """
+    (length,) = _HEADER.unpack(_recv_exact(sock, _HEADER.size))
+    return _recv_exact(sock, length)
+
+
+def _recv_exact(sock, size):
+    """
+    read exactly size bytes, raising when the peer closes early
+    """
+    buffer = bytearray(size)
+    view = memoryview(buffer)
+    received = 0
+    while received < size:
+        count = sock.recv_into(view[received:])
+        if count == 0:
+            raise ConnectionError("embedding daemon connection closed")
+        received += count
+    return buffer
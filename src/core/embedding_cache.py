@@ -0,0 +1,167 @@
+"""
+persistent content-addressed cache for plot embeddings
+"""
+import hashlib
+import os
+import re
+import numpy as np
+
+
+class EmbeddingCache:
+    """
+    on-disk embedding cache keyed by (model name, hash of the text)
+
+    each model gets its own directory holding a memory-mapped float32
+    matrix of vectors plus a compact index of 16-byte text digests and
+    last-used ticks. identical texts share one slot, and once the cache
+    is full the least recently used tenth of the slots is evicted
+    """
+    def __init__(self, cache_dir, model_name, dimension, max_entries=50000):
+        if max_entries < 1:
+            raise ValueError("embedding cache needs room for at least one entry")
+        self.model_name = model_name
+        self.dimension = dimension
+        self.capacity = max_entries
+        self.path = os.path.join(cache_dir, re.sub(r'[^A-Za-z0-9_.-]', '_', model_name))
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._open()
+
+    @staticmethod
+    def digest(text):
+        """
+        content hash used as the cache key for a text
+        """
+        return hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest()
+
+    def lookup(self, digests):
+        """
+        find cached vectors for a list of digests
+
+        returns (found, missing) where found maps digest -> vector and
+        missing lists each uncached digest once, in first-seen order
+        """
+        found = {}
+        missing = []
+        seen_missing = set()
+        for digest in digests:
+            if digest in found or digest in seen_missing:
+                self.hits += 1  # repeated text shares the first lookup
+                continue
+            slot = self._slots.get(digest)
+            if slot is None:
+                self.misses += 1
+                missing.append(digest)
+                seen_missing.add(digest)
+            else:
+                self.hits += 1
+                self._touch(slot)
+                found[digest] = self._vectors[slot]
+        return found, missing
+
+    def put(self, digest, vector):
+        """
+        store one vector, evicting old entries when the cache is full
+        """
+        slot = self._slots.get(digest)
+        if slot is None:
+            if not self._free:
+                self._evict()
+            slot = self._free.pop()
+            self._slots[digest] = slot
+            self._digests[slot] = np.frombuffer(digest, dtype=np.uint8)
+        self._vectors[slot] = vector
+        self._touch(slot)
+
+    def flush(self):
+        """
+        write vectors and the key index to disk
+
+        vectors go first, so a saved index never points at a slot whose
+        vector was not written yet
+        """
+        self._vectors.flush()
+        tmp_path = self._index_path + '.tmp.npz'
+        np.savez(tmp_path, digests=self._digests, ticks=self._ticks,
+                 dimension=np.int64(self.dimension))
+        os.replace(tmp_path, self._index_path)
+
+    def stats(self):
+        """
+        hit/miss counters and occupancy
+        """
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'evictions': self.evictions,
+            'entries': len(self._slots),
+            'capacity': self.capacity,
+        }
+
+    def _open(self):
+        """
+        load the key index and map the vector file, starting fresh if either does not fit
+        """
+        os.makedirs(self.path, exist_ok=True)
+        vectors_path = os.path.join(self.path, 'vectors.f32')
+        self._index_path = os.path.join(self.path, 'index.npz')
+        expected_size = self.capacity * self.dimension * 4
+
+        index = self._load_index()
+        if index is None or not os.path.exists(vectors_path) or os.path.getsize(vectors_path) != expected_size:
+            self._digests = np.zeros((self.capacity, 16), dtype=np.uint8)
+            self._ticks = np.zeros(self.capacity, dtype=np.int64)
+            mode = 'w+'
+        else:
+            self._digests, self._ticks = index
+            mode = 'r+'
+
+        self._vectors = np.memmap(vectors_path, dtype=np.float32, mode=mode,
+                                  shape=(self.capacity, self.dimension))
+        used = np.flatnonzero(self._ticks)
+        self._slots = {self._digests[slot].tobytes(): int(slot) for slot in used}
+        self._free = [int(slot) for slot in np.flatnonzero(self._ticks == 0)[::-1]]
+        self._clock = int(self._ticks.max()) if used.size else 0
+
+    def _load_index(self):
+        """
+        read the saved index, or None when missing or built for another shape
+        """
+        if not os.path.exists(self._index_path):
+            return None
+        try:
+            with np.load(self._index_path) as data:
+                digests, ticks = data['digests'], data['ticks']
+                dimension = int(data['dimension'])
+        except Exception:
+            return None
+        if dimension != self.dimension or len(ticks) != self.capacity:
+            return None
+        return digests, ticks
+
+    def _touch(self, slot):
+        """
+        mark a slot as most recently used
+        """
+        self._clock += 1
+        self._ticks[slot] = self._clock
+
+    def _evict(self):
+        """
+        free the least recently used tenth of the slots
+
+        the freed slots are saved as empty before any of them is reused, so
+        an interrupted run can never reopen an old digest over a new vector
+        """
+        count = max(1, self.capacity // 10)
+        oldest = np.argpartition(self._ticks, count - 1)[:count]
+        for slot in oldest:
+            del self._slots[self._digests[slot].tobytes()]
+            self._digests[slot] = 0
+            self._ticks[slot] = 0
+            self._free.append(int(slot))
+        self.evictions += count
+        self.flush()
@@ -1,20 +1,144 @@
 """
 embedding generation and management for movie plots
 """
+import os
 import numpy as np
-from sentence_transformers import SentenceTransformer
-import struct
+from src.core.embedding_cache import EmbeddingCache
+
+DEFAULT_MODEL = 'all-MiniLM-L6-v2'
+
+# known output sizes, so indexes can be created without loading a model
+MODEL_DIMENSIONS = {
+    'all-MiniLM-L6-v2': 384,
+    'all-MiniLM-L12-v2': 384,
+    'paraphrase-MiniLM-L3-v2': 384,
+    'all-mpnet-base-v2': 768,
+}
+
+
+# element types a redis vector field can store
+VECTOR_TYPES = ('FLOAT32', 'FLOAT64', 'FLOAT16', 'BFLOAT16')
+
+
+def vector_element_size(vector_type):
+    """
+    bytes per vector component for a redis vector type
+    """
+    return {'FLOAT32': 4, 'FLOAT64': 8, 'FLOAT16': 2, 'BFLOAT16': 2}[_check_vector_type(vector_type)]
+
+
+def vectors_to_storage(vectors, vector_type='FLOAT32'):
+    """
+    convert float vectors to the array layout redis stores for vector_type
+    
+    numpy has no bfloat16, so BFLOAT16 keeps the upper half of each float32
+    bit pattern, rounded to nearest even
+    """
+    vector_type = _check_vector_type(vector_type)
+    if vector_type == 'BFLOAT16':
+        bits = np.ascontiguousarray(vectors, dtype=np.float32).view(np.uint32)
+        return ((bits + 0x7FFF + ((bits >> 16) & 1)) >> 16).astype(np.uint16)
+    dtype = {'FLOAT32': np.float32, 'FLOAT64': np.float64, 'FLOAT16': np.float16}[vector_type]
+    return np.ascontiguousarray(vectors, dtype=dtype)
+
+
+def storage_to_vectors(buffer, vector_type='FLOAT32'):
+    """
+    decode a stored vector buffer into a 1-d float32 array
+    
+    FLOAT32 returns a read-only view over the buffer, other types a new array
+    """
+    vector_type = _check_vector_type(vector_type)
+    if vector_type == 'FLOAT32':
+        return np.frombuffer(buffer, dtype=np.float32)
+    if vector_type == 'BFLOAT16':
+        return (np.frombuffer(buffer, dtype=np.uint16).astype(np.uint32) << 16).view(np.float32)
+    dtype = {'FLOAT64': np.float64, 'FLOAT16': np.float16}[vector_type]
+    return np.frombuffer(buffer, dtype=dtype).astype(np.float32)
+
+
+def _check_vector_type(vector_type):
+    """
+    normalize a vector type name, raising ValueError for unsupported ones
+    """
+    vector_type = (vector_type or 'FLOAT32').upper()
+    if vector_type not in VECTOR_TYPES:
+        raise ValueError(f"unsupported vector type {vector_type}, expected one of {', '.join(VECTOR_TYPES)}")
+    return vector_type
+
+
+def embedding_dimension(model_name=DEFAULT_MODEL, configured=None):
+    """
+    vector dimension for a model - configured value, then the known table,
+    and only as a last resort loading the model itself
+    """
+    if configured:
+        return int(configured)
+    if model_name in MODEL_DIMENSIONS:
+        return MODEL_DIMENSIONS[model_name]
+    return MovieEmbeddings(model_name).dimension
+
 
 class MovieEmbeddings:
     """
     handles text embedding generation using sentence transformers
+    
+    sentence_transformers (and torch) are imported and the model is loaded
+    on first encode, so constructing this object is cheap. with a daemon
+    socket set, encodes go to the shared embedding daemon while it answers
+    and fall back to the in-process model when it does not
+    
+    vectors are generated as float32 and converted to vector_type only when
+    turned into redis blobs
     """
-    def __init__(self, model_name='all-MiniLM-L6-v2'):
+    def __init__(self, model_name=DEFAULT_MODEL, cache_dir=None, cache_size=50000, daemon_socket=None,
+                 vector_type='FLOAT32'):
         """
-        initialize embedding model - using MiniLM for speed and quality
+        initialize embedding settings - using MiniLM for speed and quality
+        
+        with cache_dir set, batch encodes reuse vectors from the on-disk cache
         """
-        self.model = SentenceTransformer(model_name)
-        self.dimension = self.model.get_sentence_embedding_dimension()
+        self.model_name = model_name
+        self.vector_type = _check_vector_type(vector_type)
+        self.cache_dir = cache_dir
+        self.cache_size = cache_size
+        self._daemon = None
+        if daemon_socket and os.path.exists(daemon_socket):
+            # imported only here, the daemon module needs unix sockets
+            from src.core.embed_daemon import EmbeddingDaemonClient
+            self._daemon = EmbeddingDaemonClient(daemon_socket)
+        self._model = None
+        self._dimension = MODEL_DIMENSIONS.get(model_name)
+        self._cache = None
+    
+    @property
+    def model(self):
+        """
+        sentence transformer, loaded on first use
+        """
+        if self._model is None:
+            from sentence_transformers import SentenceTransformer
+            self._model = SentenceTransformer(self.model_name)
+            self._dimension = self._model.get_sentence_embedding_dimension()
+        return self._model
+    
+    @property
+    def dimension(self):
+        """
+        embedding size, from the known table when possible
+        """
+        if self._dimension is None:
+            self.model
+        return self._dimension
+    
+    @property
+    def cache(self):
+        """
+        on-disk embedding cache, opened on first use when cache_dir is set
+        """
+        if self._cache is None and self.cache_dir and self.cache_size > 0:
+            self._cache = EmbeddingCache(self.cache_dir, self.model_name, self.dimension, self.cache_size)
+        return self._cache
     
     def generate_embedding(self, text):
         """
@@ -22,24 +146,107 @@ class MovieEmbeddings:
         """
         if not text:
             return None
+        daemon = self._daemon  # read once, another thread may drop it meanwhile
+        if daemon is not None:
+            embeddings = self._encode_remote(daemon, [text], batch_size=1)
+            if embeddings is not None:
+                return embeddings[0]
         embedding = self.model.encode(text, convert_to_numpy=True)
         return embedding.astype(np.float32)
+
+    def generate_embeddings(self, texts, batch_size=64):
+        """
+        generate embedding vectors for a list of texts in one batched model call
+
+        returns (len(texts), dimension) float32 matrix
+        """
+        if not texts:
+            return np.empty((0, self.dimension), dtype=np.float32)
+        if self.cache is None:
+            return self._encode_batch(texts, batch_size)
+        
+        # only texts missing from the cache reach the model, each one once
+        digests = [self.cache.digest(text) for text in texts]
+        found, missing = self.cache.lookup(digests)
+        
+        text_for = dict(zip(digests, texts))
+        encoded = self._encode_batch([text_for[digest] for digest in missing], batch_size) if missing else []
+        found.update(zip(missing, encoded))
+        
+        embeddings = np.stack([found[digest] for digest in digests]).astype(np.float32)
+        for digest, embedding in zip(missing, encoded):
+            self.cache.put(digest, embedding)
+        return embeddings
+    
+    def _encode_batch(self, texts, batch_size):
+        """
+        run the model once over a list of texts
+        """
+        daemon = self._daemon  # read once, another thread may drop it meanwhile
+        if daemon is not None:
+            embeddings = self._encode_remote(daemon, texts, batch_size)
+            if embeddings is not None:
+                return embeddings
+        embeddings = self.model.encode(list(texts), batch_size=batch_size, convert_to_numpy=True)
+        return embeddings.astype(np.float32)
+
+    def _encode_remote(self, daemon, texts, batch_size):
+        """
+        encode through the daemon, None (and in-process from now on) if it is gone
+        """
+        try:
+            embeddings = daemon.encode(self.model_name, texts, batch_size)
+        except OSError:
+            daemon.close()
+            self._daemon = None
+            return None
+        self._dimension = embeddings.shape[1]
+        return embeddings
     
     def embedding_to_bytes(self, embedding):
         """
-        convert numpy array to bytes for redis storage
+        convert numpy array to vector_type bytes for redis storage
         """
         if embedding is None:
             return None
-        return struct.pack(f'{len(embedding)}f', *embedding)
+        return vectors_to_storage(embedding, self.vector_type).tobytes()
     
     def bytes_to_embedding(self, bytes_data):
         """
-        convert bytes back to numpy array
+        convert a stored vector_type blob back to a float32 numpy array
         """
         if not bytes_data:
             return None
-        return np.array(struct.unpack(f'{len(bytes_data)//4}f', bytes_data))
+        return storage_to_vectors(bytes_data, self.vector_type)
+    
+    def embeddings_to_bytes(self, embeddings):
+        """
+        convert an (n, dim) matrix into n vector_type blobs, one per row
+        """
+        matrix = vectors_to_storage(embeddings, self.vector_type)
+        return [row.tobytes() for row in matrix]
+    
+    def bytes_to_embeddings(self, blobs):
+        """
+        convert a list of vector_type blobs into one (n, dim) float32 matrix
+        
+        all blobs must have the same length
+        """
+        if not blobs:
+            return np.empty((0, self.dimension), dtype=np.float32)
+        size = len(blobs[0])
+        element_size = vector_element_size(self.vector_type)
+        if size == 0 or size % element_size or any(len(blob) != size for blob in blobs):
+            raise ValueError(f"embedding blobs must be non-empty {self.vector_type} buffers of equal length")
+        return storage_to_vectors(b"".join(blobs), self.vector_type).reshape(len(blobs), size // element_size)
+    
+    def mean_embedding(self, embeddings):
+        """
+        centroid of an (n, dim) matrix of embeddings, scaled to unit length
+        """
+        centroid = np.asarray(embeddings, dtype=np.float32).mean(axis=0)
+        norm = np.linalg.norm(centroid)
+        return centroid / norm if norm > 0 else centroid
     
     def cosine_similarity(self, vec1, vec2):
         """
@@ -48,4 +255,16 @@ class MovieEmbeddings:
         dot_product = np.dot(vec1, vec2)
         norm1 = np.linalg.norm(vec1)
         norm2 = np.linalg.norm(vec2)
-        return dot_product / (norm1 * norm2)
\ No newline at end of file
+        return dot_product / (norm1 * norm2)
+    
+    def batch_cosine_similarity(self, query, matrix):
+        """
+        calculate cosine similarity between one query vector and every row of a matrix
+        
+        returns 1-d float32 array with one score per row, zero-norm rows score 0
+        """
+        query = np.asarray(query, dtype=np.float32)
+        matrix = np.asarray(matrix, dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1) * np.linalg.norm(query)
+        scores = matrix @ query
+        return np.divide(scores, norms, out=np.zeros_like(scores), where=norms > 0)
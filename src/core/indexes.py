@@ -1,6 +1,9 @@
 """
 This file contains the index definitions used in the Redis Movie Search demo.
 Each index showcases different Redis search capabilities
+
+Each "name" is the alias searches query; the index behind it is built as
+name_v{n} so it can be replaced without downtime
 """
 
 # movie index for keyword search
@@ -36,15 +39,75 @@ MOVIE_VECTOR_INDEX = {
         ("genre", "TAG"),
         ("release_year", "NUMERIC", "SORTABLE"),
         ("rating", "NUMERIC", "SORTABLE"),
-        
-        # Vector field for embeddings
-        ("plot_embedding", "VECTOR", "HNSW", "6",
-         "TYPE", "FLOAT32",
-         "DIM", "384",
-         "DISTANCE_METRIC", "COSINE")
-    ]
+    ],
+    
+    # Vector field for embeddings, defined by the selected profile below
+    "vector_field": "plot_embedding"
+}
+
+# Combined index for INDEX_LAYOUT=lean - one index serves both search flows,
+# so every movie write is indexed once instead of twice. It is built behind
+# idx:movies_vector and idx:movies is aliased to it as well. Unqueried hash
+# fields (votes, poster, ibmdb_id) stay unindexed, as in the other layouts.
+# NOHL drops the byte offsets kept for highlighting (phrase queries still
+# work), NOFREQS drops term frequencies at the cost of coarser keyword
+# ranking, titles are matched unstemmed and genre tags keep their case for
+# sorting and faceting
+LEAN_MOVIE_INDEX = {
+    "name": "idx:movies_vector",
+    "aliases": ["idx:movies"],
+    "on": "HASH",
+    "prefix": ["movie:"],
+    "options": ["NOHL", "NOFREQS"],
+    "schema": [
+        ("title", "TEXT", "WEIGHT", "5.0", "NOSTEM"),
+        ("plot", "TEXT"),
+        ("genre", "TAG", "SORTABLE", "UNF"),
+        ("release_year", "NUMERIC", "SORTABLE"),
+        ("rating", "NUMERIC", "SORTABLE"),
+    ],
+    "vector_field": "plot_embedding"
 }
 
+# separate: idx:movies plus idx:movies_vector, lean: LEAN_MOVIE_INDEX for both
+INDEX_LAYOUTS = ("separate", "lean")
+DEFAULT_INDEX_LAYOUT = "separate"
+
+# Vector storage profiles for the vector index - VECTOR_PROFILE selects one.
+# FLOAT16/BFLOAT16 halve vector memory, FLAT trades query speed for exact
+# results. Empty params keep the server's HNSW defaults
+VECTOR_PROFILES = {
+    "hnsw": {"algorithm": "HNSW", "type": "FLOAT32", "metric": "COSINE", "params": {}},
+    "hnsw-tuned": {"algorithm": "HNSW", "type": "FLOAT32", "metric": "COSINE",
+                   "params": {"M": 16, "EF_CONSTRUCTION": 200, "EF_RUNTIME": 20}},
+    "hnsw-f16": {"algorithm": "HNSW", "type": "FLOAT16", "metric": "COSINE",
+                 "params": {"M": 16, "EF_CONSTRUCTION": 200, "EF_RUNTIME": 20}},
+    "hnsw-bf16": {"algorithm": "HNSW", "type": "BFLOAT16", "metric": "COSINE",
+                  "params": {"M": 16, "EF_CONSTRUCTION": 200, "EF_RUNTIME": 20}},
+    "flat": {"algorithm": "FLAT", "type": "FLOAT32", "metric": "COSINE", "params": {}},
+    "flat-f16": {"algorithm": "FLAT", "type": "FLOAT16", "metric": "COSINE", "params": {}},
+}
+
+DEFAULT_VECTOR_PROFILE = "hnsw"
+
+def get_vector_profile(name=None):
+    """
+    Look up a vector profile by name, raising ValueError for unknown names
+    """
+    name = name or DEFAULT_VECTOR_PROFILE
+    if name not in VECTOR_PROFILES:
+        raise ValueError(f"unknown vector profile {name}, expected one of {', '.join(VECTOR_PROFILES)}")
+    return VECTOR_PROFILES[name]
+
+def get_index_layout(name=None):
+    """
+    Validate an index layout name, raising ValueError for unknown names
+    """
+    layout = (name or DEFAULT_INDEX_LAYOUT).lower()
+    if layout not in INDEX_LAYOUTS:
+        raise ValueError(f"unknown index layout {name}, expected one of {', '.join(INDEX_LAYOUTS)}")
+    return layout
+
 # Actor index demonstrating multi-field search
 ACTOR_INDEX = {
     "name": "idx:actors",
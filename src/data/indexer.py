@@ -1,29 +1,22 @@
+import re
+import time
 import click
 from src.core.config import RedisConfig
-from src.core.embeddings import MovieEmbeddings
-from src.core.indexes import MOVIE_INDEX, MOVIE_VECTOR_INDEX, ACTOR_INDEX
+from src.core.embeddings import embedding_dimension
+from src.core.indexes import (
+    MOVIE_INDEX, MOVIE_VECTOR_INDEX, LEAN_MOVIE_INDEX, ACTOR_INDEX, get_vector_profile, get_index_layout
+)
+from src.search.result_cache import bump_index_version
+
+INDEX_BUILD_TIMEOUT = 600  # seconds a new index version may take to scan the keyspace
 
 def create_movie_index(client):
     """Create search index for movies with text and numeric fields"""
     index_config = MOVIE_INDEX
     index_name = index_config["name"]
     
-    _drop_index_if_exists(client, index_name)
-    
     try:
-        # Build command from index configuration
-        cmd = ["FT.CREATE", index_name, "ON", index_config["on"]]
-        
-        # Add prefix
-        cmd.extend(["PREFIX", str(len(index_config["prefix"]))])
-        cmd.extend(index_config["prefix"])
-        
-        # Add schema
-        cmd.append("SCHEMA")
-        for field_def in index_config["schema"]:
-            cmd.extend(field_def)
-        
-        client.execute_command(*cmd)
+        build_index_version(client, index_name, index_create_args(index_config))
         return True
     except Exception as e:
         click.echo(f"Failed to create movie index: {e}")
@@ -34,22 +27,8 @@ def create_actor_index(client):
     index_config = ACTOR_INDEX
     index_name = index_config["name"]
     
-    _drop_index_if_exists(client, index_name)
-    
     try:
-        # Build command from index configuration
-        cmd = ["FT.CREATE", index_name, "ON", index_config["on"]]
-        
-        # Add prefix
-        cmd.extend(["PREFIX", str(len(index_config["prefix"]))])
-        cmd.extend(index_config["prefix"])
-        
-        # Add schema
-        cmd.append("SCHEMA")
-        for field_def in index_config["schema"]:
-            cmd.extend(field_def)
-        
-        client.execute_command(*cmd)
+        build_index_version(client, index_name, index_create_args(index_config))
         return True
     except Exception as e:
         click.echo(f"Failed to create actor index: {e}")
@@ -71,36 +50,36 @@ def list_indexes(client):
     except:
         return []
 
-def create_movie_index_with_vectors(client):
-    """Create search index for movies with vector embedding support"""
-    index_config = MOVIE_VECTOR_INDEX.copy()
-    index_name = index_config["name"]
-    embeddings = MovieEmbeddings()
-    vector_dim = embeddings.dimension
+def create_movie_index_with_vectors(client, profile_name=None, layout=None, vector_source=None):
+    """Create search index for movies with vector embedding support, using the configured vector profile and layout
+
+    vector_source indexes another hash field as the vector field, so searches
+    on @plot_embedding read it - used to serve staged vectors mid-migration.
+    """
+    config = RedisConfig()
+    profile_name = profile_name or config.vector_profile
     
-    _drop_index_if_exists(client, index_name)
+    try:
+        layout = get_index_layout(layout or config.index_layout_name)
+        profile = get_vector_profile(profile_name)
+    except ValueError as e:
+        click.echo(f"Failed to create vector index: {e}")
+        return False
+    
+    index_config = LEAN_MOVIE_INDEX if layout == "lean" else MOVIE_VECTOR_INDEX
+    index_name = index_config["name"]
+    vector_dim = embedding_dimension(config.embedding_model, config.embedding_dim)
     
     try:
-        # Build command from index configuration
-        cmd = ["FT.CREATE", index_name, "ON", index_config["on"]]
-        
-        # Add prefix
-        cmd.extend(["PREFIX", str(len(index_config["prefix"]))])
-        cmd.extend(index_config["prefix"])
-        
-        # Add schema with dynamic vector dimension
-        cmd.append("SCHEMA")
-        for field_def in index_config["schema"]:
-            # Replace dimension placeholder with actual value
-            if isinstance(field_def, tuple):
-                field_def = list(field_def)
-                for i, val in enumerate(field_def):
-                    if val == "384":  # Our dimension placeholder
-                        field_def[i] = str(vector_dim)
-            cmd.extend(field_def)
-        
-        client.execute_command(*cmd)
-        click.echo(f"Created vector index '{index_name}' with {vector_dim}D vectors")
+        # The vector field comes from the profile
+        vector_args = vector_field_args(vector_dim, profile["algorithm"], profile["params"],
+                                        profile["type"], profile["metric"], index_config["vector_field"],
+                                        vector_source)
+        aliases = index_config.get("aliases", [])
+        version_name = build_index_version(client, index_name, index_create_args(index_config, vector_args),
+                                           aliases=aliases)
+        click.echo(f"Created {layout} vector index '{version_name}' behind '{', '.join([index_name] + aliases)}' "
+                   f"with {vector_dim}D {profile['type']} {profile['algorithm']} vectors (profile {profile_name})")
         return True
     except Exception as e:
         click.echo(f"Failed to create vector index: {e}")
@@ -110,11 +89,17 @@ def create_all_indexes(with_vectors=False):
     """Create all required search indexes"""
     config = RedisConfig()
     client = config.get_client()
+    try:
+        layout = config.index_layout
+    except ValueError as e:
+        click.echo(f"Failed to create indexes: {e}")
+        return False
     
-    indexes_created = [
-        ("movie", create_movie_index(client)),
-        ("actor", create_actor_index(client))
-    ]
+    # the lean vector index also serves keyword search, so there is no separate movie index
+    indexes_created = []
+    if not (with_vectors and layout == "lean"):
+        indexes_created.append(("movie", create_movie_index(client)))
+    indexes_created.append(("actor", create_actor_index(client)))
     
     if with_vectors:
         vector_success = create_movie_index_with_vectors(client)
@@ -132,6 +117,136 @@ def create_all_indexes(with_vectors=False):
     
     return success
 
+def index_create_args(index_config, vector_args=None, prefixes=None):
+    """Build the FT.CREATE arguments that follow the index name, optionally over other key prefixes"""
+    prefixes = prefixes or index_config["prefix"]
+    cmd = ["ON", index_config["on"]]
+    
+    # Add prefix
+    cmd.extend(["PREFIX", str(len(prefixes))])
+    cmd.extend(prefixes)
+    
+    # Add index-wide options such as NOFREQS
+    cmd.extend(index_config.get("options", []))
+    
+    # Add schema, then the vector field if any
+    cmd.append("SCHEMA")
+    for field_def in index_config["schema"]:
+        cmd.extend(field_def)
+    cmd.extend(vector_args or [])
+    return cmd
+
+def vector_field_args(dim, algorithm="HNSW", params=None, dtype="FLOAT32", metric="COSINE", field="plot_embedding",
+                      source=None):
+    """Build the schema arguments of a vector field, params holds extra attributes such as M
+
+    With source set the vector is read from that hash field and exposed as field.
+    """
+    attributes = ["TYPE", dtype, "DIM", str(dim), "DISTANCE_METRIC", metric]
+    for name, value in (params or {}).items():
+        attributes.extend([name, str(value)])
+    name = [source, "AS", field] if source and source != field else [field]
+    return name + ["VECTOR", algorithm, str(len(attributes))] + attributes
+
+def vector_field_info(client, index_name, field="plot_embedding"):
+    """Element type and algorithm of an index's vector field as {'type': ..., 'algorithm': ...}
+
+    Read from FT.INFO attributes, so it follows the index an alias points at.
+    Returns None when the index or field is missing or the server does not
+    report them.
+    """
+    try:
+        attributes = index_info(client, index_name).get('attributes') or []
+    except Exception:
+        return None
+    for attribute in attributes:
+        values = [value.decode('utf-8') if isinstance(value, bytes) else value for value in attribute]
+        settings = {str(values[i]).lower(): values[i + 1] for i in range(0, len(values) - 1, 2)}
+        if settings.get('attribute') == field and str(settings.get('type', '')).upper() == 'VECTOR':
+            vector_type = settings.get('data_type')
+            algorithm = settings.get('algorithm')
+            if not vector_type:
+                return None
+            return {'type': str(vector_type).upper(), 'algorithm': str(algorithm or '').upper() or None}
+    return None
+
+def index_info(client, index_name):
+    """Return FT.INFO of an index as a dict with text keys"""
+    reply = client.execute_command("FT.INFO", index_name)
+    info = {}
+    for i in range(0, len(reply) - 1, 2):
+        name = reply[i].decode('utf-8') if isinstance(reply[i], bytes) else reply[i]
+        info[name] = reply[i + 1]
+    return info
+
+def wait_for_indexing(client, index_name, timeout=600, poll_interval=0.1):
+    """Block until an index has finished its initial scan - returns FT.INFO, raises TimeoutError"""
+    deadline = time.monotonic() + timeout
+    while True:
+        info = index_info(client, index_name)
+        indexing = info.get('indexing', 0)
+        percent = info.get('percent_indexed', 1)
+        if isinstance(indexing, bytes):
+            indexing = indexing.decode('utf-8')
+        if isinstance(percent, bytes):
+            percent = percent.decode('utf-8')
+        if str(indexing) in ('0', '0.0') and float(percent) >= 1:
+            return info
+        if time.monotonic() > deadline:
+            raise TimeoutError(f"index {index_name} still indexing after {timeout} seconds")
+        time.sleep(poll_interval)
+
+def build_index_version(client, alias, create_args, timeout=INDEX_BUILD_TIMEOUT, aliases=()):
+    """Build alias_v{n} next to the live index, then point the alias at it - returns the new index name
+
+    Searches keep hitting the previous version while the new one scans the
+    keyspace. Once FT.INFO reports indexing complete the alias, and any extra
+    aliases, are switched with FT.ALIASUPDATE and the older versions behind
+    them are dropped, keeping their documents. create_args is everything
+    after the index name in FT.CREATE.
+    """
+    previous = index_versions(client, alias)
+    version_name = f"{alias}_v{max(previous, default=0) + 1}"
+    
+    client.execute_command("FT.CREATE", version_name, *create_args)
+    try:
+        wait_for_indexing(client, version_name, timeout)
+    except Exception:
+        _drop_index_if_exists(client, version_name)
+        raise
+    
+    names = [alias] + list(aliases)
+    for name in names:
+        # an index created before versioning holds the alias name itself and has to go first
+        if alias_target(client, name) == name:
+            _drop_index_if_exists(client, name)
+        client.execute_command("FT.ALIASUPDATE", name, version_name)
+    bump_index_version(client)
+    
+    for name in names:
+        for version in index_versions(client, name):
+            if f"{name}_v{version}" != version_name:
+                _drop_index_if_exists(client, f"{name}_v{version}")
+    return version_name
+
+def index_versions(client, alias):
+    """Version numbers of the alias_v{n} indexes that exist, in ascending order"""
+    pattern = re.compile(re.escape(alias) + r"_v(\d+)$")
+    versions = []
+    for name in list_indexes(client):
+        match = pattern.match(name.decode('utf-8') if isinstance(name, bytes) else name)
+        if match:
+            versions.append(int(match.group(1)))
+    return sorted(versions)
+
+def alias_target(client, alias):
+    """Name of the index a search on alias reaches, None when nothing answers to it"""
+    try:
+        name = index_info(client, alias).get('index_name')
+    except Exception:
+        return None
+    return name.decode('utf-8') if isinstance(name, bytes) else name
+
 def _drop_index_if_exists(client, index_name):
     """Drop index if it exists, ignore errors if it doesn't"""
     try:
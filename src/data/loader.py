@@ -1,11 +1,18 @@
+import hashlib
+import multiprocessing
 import os
-import subprocess
 from src.core.config import RedisConfig
-from src.core.embeddings import MovieEmbeddings
+from src.search.result_cache import bump_index_version
+from src.utils.parser import split_redis_args
 import click
 import time
 
-def load_all_data():
+DEFAULT_BATCH_SIZE = 64  # plots per model call and per write pipeline
+DEFAULT_CHUNK_SIZE = 5000  # commands per bulk load pipeline
+MAX_REPORTED_ERRORS = 10  # error lines printed per file
+CHECKPOINT_KEY = "embeddings:checkpoint"  # resume point of an interrupted embedding pass
+
+def load_all_data(chunk_size=DEFAULT_CHUNK_SIZE):
     """ load all movie and actor data into Redis from predefined files."""
     config = RedisConfig()
     
@@ -15,9 +22,9 @@ def load_all_data():
     if _data_exists(client):
         return True
     
-    redis_cli_cmd = _build_redis_cli_command(config)
     data_files = ["data/import_movies.redis", "data/import_actors.redis"]
-    success = _load_data_files(data_files, redis_cli_cmd)
+    success = _load_data_files(data_files, client, chunk_size)
+    bump_index_version(client)
     if success:
         _display_load_statistics(client)
     
@@ -31,22 +38,15 @@ def _data_exists(client):
             return True
     return False
 
-def _build_redis_cli_command(config):
-    """ build redis-cli command with connection parameters"""
-    cmd = ['redis-cli', '-h', config.host, '-p', str(config.port)]
-    if config.password:
-        cmd.extend(['-a', config.password])
-    return cmd
-
-def _load_data_files(data_files, redis_cli_cmd):
-    """Load all data files using redis-cli"""
+def _load_data_files(data_files, client, chunk_size):
+    """Load all data files through pipelined bulk inserts"""
     for filepath in data_files:
-        if not _load_single_file(filepath, redis_cli_cmd):
+        if not _load_single_file(filepath, client, chunk_size):
             return False
     return True
 
-def _load_single_file(filepath, redis_cli_cmd):
-    """Load a single data file into Redis"""
+def _load_single_file(filepath, client, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Load a single data file into Redis and report its throughput"""
     if not os.path.exists(filepath):
         click.echo(f"File not found: {filepath}")
         return False
@@ -55,24 +55,80 @@ def _load_single_file(filepath, redis_cli_cmd):
     click.echo(f"Loading {filename}...")
     
     try:
-        with open(filepath, 'r') as f:
-            result = subprocess.run(
-                redis_cli_cmd,
-                stdin=f,
-                capture_output=True,
-                text=True
-            )
-            
-        if result.returncode == 0:
-            click.echo(f"✓ {filename} loaded successfully")
-            return True
-        else:
-            click.echo(f"✗ Error loading {filename}: {result.stderr}")
-            return False
-            
+        stats = load_data_file(filepath, client, chunk_size)
     except Exception as e:
         click.echo(f"✗ Failed to load {filename}: {e}")
         return False
+    
+    # like redis-cli, bad lines are reported but do not abort the load
+    _display_file_statistics(filename, stats)
+    return stats['commands'] > 0 or not stats['errors']
+
+def load_data_file(filepath, client, chunk_size=DEFAULT_CHUNK_SIZE, key_prefix='', max_commands=None):
+    """Stream a redis-cli command file into Redis one pipeline chunk at a time
+    
+    key_prefix is prepended to every command's key and max_commands stops
+    after that many parsed commands (both used for benchmark datasets).
+    Returns stats with the command count, (line, message) errors and start time.
+    """
+    stats = {'commands': 0, 'errors': [], 'start_time': time.time()}
+    prefix = key_prefix.encode('utf-8')
+    parsed = 0
+    
+    with open(filepath, 'rb') as f:
+        chunk = []
+        for line_number, line in enumerate(f, start=1):
+            if max_commands is not None and parsed >= max_commands:
+                break
+            try:
+                args = split_redis_args(line)
+            except ValueError as e:
+                stats['errors'].append((line_number, f"parse error: {e}"))
+                continue
+            if not args:
+                continue
+            
+            if prefix and len(args) > 1:
+                args[1] = prefix + args[1]
+            parsed += 1
+            chunk.append((line_number, args))
+            if len(chunk) >= chunk_size:
+                _send_chunk(client, chunk, stats)
+                chunk = []
+        
+        if chunk:
+            _send_chunk(client, chunk, stats)
+    
+    return stats
+
+def _send_chunk(client, chunk, stats):
+    """Execute one chunk of parsed commands in a single pipeline"""
+    pipe = client.pipeline(transaction=False)
+    for _, args in chunk:
+        pipe.execute_command(*args)
+    results = pipe.execute(raise_on_error=False)
+    
+    for (line_number, _), result in zip(chunk, results):
+        if isinstance(result, Exception):
+            stats['errors'].append((line_number, str(result)))
+        else:
+            stats['commands'] += 1
+
+def _display_file_statistics(filename, stats):
+    """Display throughput and any failed lines for one loaded file"""
+    elapsed = time.time() - stats['start_time']
+    rate = stats['commands'] / elapsed if elapsed > 0 else 0
+    errors = stats['errors']
+    
+    if errors:
+        click.echo(f"! {filename} loaded with {len(errors)} failed lines")
+        for line_number, message in errors[:MAX_REPORTED_ERRORS]:
+            click.echo(f"  line {line_number}: {message}")
+        if len(errors) > MAX_REPORTED_ERRORS:
+            click.echo(f"  ... and {len(errors) - MAX_REPORTED_ERRORS} more")
+    else:
+        click.echo(f"✓ {filename} loaded successfully")
+    click.echo(f"  {stats['commands']} commands in {elapsed:.2f} seconds ({rate:.0f} commands/second)")
 
 def _display_load_statistics(client):
     """Display stats after successful data load"""
@@ -80,25 +136,54 @@ def _display_load_statistics(client):
     actor_count = len(list(client.scan_iter(match="actor:*", count=100)))
     click.echo(f"\n✓ Data load complete: {movie_count} movies, {actor_count} actors")
 
-def generate_embeddings_for_movies(show_progress=True):
-    """Generate vector embeddings for all movie plots"""
-    config = RedisConfig(decode_responses=False)  # binary client for vectors
-    client = config.get_client()
-    text_client = RedisConfig(decode_responses=True).get_client()
-    embeddings_model = MovieEmbeddings()
+def generate_embeddings_for_movies(show_progress=True, batch_size=DEFAULT_BATCH_SIZE, workers=1, force=False):
+    """Generate vector embeddings for changed movie plots in batches, resuming an interrupted pass unless force"""
+    config = RedisConfig()
+    client = config.get_binary_client()  # binary client for vectors
+    text_client = config.get_text_client()
+    workers = workers or os.cpu_count() or 1
+    model_name = config.embedding_model
     
-    movie_keys = _get_all_movie_keys(text_client)
+    total = len(_get_all_movie_keys(text_client))
+    checkpoint = _load_checkpoint(text_client, model_name, total, force)
+    stats = _new_embedding_stats(checkpoint)
+    batches = _scan_movie_batches(text_client, checkpoint['cursor'] if checkpoint else 0, batch_size)
     
     if show_progress:
-        click.echo(f"\nFound {len(movie_keys)} movies to process")
+        click.echo(f"\nFound {total} movies to process (batch size {batch_size}"
+                   + (f", {workers} workers)" if workers > 1 else ")"))
+        if checkpoint:
+            click.echo(f"Resuming from checkpoint: {stats['seen']} movies already done")
+    
+    if workers > 1:
+        _process_embeddings_parallel(batches, total, stats, text_client, config, workers, show_progress, force)
+    else:
+        from src.core.embeddings import MovieEmbeddings
+        
+        embeddings_model = MovieEmbeddings(
+            model_name,
+            cache_dir=config.embedding_cache_dir, cache_size=config.embedding_cache_size,
+            daemon_socket=config.embedding_socket, vector_type=config.vector_type
+        )
+        try:
+            _process_embeddings(batches, total, stats, text_client, client, embeddings_model, show_progress, force)
+        finally:
+            if embeddings_model.cache is not None:
+                embeddings_model.cache.flush()
+                stats['cache'] = embeddings_model.cache.stats()
     
-    stats = _process_embeddings(movie_keys, text_client, client, embeddings_model, show_progress)
+    text_client.delete(CHECKPOINT_KEY)  # pass complete
+    bump_index_version(client)
     
     if show_progress:
         _display_embedding_statistics(stats)
     
     return stats['processed'], stats['skipped'], stats['errors']
 
+def plot_hash(plot):
+    """Content hash of a plot, stored next to its embedding to detect changes"""
+    return hashlib.blake2b(plot.encode('utf-8'), digest_size=16).hexdigest()
+
 def _get_all_movie_keys(client):
     """Retrieve all movie keys from Redis"""
     movie_keys = []
@@ -110,59 +195,199 @@ def _get_all_movie_keys(client):
             break
     return movie_keys
 
-def _process_embeddings(movie_keys, text_client, binary_client, embeddings_model, show_progress):
-    """Process embeddings for all movies with optional progress display"""
-    stats = {'processed': 0, 'skipped': 0, 'errors': 0, 'start_time': time.time()}
-    
-    if show_progress:
-        with click.progressbar(movie_keys, label='Processing movies') as bar:
-            for key in bar:
-                _update_embedding_stats(stats, text_client, binary_client, embeddings_model, key)
-    else:
-        for key in movie_keys:
-            _update_embedding_stats(stats, text_client, binary_client, embeddings_model, key)
+def _scan_movie_batches(client, cursor, batch_size):
+    """Yield (keys, cursor) batches from a SCAN - cursor is set only on the last batch of each page"""
+    while True:
+        cursor, keys = client.scan(cursor, match="movie:*", count=batch_size * 4)
+        chunks = _chunk_keys(keys, batch_size)
+        if not chunks:
+            yield [], cursor
+        for i, chunk in enumerate(chunks):
+            yield chunk, cursor if i == len(chunks) - 1 else None
+        if cursor == 0:
+            break
+
+def _chunk_keys(keys, size):
+    """Split a list of keys into consecutive chunks of at most size keys"""
+    return [keys[i:i + size] for i in range(0, len(keys), size)]
+
+def _load_checkpoint(client, model_name, total, force):
+    """Return the saved checkpoint if it belongs to this model and keyspace, otherwise clear it"""
+    checkpoint = client.hgetall(CHECKPOINT_KEY)
+    if not force and checkpoint.get('model') == model_name and checkpoint.get('total') == str(total):
+        return checkpoint
+    client.delete(CHECKPOINT_KEY)
+    return None
+
+def _new_embedding_stats(checkpoint=None):
+    """Fresh statistics, carrying over the counts of a resumed run"""
+    stats = {'processed': 0, 'skipped': 0, 'unchanged': 0, 'errors': 0, 'seen': 0}
+    if checkpoint:
+        for name in stats:
+            stats[name] = int(checkpoint.get(name, 0))
+    stats['resumed'] = stats['processed']
+    stats['start_time'] = time.time()
+    return stats
+
+def _process_embeddings(batches, total, stats, text_client, binary_client, embeddings_model, show_progress, force=False):
+    """Process embeddings for (keys, cursor) batches with optional progress display"""
+    def results():
+        for keys, cursor in batches:
+            counts = _process_movie_batch(text_client, binary_client, embeddings_model, keys, force)
+            # save the cache with the checkpoint, a resumed run trusts both
+            if embeddings_model.cache is not None:
+                embeddings_model.cache.flush()
+            yield len(keys), counts, cursor
     
+    _consume_batch_results(results(), total, stats, text_client, embeddings_model.model_name,
+                           show_progress, 'Processing movies')
+    return stats
+
+def _process_embeddings_parallel(batches, total, stats, text_client, config, workers, show_progress, force=False):
+    """Shard key batches across a process pool, each worker with its own model and connections"""
+    # spawn, not fork: children must not share the parent's sockets or torch state
+    context = multiprocessing.get_context('spawn')
+    with context.Pool(workers, initializer=_init_embedding_worker,
+                      initargs=(config.embedding_model, config.vector_type, workers, force)) as pool:
+        # ordered results, so a checkpointed cursor never gets ahead of unfinished batches
+        results = pool.imap(_embed_batch_in_worker, batches)
+        _consume_batch_results(results, total, stats, text_client, config.embedding_model,
+                               show_progress, f'Processing movies ({workers} workers)')
     return stats
 
-def _update_embedding_stats(stats, text_client, binary_client, embeddings_model, key):
-    """Update statistics based on embedding processing result"""
-    success, skip, error = _process_movie_embedding(text_client, binary_client, embeddings_model, key)
+def _consume_batch_results(results, total, stats, text_client, model_name, show_progress, label):
+    """Add (key count, counts, cursor) batch results to stats and checkpoint completed SCAN pages"""
+    if not show_progress:
+        for count, counts, cursor in results:
+            _record_batch(stats, count, counts, cursor, text_client, model_name, total)
+        return
+    
+    with click.progressbar(length=total, label=label) as bar:
+        bar.update(stats['seen'])
+        for count, counts, cursor in results:
+            _record_batch(stats, count, counts, cursor, text_client, model_name, total)
+            bar.update(count)
+
+def _record_batch(stats, count, counts, cursor, text_client, model_name, total):
+    """Add one batch's (success, skip, unchanged, error) counts and save the checkpoint"""
+    success, skip, unchanged, error = counts
     stats['processed'] += success
     stats['skipped'] += skip
+    stats['unchanged'] += unchanged
     stats['errors'] += error
+    stats['seen'] += count
+    if cursor is not None:
+        text_client.hset(CHECKPOINT_KEY, mapping={
+            'cursor': cursor, 'model': model_name, 'total': total,
+            **{name: stats[name] for name in ('processed', 'skipped', 'unchanged', 'errors', 'seen')}
+        })
+
+_worker_state = {}  # per-process model and clients, set by _init_embedding_worker
+
+def _init_embedding_worker(model_name, vector_type, workers, force):
+    """Load the model and open connections once per worker process"""
+    try:
+        import torch
+        # split the cores between workers instead of every worker using all of them
+        torch.set_num_threads(max(1, (os.cpu_count() or 1) // workers))
+    except ImportError:
+        pass
+    from src.core.embeddings import MovieEmbeddings
+    
+    config = RedisConfig()
+    _worker_state['force'] = force
+    try:
+        # no disk cache or daemon here: the cache has a single writer and the
+        # daemon would serialize the workers again
+        _worker_state['model'] = MovieEmbeddings(model_name, vector_type=vector_type)
+        _worker_state['model'].model
+        _worker_state['text_client'] = config.get_text_client()
+        _worker_state['binary_client'] = config.get_binary_client()
+    except Exception as e:
+        # a failing initializer makes the pool respawn workers forever,
+        # so keep the error and raise it from the first task instead
+        _worker_state['error'] = e
+
+def _embed_batch_in_worker(batch):
+    """Encode and store one (keys, cursor) batch in a worker - returns (key count, counts, cursor)"""
+    if 'error' in _worker_state:
+        raise RuntimeError(f"embedding worker failed to start: {_worker_state['error']}")
+    keys, cursor = batch
+    counts = _process_movie_batch(
+        _worker_state['text_client'], _worker_state['binary_client'], _worker_state['model'],
+        keys, _worker_state['force']
+    )
+    return len(keys), counts, cursor
 
 def _display_embedding_statistics(stats):
     """Display embedding generation statistics"""
     elapsed = time.time() - stats['start_time']
-    rate = stats['processed'] / elapsed if elapsed > 0 else 0
+    rate = (stats['processed'] - stats.get('resumed', 0)) / elapsed if elapsed > 0 else 0
     
     click.echo(f"\n✓ Embedding generation complete:")
     click.echo(f"  Processed: {stats['processed']} movies")
     click.echo(f"  Skipped: {stats['skipped']} (no plot)")
+    click.echo(f"  Unchanged: {stats['unchanged']} (plot already embedded by this model)")
     click.echo(f"  Errors: {stats['errors']}")
     click.echo(f"  Time: {elapsed:.2f} seconds")
     click.echo(f"  Rate: {rate:.1f} movies/second")
+    
+    if 'cache' in stats:
+        cache = stats['cache']
+        click.echo(f"  Cache: {cache['hits']} hits, {cache['misses']} misses "
+                   f"({cache['hit_rate']:.1%} hit rate, {cache['entries']}/{cache['capacity']} entries)")
+
+def _fetch_plots(text_client, keys):
+    """Fetch plot, plot_hash, embedding_model and embedding_type of every key with one pipelined round trip"""
+    pipe = text_client.pipeline(transaction=False)
+    for key in keys:
+        pipe.hmget(key, 'plot', 'plot_hash', 'embedding_model', 'embedding_type')
+    return pipe.execute()
 
-def _process_movie_embedding(text_client, binary_client, embeddings_model, key):
-    """Process embedding for a single movie - returns (success, skip, error)"""
+def _process_movie_batch(text_client, binary_client, embeddings_model, keys, force=False):
+    """Process embeddings for a batch of movies - returns (success, skip, unchanged, error) counts"""
+    if not keys:
+        return 0, 0, 0, 0
     try:
-        movie_data = text_client.hgetall(key)
-        plot = movie_data.get('plot', '').strip()
-        
+        rows = _fetch_plots(text_client, keys)
+    except Exception:
+        return 0, 0, 0, len(keys)  # Error - whole batch unreadable
+    
+    valid = []
+    unchanged = 0
+    for key, (plot, stored_hash, stored_model, stored_type) in zip(keys, rows):
+        plot = (plot or '').strip()
         if not plot or plot == 'N/A':
-            return 0, 1, 0  # Skip - no valid plot
-        
-        embedding = embeddings_model.generate_embedding(plot)
-        if embedding is None:
-            return 0, 1, 0  # Skip - embedding generation failed
+            continue
+        digest = plot_hash(plot)
+        # vectors written before types were recorded are FLOAT32
+        if (not force and stored_hash == digest and stored_model == embeddings_model.model_name
+                and (stored_type or 'FLOAT32') == embeddings_model.vector_type):
+            unchanged += 1  # Unchanged - embedded from this exact plot already
+            continue
+        valid.append((key, plot, digest))
+    skipped = len(keys) - len(valid) - unchanged  # Skip - no valid plot
+    
+    if not valid:
+        return 0, skipped, unchanged, 0
+    
+    try:
+        embeddings = embeddings_model.generate_embeddings(
+            [plot for _, plot, _ in valid], batch_size=len(valid)
+        )
         
-        embedding_bytes = embeddings_model.embedding_to_bytes(embedding)
-        binary_client.hset(key, 'plot_embedding', embedding_bytes)
+        pipe = binary_client.pipeline(transaction=False)
+        for (key, _, digest), blob in zip(valid, embeddings_model.embeddings_to_bytes(embeddings)):
+            pipe.hset(key, mapping={
+                'plot_embedding': blob, 'plot_hash': digest,
+                'embedding_model': embeddings_model.model_name, 'embedding_type': embeddings_model.vector_type
+            })
+        pipe.execute()
         
-        return 1, 0, 0  # Success
+        return len(valid), skipped, unchanged, 0  # Success
         
     except Exception:
-        return 0, 0, 1  # Error
+        return 0, skipped, unchanged, len(valid)  # Error
 
 if __name__ == "__main__":
     load_all_data()
\ No newline at end of file
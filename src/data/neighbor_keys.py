@@ -0,0 +1,19 @@
+# Key layout of the precomputed neighbor graph, kept free of heavy imports so
+# search code can read the graph without pulling in numpy or the loader
+
+NEIGHBOR_PREFIX = "similar:"  # similar:movie:N sorted sets, outside the movie:* keyspace
+NEIGHBOR_HASHES_KEY = "similar:hashes"  # movie key -> fingerprint of the vector its neighbors came from
+
+def neighbor_key(movie_key):
+    """Key of the sorted set holding a movie's precomputed neighbors"""
+    if isinstance(movie_key, bytes):
+        movie_key = movie_key.decode('utf-8')
+    return NEIGHBOR_PREFIX + movie_key
+
+def vector_fingerprint(model_name, plot_hash):
+    """Identify the vector a movie had when its neighbors were computed"""
+    if isinstance(model_name, bytes):
+        model_name = model_name.decode('utf-8')
+    if isinstance(plot_hash, bytes):
+        plot_hash = plot_hash.decode('utf-8')
+    return f"{model_name}:{plot_hash}"
@@ -0,0 +1,190 @@
+import time
+from collections import Counter
+import click
+import numpy as np
+from src.core.config import RedisConfig
+from src.core.embeddings import storage_to_vectors, vector_element_size
+from src.data.loader import _get_all_movie_keys, _chunk_keys
+from src.data.neighbor_keys import NEIGHBOR_PREFIX, NEIGHBOR_HASHES_KEY, neighbor_key, vector_fingerprint
+from src.utils.metrics import peak_rss_mb
+
+DEFAULT_NEIGHBORS = 10  # neighbors stored per movie
+DEFAULT_BLOCK_SIZE = 1024  # movies scored per matrix multiplication
+NEIGHBOR_META_KEY = "similar:meta"  # k, model and timings of the last build
+READ_CHUNK_SIZE = 1000  # keys per pipeline when reading vectors and neighbor sets
+
+def build_neighbor_graph(k=DEFAULT_NEIGHBORS, block_size=DEFAULT_BLOCK_SIZE, changed_only=False, show_progress=True):
+    """Compute the exact top-k cosine neighbors of every movie and store them as sorted sets"""
+    config = RedisConfig()
+    client = config.get_binary_client()
+    text_client = config.get_text_client()
+    start = time.perf_counter()
+
+    keys, matrix, fingerprints = _load_vectors(client, _get_all_movie_keys(text_client), config.vector_type)
+    if not keys:
+        click.echo("No plot embeddings found - run setup first")
+        return None
+    load_seconds = time.perf_counter() - start
+
+    previous = {_to_text(key): _to_text(value) for key, value in client.hgetall(NEIGHBOR_HASHES_KEY).items()}
+    stored_k = client.hget(NEIGHBOR_META_KEY, 'k')
+    current = set(keys)
+    removed = [key for key in previous if key not in current]
+
+    if changed_only and previous and stored_k is not None and int(stored_k) == k:
+        rows = _rows_to_refresh(client, keys, matrix, fingerprints, previous, removed, k)
+    else:
+        rows = np.arange(len(keys))
+        removed = removed if changed_only else _stale_neighbor_keys(text_client, keys)
+
+    if show_progress:
+        click.echo(f"\nComputing {k} neighbors for {len(rows)} of {len(keys)} movies (block size {block_size})")
+
+    compute_start = time.perf_counter()
+    _compute_neighbors(client, keys, matrix, fingerprints, rows, k, block_size, show_progress)
+    _remove_neighbors(client, removed)
+    compute_seconds = time.perf_counter() - compute_start
+
+    block_rows = min(block_size, len(rows)) if len(rows) else 0
+    stats = {
+        'movies': len(keys),
+        'refreshed': len(rows),
+        'removed': len(removed),
+        'k': k,
+        'load_seconds': round(load_seconds, 3),
+        'compute_seconds': round(compute_seconds, 3),
+        'total_seconds': round(time.perf_counter() - start, 3),
+        'matrix_mb': round(matrix.nbytes / (1024 * 1024), 1),
+        # similarity block, its negation and the argpartition indices
+        'block_mb': round(block_rows * len(keys) * (4 + 4 + 8) / (1024 * 1024), 1),
+        'peak_rss_mb': peak_rss_mb(),
+    }
+    client.hset(NEIGHBOR_META_KEY, mapping={
+        'k': k, 'model': config.embedding_model, 'movies': len(keys),
+        'built_at': int(time.time()), 'seconds': stats['total_seconds'],
+    })
+
+    if show_progress:
+        _display_neighbor_statistics(stats)
+    return stats
+
+def _load_vectors(client, movie_keys, vector_type='FLOAT32'):
+    """Read every plot_embedding of vector_type into one unit-normalized float32 matrix - returns (keys, matrix, fingerprints)"""
+    keys, blobs, fingerprints = [], [], []
+    for chunk in _chunk_keys(sorted(movie_keys), READ_CHUNK_SIZE):
+        pipe = client.pipeline(transaction=False)
+        for key in chunk:
+            pipe.hmget(key, 'plot_embedding', 'embedding_model', 'plot_hash', 'embedding_type')
+        for key, (blob, model_name, plot_hash, stored_type) in zip(chunk, pipe.execute()):
+            # blobs of another type are mid-migration, leave them out
+            if blob and _to_text(stored_type or 'FLOAT32') == vector_type:
+                keys.append(key)
+                blobs.append(blob)
+                fingerprints.append(vector_fingerprint(model_name or '', plot_hash or ''))
+
+    if not blobs:
+        return [], np.empty((0, 0), dtype=np.float32), []
+
+    # vectors of another dimension were written by another model, leave them out
+    size = Counter(map(len, blobs)).most_common(1)[0][0]
+    kept = [i for i, blob in enumerate(blobs) if len(blob) == size]
+    matrix = storage_to_vectors(b"".join(blobs[i] for i in kept), vector_type)
+    matrix = matrix.reshape(len(kept), size // vector_element_size(vector_type)).copy()
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    np.divide(matrix, norms, out=matrix, where=norms > 0)
+    return [keys[i] for i in kept], matrix, [fingerprints[i] for i in kept]
+
+def _rows_to_refresh(client, keys, matrix, fingerprints, previous, removed, k):
+    """Rows whose neighbor lists can differ after the changed movies moved
+
+    Changed movies are recomputed, and so is any movie that listed a changed
+    or removed movie or that a changed movie now beats its k-th neighbor.
+    """
+    changed = [i for i, (key, fingerprint) in enumerate(zip(keys, fingerprints)) if previous.get(key) != fingerprint]
+    if not changed and not removed:
+        return np.arange(0)
+
+    changed_set = set(changed)
+    moved = {keys[i] for i in changed} | set(removed)
+    others = [i for i in range(len(keys)) if i not in changed_set]
+    refresh = list(changed)
+
+    for chunk in _chunk_keys(others, READ_CHUNK_SIZE):
+        pipe = client.pipeline(transaction=False)
+        for i in chunk:
+            pipe.zrange(neighbor_key(keys[i]), 0, -1, withscores=True)
+        lists = pipe.execute()
+
+        # closest changed movie to each unchanged row, as cosine distance
+        nearest = 1.0 - (matrix[chunk] @ matrix[changed].T).max(axis=1) if changed else None
+        for position, (i, neighbors) in enumerate(zip(chunk, lists)):
+            if len(neighbors) < min(k, len(keys) - 1) or any(_to_text(key) in moved for key, _ in neighbors):
+                refresh.append(i)
+            elif nearest is not None and nearest[position] < neighbors[-1][1]:
+                refresh.append(i)
+
+    return np.array(sorted(refresh), dtype=np.int64)
+
+def _compute_neighbors(client, keys, matrix, fingerprints, rows, k, block_size, show_progress):
+    """Score row blocks against the whole matrix and write each row's top k"""
+    k = min(k, len(keys) - 1)
+    blocks = [rows[i:i + block_size] for i in range(0, len(rows), block_size)]
+    if k <= 0 or not blocks:
+        return
+
+    if show_progress:
+        with click.progressbar(blocks, label='Scoring blocks') as bar:
+            for block in bar:
+                _score_block(client, keys, matrix, fingerprints, block, k)
+    else:
+        for block in blocks:
+            _score_block(client, keys, matrix, fingerprints, block, k)
+
+def _score_block(client, keys, matrix, fingerprints, block, k):
+    """Exact top k for one block of rows, stored as distance-ordered sorted sets"""
+    similarities = matrix[block] @ matrix.T
+    similarities[np.arange(len(block)), block] = -np.inf  # a movie is not its own neighbor
+
+    top = np.argpartition(-similarities, k - 1, axis=1)[:, :k]
+    top_scores = np.take_along_axis(similarities, top, axis=1)
+
+    pipe = client.pipeline(transaction=False)
+    for row, neighbors, scores in zip(block, top, top_scores):
+        key = neighbor_key(keys[row])
+        pipe.delete(key)
+        # cosine distance, the same score the KNN queries return
+        pipe.zadd(key, {keys[j]: float(1.0 - score) for j, score in zip(neighbors, scores)})
+    pipe.hset(NEIGHBOR_HASHES_KEY, mapping={keys[row]: fingerprints[row] for row in block})
+    pipe.execute()
+
+def _remove_neighbors(client, removed):
+    """Drop the neighbor sets and fingerprints of movies that no longer have a vector"""
+    for chunk in _chunk_keys(list(removed), READ_CHUNK_SIZE):
+        pipe = client.pipeline(transaction=False)
+        for key in chunk:
+            pipe.delete(neighbor_key(key))
+        pipe.hdel(NEIGHBOR_HASHES_KEY, *chunk)
+        pipe.execute()
+
+def _stale_neighbor_keys(text_client, keys):
+    """Movies with a stored neighbor set but no vector any more"""
+    current = set(keys)
+    stale = []
+    for key in text_client.scan_iter(match=NEIGHBOR_PREFIX + "movie:*", count=1000):
+        movie_key = key[len(NEIGHBOR_PREFIX):]
+        if movie_key not in current:
+            stale.append(movie_key)
+    return stale
+
+def _display_neighbor_statistics(stats):
+    """Display neighbor graph build statistics"""
+    click.echo(f"\n✓ Neighbor graph complete:")
+    click.echo(f"  Movies: {stats['movies']} ({stats['refreshed']} recomputed, {stats['removed']} removed)")
+    click.echo(f"  Time: {stats['total_seconds']:.2f} seconds "
+               f"(load {stats['load_seconds']:.2f}, compute {stats['compute_seconds']:.2f})")
+    peak = f", {stats['peak_rss_mb']:.1f} MB peak RSS" if stats['peak_rss_mb'] is not None else ""
+    click.echo(f"  Memory: {stats['matrix_mb']:.1f} MB vectors, {stats['block_mb']:.1f} MB per block{peak}")
+
+def _to_text(value):
+    """Decode binary client values"""
+    return value.decode('utf-8') if isinstance(value, bytes) else value
@@ -0,0 +1,160 @@
+import time
+import click
+from src.core.config import RedisConfig
+from src.core.embeddings import (
+    storage_to_vectors, vectors_to_storage, vector_element_size, embedding_dimension, VECTOR_TYPES
+)
+from src.core.indexes import get_vector_profile
+from src.data.indexer import create_movie_index_with_vectors
+from src.data.loader import _get_all_movie_keys, _chunk_keys
+from src.search.result_cache import bump_index_version
+
+DEFAULT_MIGRATION_CHUNK = 500  # movies per read and write pipeline
+STAGING_FIELD = 'plot_embedding_next'  # converted vectors wait here until an index serves them
+
+def migrate_to_profile(profile_name, chunk_size=DEFAULT_MIGRATION_CHUNK, show_progress=True):
+    """Move stored vectors and the vector index to a profile without a search outage, returns migration statistics
+
+    Rewriting plot_embedding in place would drop every converted movie from
+    the live index, so the converted vectors are staged in STAGING_FIELD and
+    an index version reading them is swapped in behind the alias first. Only
+    then are they copied over plot_embedding, the final index version is
+    built on it and the staged copies are deleted. Returns None when the
+    staged index could not be built, nothing live has changed then.
+    """
+    profile = get_vector_profile(profile_name)
+    config = RedisConfig()
+    client = config.get_binary_client()
+    text_client = config.get_text_client()
+
+    stats = migrate_vector_type(profile['type'], chunk_size, show_progress, staging_field=STAGING_FIELD)
+    if not create_movie_index_with_vectors(text_client, profile_name, vector_source=STAGING_FIELD):
+        _delete_staged_vectors(client, text_client, chunk_size)
+        return None
+
+    _promote_staged_vectors(client, text_client, profile['type'], chunk_size)
+    if not create_movie_index_with_vectors(text_client, profile_name):
+        # searches keep running on the staged vectors, a rerun finishes the move
+        click.echo(f"Staged {profile['type']} vectors are still served from {STAGING_FIELD}, "
+                   f"run migrate-vectors again to finish", err=True)
+        return stats
+    _delete_staged_vectors(client, text_client, chunk_size)
+    return stats
+
+def migrate_vector_type(target_type, chunk_size=DEFAULT_MIGRATION_CHUNK, show_progress=True, staging_field=None):
+    """Rewrite every stored plot_embedding in target_type, returns migration statistics
+
+    Each blob is decoded with its embedding_type field, vectors written before
+    the field existed are FLOAT32 as in the loader. Blobs that do not hold
+    exactly one vector of the model's dimension are skipped as errors. Blobs
+    already in target_type are left alone, so an interrupted migration can
+    simply be run again.
+
+    With staging_field set plot_embedding is not touched, every vector is
+    written to staging_field in target_type instead (see migrate_to_profile).
+    """
+    if target_type not in VECTOR_TYPES:
+        raise ValueError(f"unknown vector type {target_type}, expected one of {', '.join(VECTOR_TYPES)}")
+
+    config = RedisConfig()
+    client = config.get_binary_client()
+    text_client = config.get_text_client()
+    dimension = embedding_dimension(config.embedding_model, config.embedding_dim)
+    start = time.perf_counter()
+
+    keys = sorted(_get_all_movie_keys(text_client))
+    stats = {'converted': 0, 'unchanged': 0, 'missing': 0, 'errors': 0, 'bytes_before': 0, 'bytes_after': 0}
+    chunks = _chunk_keys(keys, chunk_size)
+
+    if show_progress:
+        with click.progressbar(chunks, label=f'Converting vectors to {target_type}') as bar:
+            for chunk in bar:
+                _migrate_chunk(client, chunk, dimension, target_type, stats, staging_field)
+    else:
+        for chunk in chunks:
+            _migrate_chunk(client, chunk, dimension, target_type, stats, staging_field)
+
+    if stats['converted']:
+        bump_index_version(client)
+    stats['total_seconds'] = round(time.perf_counter() - start, 3)
+    if show_progress:
+        _display_migration_statistics(stats, target_type)
+    return stats
+
+def _migrate_chunk(client, chunk, dimension, target_type, stats, staging_field=None):
+    """Convert one chunk of movies with one read and one write pipeline"""
+    pipe = client.pipeline(transaction=False)
+    writes = 0
+    for key, (blob, stored_type) in zip(chunk, _read_pipeline(client, chunk)):
+        if not blob:
+            stats['missing'] += 1
+            continue
+        # vectors written before types were recorded are FLOAT32
+        source_type = _to_text(stored_type) or 'FLOAT32'
+        stats['bytes_before'] += len(blob)
+        try:
+            if len(blob) != dimension * vector_element_size(source_type):
+                raise ValueError(f"{len(blob)} bytes is not one {dimension}-dimension {source_type} vector")
+            if source_type == target_type:
+                stats['unchanged'] += 1
+                stats['bytes_after'] += len(blob)
+                if staging_field:
+                    pipe.hset(key, staging_field, blob)
+                    writes += 1
+                continue
+            converted = vectors_to_storage(storage_to_vectors(blob, source_type), target_type).tobytes()
+        except ValueError as e:
+            stats['errors'] += 1
+            click.echo(f"\nSkipping {_to_text(key)}: {e}", err=True)
+            continue
+        if staging_field:
+            pipe.hset(key, staging_field, converted)
+        else:
+            pipe.hset(key, mapping={'plot_embedding': converted, 'embedding_type': target_type})
+        stats['converted'] += 1
+        stats['bytes_after'] += len(converted)
+        writes += 1
+    if writes:
+        pipe.execute()
+
+def _promote_staged_vectors(client, text_client, target_type, chunk_size):
+    """Copy staged vectors over plot_embedding, the live index keeps reading the staged field meanwhile"""
+    for chunk in _chunk_keys(sorted(_get_all_movie_keys(text_client)), chunk_size):
+        pipe = client.pipeline(transaction=False)
+        for key in chunk:
+            pipe.hget(key, STAGING_FIELD)
+        staged = pipe.execute()
+        pipe = client.pipeline(transaction=False)
+        for key, blob in zip(chunk, staged):
+            if blob:
+                pipe.hset(key, mapping={'plot_embedding': blob, 'embedding_type': target_type})
+        pipe.execute()
+    bump_index_version(client)
+
+def _delete_staged_vectors(client, text_client, chunk_size):
+    """Remove the staged copies once no index reads them"""
+    for chunk in _chunk_keys(sorted(_get_all_movie_keys(text_client)), chunk_size):
+        pipe = client.pipeline(transaction=False)
+        for key in chunk:
+            pipe.hdel(key, STAGING_FIELD)
+        pipe.execute()
+
+def _read_pipeline(client, chunk):
+    """Read the vector and its stored type for a chunk of movies"""
+    pipe = client.pipeline(transaction=False)
+    for key in chunk:
+        pipe.hmget(key, 'plot_embedding', 'embedding_type')
+    return pipe.execute()
+
+def _display_migration_statistics(stats, target_type):
+    """Display vector migration statistics"""
+    click.echo(f"\n✓ Vector migration to {target_type} complete:")
+    click.echo(f"  Converted: {stats['converted']} movies ({stats['unchanged']} already {target_type}, "
+               f"{stats['missing']} without a vector, {stats['errors']} errors)")
+    click.echo(f"  Vector bytes: {stats['bytes_before'] / (1024 * 1024):.1f} MB -> "
+               f"{stats['bytes_after'] / (1024 * 1024):.1f} MB")
+    click.echo(f"  Time: {stats['total_seconds']:.2f} seconds")
+
+def _to_text(value):
+    """Decode binary client values"""
+    return value.decode('utf-8') if isinstance(value, bytes) else value
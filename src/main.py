@@ -15,9 +15,14 @@ if src_dir.name == 'src':
     project_root = src_dir.parent
     sys.path.insert(0, str(project_root / 'src'))
 
+# keep module-level imports light - the embedding model, numpy and the
+# search modules are imported inside the commands that use them
 from src.core.config import RedisConfig
-from src.data.indexer import create_all_indexes, create_movie_index_with_vectors
-from src.data.loader import load_all_data, generate_embeddings_for_movies
+from src.core.indexes import VECTOR_PROFILES
+from src.data.loader import DEFAULT_BATCH_SIZE, DEFAULT_CHUNK_SIZE
+
+# scenario names of src.bench.runner.SCENARIOS, listed here so the CLI does not import the bench
+BENCH_SCENARIOS = ['traditional', 'knn', 'hybrid', 'similar', 'encode', 'load', 'embed']
 
 @click.group()
 def cli():
@@ -27,7 +32,15 @@ def cli():
     pass
 
 @cli.command()
-def setup():
+@click.option('--batch-size', type=click.IntRange(min=1), default=DEFAULT_BATCH_SIZE,
+              show_default=True, help='Movie plots encoded per model call')
+@click.option('--chunk-size', type=click.IntRange(min=1), default=DEFAULT_CHUNK_SIZE,
+              show_default=True, help='Commands sent per pipeline when loading data files')
+@click.option('--workers', type=click.IntRange(min=0), default=1,
+              show_default=True,
+              help='Processes generating embeddings (0 = one per CPU), more than 1 skips the cache and daemon')
+@click.option('--force', is_flag=True, help='Re-embed every plot, ignoring stored hashes and checkpoints')
+def setup(batch_size, chunk_size, workers, force):
     """
     setup redis with movie data and create search indexes
     """
@@ -40,11 +53,11 @@ def setup():
     choice = click.prompt("\nEnter your choice (1-4)", type=int)
     
     if choice == 1:
-        _setup_advanced_demo()  # vector search
+        _setup_advanced_demo(batch_size, chunk_size, workers, force)  # vector search
     elif choice == 2:
-        _setup_basic_demo()     # traditional search
+        _setup_basic_demo(chunk_size)  # traditional search
     elif choice == 3:
-        _setup_upgrade()        # add vectors to existing data
+        _setup_upgrade(batch_size, workers, force)  # add vectors to existing data
     elif choice == 4:
         return
     else:
@@ -65,39 +78,45 @@ def _show_setup_options():
     click.echo("\n3. Upgrade existing data with vector search")
     click.echo("\n4. Exit")
 
-def _setup_advanced_demo():
+def _setup_advanced_demo(batch_size=DEFAULT_BATCH_SIZE, chunk_size=DEFAULT_CHUNK_SIZE, workers=1, force=False):
     """
     setup vector search with embeddings
     """
+    from src.data.indexer import create_all_indexes
+    from src.data.loader import load_all_data, generate_embeddings_for_movies
+    
     click.echo("\nSetting up vector search demo...")
     
     if not create_all_indexes(with_vectors=True):
         click.echo("Failed to create indexes")
         return
         
-    if not load_all_data():
+    if not load_all_data(chunk_size):
         click.echo("Failed to load data")
         return
     
     click.echo("Generating embeddings for movie plots...")
-    generate_embeddings_for_movies()
+    generate_embeddings_for_movies(batch_size=batch_size, workers=workers, force=force)
     
     click.echo("\nSetup complete. Run: python3 run.py search-advanced")
     click.echo("\nExamples:")
     click.echo("  space adventure with aliens")
     click.echo("  superhero movie | genre:Action year>2010")
 
-def _setup_basic_demo():
+def _setup_basic_demo(chunk_size=DEFAULT_CHUNK_SIZE):
     """
     setup traditional search without vectors
     """
+    from src.data.indexer import create_all_indexes
+    from src.data.loader import load_all_data
+    
     click.echo("\nSetting up traditional search demo...")
     
     if not create_all_indexes(with_vectors=False):
         click.echo("Failed to create indexes")
         return
         
-    if not load_all_data():
+    if not load_all_data(chunk_size):
         click.echo("Failed to load data")
         return
         
@@ -106,10 +125,13 @@ def _setup_basic_demo():
     click.echo("  @genre:{Action} @rating:[8 +inf]")
     click.echo("  @title:star wars")
 
-def _setup_upgrade():
+def _setup_upgrade(batch_size=DEFAULT_BATCH_SIZE, workers=1, force=False):
     """
     add vector search to existing traditional setup
     """
+    from src.data.indexer import create_movie_index_with_vectors
+    from src.data.loader import generate_embeddings_for_movies
+    
     click.echo("\nUpgrading to vector search...")
     
     config = RedisConfig()
@@ -120,7 +142,7 @@ def _setup_upgrade():
         return
     
     click.echo("Generating embeddings...")
-    generate_embeddings_for_movies()
+    generate_embeddings_for_movies(batch_size=batch_size, workers=workers, force=force)
     
     click.echo("\nUpgrade complete. Run: python3 run.py search-advanced")
     click.echo("\nNew capabilities:")
@@ -143,6 +165,280 @@ def search_advanced():
     from src.search.semantic import run_semantic_search
     run_semantic_search()
 
+@cli.command()
+@click.argument('input_file', type=click.File('r'), default='-')
+@click.option('--output', '-o', type=click.File('w'), default='-', help='JSONL output file (default stdout)')
+@click.option('--concurrency', type=click.IntRange(min=1), default=4, show_default=True,
+              help='Pipelines in flight at once')
+@click.option('--pipeline-size', type=click.IntRange(min=1), default=32, show_default=True,
+              help='Queries per pipeline and per embedding batch')
+@click.option('-k', 'default_k', type=click.IntRange(min=1), default=5, show_default=True,
+              help='Results per natural-language query without k:N')
+def search_batch(input_file, output, concurrency, pipeline_size, default_k):
+    """
+    run a file (or stdin) of queries and stream results as JSONL
+    """
+    from src.search.batch import run_batch_search
+    run_batch_search(input_file, output, concurrency, pipeline_size, default_k)
+
+@cli.command()
+@click.option('--scenario', '-s', 'scenarios', multiple=True, type=click.Choice(BENCH_SCENARIOS),
+              help='Scenario to run, repeatable (default: all)')
+@click.option('--iterations', type=click.IntRange(min=1), default=50, show_default=True,
+              help='Measured operations per scenario')
+@click.option('--warmup', type=click.IntRange(min=0), default=5, show_default=True,
+              help='Unmeasured operations before each scenario')
+@click.option('--seed', type=int, default=42, show_default=True, help='Random seed for inputs')
+@click.option('--dataset-size', type=click.IntRange(min=1), default=200, show_default=True,
+              help='Movies sampled for queries, loads and embedding')
+@click.option('--output', '-o', type=click.File('w'), default='-', help='JSON report file (default stdout)')
+@click.option('--baseline', type=click.File('r'), help='Earlier report to compare p95 latencies against')
+@click.option('--max-regression', type=float, default=0.2, show_default=True,
+              help='Allowed p95 slowdown versus the baseline before failing')
+def bench(scenarios, iterations, warmup, seed, dataset_size, output, baseline, max_regression):
+    """
+    benchmark search, load and embedding paths and report JSON
+    """
+    import json
+    from src.bench.runner import run_benchmarks, compare_reports, write_report
+    
+    report = run_benchmarks(list(scenarios) or None, iterations, warmup, seed, dataset_size)
+    write_report(report, output)
+    
+    if baseline:
+        regressions = compare_reports(report, json.load(baseline), max_regression)
+        for name, before, after in regressions:
+            if after is None:
+                click.echo(f"Regression in {name}: scenario failed - {report['scenarios'][name]['error']}", err=True)
+            else:
+                click.echo(f"Regression in {name}: p95 {before:.2f} ms -> {after:.2f} ms", err=True)
+        if regressions:
+            sys.exit(1)
+
+@cli.command()
+@click.option('--module', '-m', 'modules', multiple=True,
+              help='Module to import (default: the CLI and both search REPLs)')
+@click.option('--top', type=click.IntRange(min=1), default=10, show_default=True,
+              help='Slowest imports to list per module')
+@click.option('--max-ms', type=float, help='Fail if any module takes longer than this to import')
+def import_report(modules, top, max_ms):
+    """
+    show import time per module so startup regressions are visible
+    """
+    from src.utils.importtime import import_time_report
+    
+    failed = False
+    for module in modules or ('src.main', 'src.search.traditional', 'src.search.semantic'):
+        report = import_time_report(module, top)
+        click.echo(f"\n{module}: {report['total_ms']:.1f} ms, {report['modules_imported']} modules")
+        for entry in report['slowest']:
+            click.echo(f"  {entry['cumulative_ms']:8.1f} ms  {entry['module']}")
+        if report['heavy_modules']:
+            click.echo(f"  heavy modules loaded: {', '.join(report['heavy_modules'])}")
+        if max_ms is not None and report['total_ms'] > max_ms:
+            click.echo(f"  over budget ({max_ms:.0f} ms)")
+            failed = True
+    
+    if failed:
+        sys.exit(1)
+
+@cli.command()
+@click.option('--socket', 'socket_path', help='Unix socket path (default: EMBEDDING_SOCKET)')
+@click.option('--status', is_flag=True, help='Check whether a daemon is running and exit')
+def embed_daemon(socket_path, status):
+    """
+    serve the embedding model on a unix socket for other sessions
+    """
+    from src.core.embed_daemon import EmbeddingDaemonClient, serve
+    
+    config = RedisConfig()
+    socket_path = socket_path or config.embedding_socket
+    
+    if status:
+        client = EmbeddingDaemonClient(socket_path, timeout=2.0)
+        if client.available():
+            info = client.ping()
+            click.echo(f"Embedding daemon running on {socket_path}: {info['model']} ({info['dim']}D)")
+        else:
+            click.echo(f"No embedding daemon on {socket_path}")
+        return
+    
+    click.echo(f"Loading {config.embedding_model} and serving on {socket_path} (Ctrl-C to stop)")
+    try:
+        serve(socket_path, config.embedding_model)
+    except KeyboardInterrupt:
+        click.echo("\nEmbedding daemon stopped")
+    except RuntimeError as e:
+        click.echo(str(e))
+
+@cli.command()
+@click.option('-k', 'k', type=click.IntRange(min=1), default=10, show_default=True,
+              help='Neighbors stored per movie')
+@click.option('--block-size', type=click.IntRange(min=1), default=1024, show_default=True,
+              help='Movies scored per matrix multiplication (bounds memory)')
+@click.option('--changed-only', is_flag=True, help='Recompute only movies affected by changed plots')
+def build_neighbors(k, block_size, changed_only):
+    """
+    precompute exact top-k similar movies for instant 'similar to' lookups
+    """
+    from src.data.neighbors import build_neighbor_graph
+    
+    config = RedisConfig()
+    if not config.test_connection():
+        click.echo("Please configure your Redis connection in .env file")
+        return
+    build_neighbor_graph(k, block_size, changed_only)
+
+@cli.command()
+@click.option('--path', help='Index directory (default: FLAT_INDEX_DIR)')
+def build_flat_index(path):
+    """
+    snapshot movie embeddings into a local exact vector index
+    """
+    import time
+    from src.search.flat_index import FlatIndex
+    
+    config = RedisConfig()
+    if not config.test_connection():
+        click.echo("Please configure your Redis connection in .env file")
+        return
+    
+    path = path or config.flat_index_dir
+    start = time.perf_counter()
+    try:
+        flat_index = FlatIndex.build_from_redis(config.get_binary_client(), path, config.embedding_model,
+                                                config.vector_type)
+    except ValueError as e:
+        click.echo(str(e))
+        return
+    click.echo(f"✓ Flat index written to {path}: {len(flat_index)} movies, {flat_index.dimension}D, "
+               f"{flat_index.vectors.nbytes / (1024 * 1024):.1f} MB vectors "
+               f"in {time.perf_counter() - start:.2f} seconds")
+
+@cli.command()
+@click.option('--profile', 'profile_name', required=True, type=click.Choice(sorted(VECTOR_PROFILES)),
+              help='Vector profile to move to')
+@click.option('--no-reindex', is_flag=True,
+              help='Convert stored vectors in place and keep the current vector index (converted movies drop out of it)')
+def migrate_vectors(profile_name, no_reindex):
+    """
+    convert stored embeddings to a profile's vector type and rebuild the vector index
+
+    searches keep running throughout: the converted vectors are served by a
+    staged index version until the final one is built. running searches
+    re-read the live index's vector type when a vector query fails and retry
+    once, so they follow the switch
+    """
+    from src.data.vector_migration import migrate_vector_type, migrate_to_profile
+
+    config = RedisConfig()
+    if not config.test_connection():
+        click.echo("Please configure your Redis connection in .env file")
+        return
+
+    profile = VECTOR_PROFILES[profile_name]
+    if no_reindex:
+        migrate_vector_type(profile['type'])
+    elif migrate_to_profile(profile_name) is None:
+        click.echo("Vector index build failed, stored vectors and the live index are unchanged")
+        return
+    if profile_name != config.vector_profile:
+        click.echo(f"\nSet VECTOR_PROFILE={profile_name} in .env so new embeddings and index rebuilds "
+                   f"use {profile['type']}")
+
+def _int_list(ctx, param, value):
+    """
+    parse a comma-separated option like 8,16,32
+    """
+    try:
+        return tuple(int(item) for item in value.split(',') if item.strip())
+    except ValueError:
+        raise click.BadParameter("expected comma-separated integers, e.g. 8,16,32")
+
+@cli.command()
+@click.option('--m', 'm_values', default='8,16,32', show_default=True, callback=_int_list,
+              help='HNSW M values')
+@click.option('--ef-construction', 'ef_construction_values', default='100,200', show_default=True,
+              callback=_int_list, help='HNSW EF_CONSTRUCTION values')
+@click.option('--ef-runtime', 'ef_runtime_values', default='10,20,50,100', show_default=True,
+              callback=_int_list, help='HNSW EF_RUNTIME values, swept without rebuilding')
+@click.option('-k', 'k', type=click.IntRange(min=1), default=10, show_default=True, help='Neighbors per query')
+@click.option('--queries', type=click.IntRange(min=1), default=200, show_default=True,
+              help='Sampled movie vectors used as queries')
+@click.option('--seed', type=int, default=42, show_default=True, help='Random seed for the query sample')
+@click.option('--no-flat', is_flag=True, help='Skip the FLAT baseline')
+@click.option('--output', '-o', type=click.File('w'), help='Also write the full JSON report here')
+def hnsw_sweep(m_values, ef_construction_values, ef_runtime_values, k, queries, seed, no_flat, output):
+    """
+    sweep HNSW settings and report recall versus latency, build time and memory
+    """
+    from src.bench.hnsw_sweep import run_hnsw_sweep, display_sweep_table, write_sweep_report
+    
+    config = RedisConfig()
+    if not config.test_connection():
+        click.echo("Please configure your Redis connection in .env file")
+        return
+    
+    report = run_hnsw_sweep(m_values, ef_construction_values, ef_runtime_values, k, queries, seed,
+                            include_flat=not no_flat)
+    display_sweep_table(report)
+    if output:
+        write_sweep_report(report, output)
+
+@cli.command()
+@click.option('--sample', type=click.IntRange(min=1), help='Compare on the first N movies only (default: all)')
+@click.option('--output', '-o', type=click.File('w'), help='Also write the full JSON report here')
+def compare_index_layouts(sample, output):
+    """
+    compare index memory and ingest time of the separate and lean index layouts
+    """
+    from src.bench.index_layout import run_layout_comparison, display_layout_table, write_layout_report
+    
+    config = RedisConfig()
+    if not config.test_connection():
+        click.echo("Please configure your Redis connection in .env file")
+        return
+    
+    try:
+        report = run_layout_comparison(sample)
+    except RuntimeError as e:
+        click.echo(str(e))
+        return
+    display_layout_table(report)
+    if output:
+        write_layout_report(report, output)
+
+@cli.command()
+@click.argument('query')
+@click.option('--output', '-o', type=click.File('w', encoding='utf-8'), default='-',
+              help='Output file (default stdout)')
+@click.option('--format', 'output_format', type=click.Choice(['jsonl', 'csv']), default='jsonl', show_default=True,
+              help='Output format')
+@click.option('--index', 'index_name', default='idx:movies', show_default=True, help='Index to query')
+@click.option('--fields', default='title,genre,release_year,rating,plot', show_default=True,
+              help='Comma separated fields to export')
+@click.option('--sortby', help='Sort the whole result set by this field first')
+@click.option('--desc', is_flag=True, help='Sort descending')
+@click.option('--page-size', type=click.IntRange(min=1), help='Rows per cursor read (default: SEARCH_PAGE_SIZE)')
+def export(query, output, output_format, index_name, fields, sortby, desc, page_size):
+    """
+    export every match of a search query to JSONL or CSV, streaming page by page
+    """
+    from src.search.pagination import iter_search_results, export_results
+
+    config = RedisConfig()
+    if not config.test_connection():
+        click.echo("Please configure your Redis connection in .env file")
+        return
+
+    field_names = [field.strip() for field in fields.split(',') if field.strip()]
+    rows = iter_search_results(
+        config.get_text_client(), index_name, query, fields=field_names,
+        page_size=page_size or config.search_page_size, sortby=sortby, descending=desc
+    )
+    count = export_results(rows, output, field_names, output_format)
+    click.echo(f"Exported {count} results", err=True)
+
 @cli.command()
 def demo():
     """
@@ -0,0 +1,277 @@
+"""
+asyncio search api on top of redis.asyncio
+
+mirrors VectorSearch and the traditional REPL so callers can move from the
+sync path without changing how results are consumed. commands, hybrid
+plans and stored neighbor sets come from the same helpers as the sync path
+"""
+import asyncio
+import click
+from src.data.indexer import vector_field_info
+from src.search.planner import HybridPlanner, count_commands, exact_search_command, rank_candidates
+from src.search.vector import (
+    semantic_search_command, hybrid_search_command, range_search_command, parse_search_results,
+    seed_query_vector, exclude_keys, usable_ef_runtime, queue_neighbor_lookup, fresh_neighbors,
+    queue_neighbor_rows, stored_neighbor_results, DEFAULT_RANGE_LIMIT
+)
+from src.utils.parser import parse_redis_command, format_search_command
+
+
+class AsyncVectorSearch:
+    """
+    async vector search - model encoding runs in an executor so the event
+    loop never blocks, searches share one redis.asyncio pool
+
+    unlike VectorSearch there is no result cache, no faceted search and the
+    live vector type is not re-read after a migrate-vectors switch
+    """
+    def __init__(self, client, embeddings_model, query_cache=None, executor=None, planner=None,
+                 vector_algorithm=None):
+        self.client = client
+        self.embeddings_model = embeddings_model
+        self.query_cache = query_cache
+        self.executor = executor
+        self.planner = planner  # HybridPlanner, only its limits are used
+        self.vector_algorithm = vector_algorithm  # FLAT indexes reject EF_RUNTIME
+        self.index_name = "idx:movies_vector"
+
+    @classmethod
+    def from_config(cls, config, embeddings_model, query_cache=None, executor=None, planner=None):
+        """
+        build a search backed by a new binary redis.asyncio pool
+
+        hybrid searches are planned with the limits from config unless a
+        planner is given, and ef_runtime follows the live index's algorithm
+        """
+        sync_client = config.get_binary_client()
+        live_field = vector_field_info(sync_client, "idx:movies_vector") or {}
+        client = config.get_async_client(decode_responses=False)
+        return cls(client, embeddings_model, query_cache=query_cache, executor=executor,
+                   planner=planner or HybridPlanner.from_config(config, sync_client),
+                   vector_algorithm=live_field.get('algorithm') or config.vector_algorithm)
+
+    async def semantic_search(self, query_text, k=5, ef_runtime=None):
+        """
+        perform semantic search using vector similarity
+
+        returns:
+            list of (movie_key, score, movie_data) tuples
+        """
+        query_embedding = await self._encode_query(query_text)
+        if query_embedding is None:
+            return []
+        return await self._search_vector(query_embedding, None, k, ef_runtime)
+
+    async def hybrid_search(self, query_text, filters=None, k=5, ef_runtime=None):
+        """
+        combine vector search with traditional filters, planned like the sync path
+
+        returns:
+            list of (movie_key, score, movie_data) tuples
+        """
+        query_embedding = await self._encode_query(query_text)
+        if query_embedding is None:
+            return []
+        return await self._search_vector(query_embedding, filters, k, ef_runtime)
+
+    async def range_search(self, query_text, radius, filters=None, limit=DEFAULT_RANGE_LIMIT):
+        """
+        every movie within radius cosine distance of the query, closest first
+
+        returns:
+            list of (movie_key, score, movie_data) tuples, at most limit
+        """
+        query_embedding = await self._encode_query(query_text)
+        if query_embedding is None:
+            return []
+        query_bytes = self.embeddings_model.embedding_to_bytes(query_embedding)
+
+        try:
+            results = await self.client.execute_command(
+                *range_search_command(self.index_name, query_bytes, radius, filters, limit)
+            )
+            return parse_search_results(results)
+        except Exception as e:
+            click.echo(f"Range search error: {e}")
+            return []
+
+    async def find_similar_movies(self, movie_keys, k=5):
+        """
+        find movies similar to one or more seed movies
+
+        a single seed is answered from its precomputed neighbor set when
+        that is fresh. otherwise the stored plot_embedding of each seed is
+        the query vector, several seeds are searched with their centroid
+        
+        returns:
+            list of (movie_key, score, movie_data) tuples, seeds excluded
+        """
+        seeds = [movie_keys] if isinstance(movie_keys, (str, bytes)) else list(movie_keys)
+        
+        if len(seeds) == 1:
+            stored = await self._stored_neighbors(seeds[0], k)
+            if stored is not None:
+                return stored
+        
+        pipe = self.client.pipeline(transaction=False)
+        for key in seeds:
+            pipe.hget(key, 'plot_embedding')
+        query_bytes = seed_query_vector(self.embeddings_model, await pipe.execute())
+        if query_bytes is None:
+            return []
+        
+        try:
+            results = await self.client.execute_command(
+                *semantic_search_command(self.index_name, query_bytes, k + len(seeds))
+            )
+            return exclude_keys(parse_search_results(results), seeds, k)
+        except Exception as e:
+            click.echo(f"Similar movies error: {e}")
+            return []
+
+    async def search_many(self, queries, k=5, concurrency=16, ef_runtime=None):
+        """
+        run many semantic/hybrid queries concurrently over the shared pool
+
+        queries is a list of query strings or (query_text, filters) tuples,
+        all query texts are embedded in one batched model call. returns one
+        result list per query, in input order, empty for empty query texts
+        """
+        queries = [(query, None) if isinstance(query, str) else query for query in queries]
+        embeddings = await self._encode_queries([text for text, _ in queries])
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def run(embedding, filters):
+            if embedding is None:
+                return []
+            async with semaphore:
+                return await self._search_vector(embedding, filters, k, ef_runtime)
+
+        return await asyncio.gather(*(
+            run(embedding, filters) for embedding, (_, filters) in zip(embeddings, queries)
+        ))
+
+    async def aclose(self):
+        """
+        release the pool connections
+        """
+        await self.client.aclose()
+
+    async def _search_vector(self, query_embedding, filters, k, ef_runtime=None):
+        """
+        send one KNN query and parse it exactly like the sync path
+        """
+        query_bytes = self.embeddings_model.embedding_to_bytes(query_embedding)
+        ef_runtime = usable_ef_runtime(ef_runtime, self.vector_algorithm)
+
+        try:
+            plan = await self._plan(filters, k)
+            if plan and plan['strategy'] == 'empty':
+                return []
+            if plan and plan['strategy'] == 'exact':
+                reply = await self.client.execute_command(
+                    *exact_search_command(self.index_name, filters, plan['candidates'])
+                )
+                return rank_candidates(reply, query_bytes, self.embeddings_model, k)
+            if filters:
+                args = hybrid_search_command(
+                    self.index_name, query_bytes, filters, k, ef_runtime,
+                    hybrid_policy=plan and plan.get('hybrid_policy'), batch_size=plan and plan.get('batch_size')
+                )
+            else:
+                args = semantic_search_command(self.index_name, query_bytes, k, ef_runtime)
+            results = await self.client.execute_command(*args)
+            return parse_search_results(results)
+        except Exception as e:
+            click.echo(f"Vector search error: {e}")
+            return []
+
+    async def _plan(self, filters, k):
+        """
+        hybrid plan from one counting round trip, None without a planner or filters
+        """
+        if self.planner is None or not filters:
+            return None
+        pipe = self.client.pipeline(transaction=False)
+        for command in count_commands(self.index_name, filters):
+            pipe.execute_command(*command)
+        return self.planner.plan_from_counts(await pipe.execute(), k)
+
+    async def _stored_neighbors(self, movie_key, k):
+        """
+        top k from the neighbor graph, None when it is missing or stale
+        """
+        pipe = self.client.pipeline(transaction=False)
+        queue_neighbor_lookup(pipe, movie_key, k)
+        neighbors = fresh_neighbors(await pipe.execute(), k)
+        if neighbors is None:
+            return None
+
+        pipe = self.client.pipeline(transaction=False)
+        queue_neighbor_rows(pipe, neighbors)
+        return stored_neighbor_results(neighbors, await pipe.execute())
+
+    async def _encode_query(self, query_text):
+        """
+        embed one query off the event loop, through the query cache if set
+        """
+        loop = asyncio.get_running_loop()
+        if self.query_cache is None:
+            return await loop.run_in_executor(
+                self.executor, self.embeddings_model.generate_embedding, query_text
+            )
+        return await loop.run_in_executor(
+            self.executor, self.query_cache.get_or_encode,
+            self.embeddings_model.model_name, query_text, self.embeddings_model.generate_embedding
+        )
+
+    async def _encode_queries(self, query_texts):
+        """
+        embed a list of queries off the event loop in one batched call,
+        None for empty texts as generate_embedding returns
+        """
+        texts = [text for text in query_texts if text]
+        loop = asyncio.get_running_loop()
+        if not texts:
+            encoded = []
+        elif self.query_cache is None:
+            encoded = await loop.run_in_executor(self.executor, self.embeddings_model.generate_embeddings, texts)
+        else:
+            encoded = await loop.run_in_executor(
+                self.executor, self.query_cache.get_many_or_encode,
+                self.embeddings_model.model_name, texts, self.embeddings_model.generate_embeddings
+            )
+        encoded = iter(encoded)
+        return [next(encoded) if text else None for text in query_texts]
+
+
+async def traditional_search(client, command, index_name='idx:movies'):
+    """
+    run one FT.SEARCH command string the way the traditional REPL does
+
+    returns the raw FT.SEARCH reply
+    """
+    cmd = command.strip()
+    if cmd.upper().startswith('FT.SEARCH'):
+        cmd = cmd[9:].strip()
+
+    parts = parse_redis_command(cmd)
+    if not parts:
+        raise ValueError("empty search command")
+    parts = format_search_command(parts, index_name)
+    return await client.execute_command("FT.SEARCH", *parts)
+
+
+async def traditional_search_many(client, commands, index_name='idx:movies', concurrency=16):
+    """
+    run many FT.SEARCH command strings concurrently
+
+    failed commands yield their exception instead of a reply
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(command):
+        async with semaphore:
+            return await traditional_search(client, command, index_name)
+
+    return await asyncio.gather(*(run(command) for command in commands), return_exceptions=True)
@@ -0,0 +1,361 @@
+"""
+non-interactive batch search over files of queries
+"""
+import json
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import click
+from src.core.config import RedisConfig
+from src.search.query_cache import QueryEmbeddingCache
+from src.search.vector import (
+    semantic_search_command, hybrid_search_command, range_search_command, parse_search_results, supports_ef_runtime,
+    DEFAULT_RANGE_LIMIT
+)
+from src.utils.metrics import latency_summary
+from src.utils.parser import (
+    parse_redis_command, format_search_command, parse_semantic_filters, extract_k_parameter,
+    extract_ef_parameter, extract_within_parameter
+)
+
+
+def run_batch_search(input_file, output, concurrency=4, pipeline_size=32, default_k=5):
+    """
+    run every query in input_file and stream one json line per query to output
+
+    lines starting with FT.SEARCH, @ or idx: are sent as traditional
+    searches, everything else is a natural-language query with the usual
+    'k:N', 'ef:N', 'within:D' and '| genre:... year>...' syntax. queries
+    are grouped into pipelines of pipeline_size, natural-language queries
+    in a group are embedded in one batch, and up to concurrency groups are
+    in flight
+
+    each record carries pipeline_ms, the round trip of the whole pipeline it
+    was sent in, and the summary percentiles are taken over pipelines
+    """
+    config = RedisConfig()
+    client = config.get_binary_client()
+    runner = _BatchRunner(client, QueryEmbeddingCache.from_config(config), default_k, config)
+
+    pipeline_latencies = []
+    counts = {'ok': 0, 'errors': 0}
+    start = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        in_flight = deque()
+        for group in _group_queries(input_file, pipeline_size):
+            in_flight.append(executor.submit(runner.run_group, group))
+            # bound memory and keep output in input order
+            if len(in_flight) >= concurrency * 2:
+                _write_records(in_flight.popleft().result(), output, counts, pipeline_latencies)
+        while in_flight:
+            _write_records(in_flight.popleft().result(), output, counts, pipeline_latencies)
+
+    elapsed = time.perf_counter() - start
+    pipelines = latency_summary(pipeline_latencies, elapsed)
+    summary = {
+        'count': counts['ok'],
+        'errors': counts['errors'],
+        'elapsed_seconds': pipelines['elapsed_seconds'],
+        'throughput_per_second': round(counts['ok'] / elapsed, 2) if elapsed > 0 else 0.0,
+        'pipelines': pipelines['count'],
+    }
+    # round trips of whole pipelines, not of single queries
+    summary.update({f'pipeline_{name}': value for name, value in pipelines.items() if name.endswith('_ms')})
+    summary['encode_seconds'] = round(runner.encode_seconds, 4)
+    _display_batch_summary(summary)
+    return summary
+
+
+class _BatchRunner:
+    """
+    builds, sends and decodes one pipeline of queries
+    """
+    def __init__(self, client, query_cache, default_k, config):
+        self.client = client
+        self.config = config
+        self.query_cache = query_cache
+        self.default_k = default_k
+        self.encode_seconds = 0.0
+        self._embeddings_model = None
+        self._ef_supported = True
+        self._ef_dropped = False
+        self._model_lock = threading.Lock()
+
+    def run_group(self, group):
+        """
+        run a group of (line_number, query) pairs, returns json records
+        """
+        records = []
+        planned = []
+        for line_number, query in group:
+            record = {'line': line_number, 'query': query}
+            try:
+                kind, payload = self._plan_query(query)
+                record['type'] = kind
+                planned.append((record, payload))
+            except Exception as e:
+                record['error'] = str(e)
+            records.append(record)
+
+        specs = [payload for record, payload in planned if record['type'] != 'traditional']
+        embeddings = self._encode_specs(specs)
+        vector_commands = iter(self._vector_commands(specs, embeddings))
+        commands = [
+            (record, payload if record['type'] == 'traditional' else next(vector_commands))
+            for record, payload in planned
+        ]
+
+        start = time.perf_counter()
+        replies = self._send([command for _, command in commands])
+        latency = time.perf_counter() - start
+
+        # migrate-vectors may have switched the live index to another vector
+        # type meanwhile, resend the failed vector queries encoded for it once
+        vector_slots = [i for i, (record, _) in enumerate(commands) if record['type'] != 'traditional']
+        failed = [n for n, i in enumerate(vector_slots) if isinstance(replies[i], Exception)]
+        if failed and self._refresh_vector_field():
+            retry_commands = self._vector_commands([specs[n] for n in failed], [embeddings[n] for n in failed])
+            start = time.perf_counter()
+            for n, reply in zip(failed, self._send(retry_commands)):
+                replies[vector_slots[n]] = reply
+            latency += time.perf_counter() - start
+
+        for (record, _), reply in zip(commands, replies):
+            record['pipeline_ms'] = round(latency * 1000, 3)
+            if isinstance(reply, Exception):
+                record['error'] = str(reply)
+            elif record['type'] == 'traditional':
+                record.update(_traditional_record(reply))
+            else:
+                record.update(_vector_record(reply))
+        return records
+
+    def _plan_query(self, query):
+        """
+        classify a query, returns the command for traditional queries or a spec to embed
+        """
+        if _is_traditional(query):
+            cmd = query.strip()
+            if cmd.upper().startswith('FT.SEARCH'):
+                cmd = cmd[9:].strip()
+            return 'traditional', ["FT.SEARCH"] + format_search_command(parse_redis_command(cmd), 'idx:movies')
+
+        clean_query, k_value = extract_k_parameter(query)
+        clean_query, ef_runtime = extract_ef_parameter(clean_query)
+        clean_query, radius = extract_within_parameter(clean_query)
+        k = k_value if k_value is not None else self.default_k
+
+        search_text, filters = clean_query, None
+        if " | " in clean_query:
+            search_text, filter_text = clean_query.split(" | ", 1)
+            search_text = search_text.strip()
+            filters = parse_semantic_filters(filter_text)
+        if not search_text:
+            raise ValueError("empty natural-language query")
+
+        if radius is not None:
+            limit = k_value if k_value is not None else DEFAULT_RANGE_LIMIT
+            return 'range', {'text': search_text, 'filters': filters, 'k': limit, 'radius': radius}
+        kind = 'hybrid' if filters else 'semantic'
+        return kind, {'text': search_text, 'filters': filters, 'k': k, 'ef_runtime': ef_runtime}
+
+    def _send(self, commands):
+        """
+        send commands in one pipeline, failed commands come back as exceptions
+        """
+        if not commands:
+            return []
+        pipe = self.client.pipeline(transaction=False)
+        for command in commands:
+            pipe.execute_command(*command)
+        return pipe.execute(raise_on_error=False)
+
+    def _encode_specs(self, specs):
+        """
+        embed all natural-language queries of a group in one batch
+        """
+        if not specs:
+            return []
+
+        start = time.perf_counter()
+        embeddings = self._encode([spec['text'] for spec in specs])
+        elapsed = time.perf_counter() - start
+        # groups run on several threads, += is not atomic
+        with self._model_lock:
+            self.encode_seconds += elapsed
+        return embeddings
+
+    def _vector_commands(self, specs, embeddings):
+        """
+        build the commands for embedded queries in the live index's vector type
+        """
+        if not specs:
+            return []
+
+        model = self._get_model()
+        commands = []
+        for spec, embedding in zip(specs, embeddings):
+            query_bytes = model.embedding_to_bytes(embedding)
+            ef_runtime = spec.get('ef_runtime')
+            if ef_runtime is not None and not self._ef_supported:
+                if not self._ef_dropped:
+                    click.echo("ef:N ignored - the vector index is FLAT, not HNSW", err=True)
+                self._ef_dropped = True
+                ef_runtime = None
+            if 'radius' in spec:
+                commands.append(range_search_command(
+                    'idx:movies_vector', query_bytes, spec['radius'], spec['filters'], spec['k']
+                ))
+            elif spec['filters']:
+                commands.append(hybrid_search_command(
+                    'idx:movies_vector', query_bytes, spec['filters'], spec['k'], ef_runtime
+                ))
+            else:
+                commands.append(semantic_search_command(
+                    'idx:movies_vector', query_bytes, spec['k'], ef_runtime
+                ))
+        return commands
+
+    def _encode(self, texts):
+        """
+        batch encode through the query cache when enabled
+        """
+        model = self._get_model()
+        if self.query_cache is None:
+            return model.generate_embeddings(texts)
+        return self.query_cache.get_many_or_encode(model.model_name, texts, model.generate_embeddings)
+
+    def _get_model(self):
+        """
+        load the embedding model only when a natural-language query shows up
+
+        queries are encoded in the type of the live vector index, and ef:N is
+        dropped with a notice when that index is FLAT
+        """
+        with self._model_lock:
+            if self._embeddings_model is None:
+                from src.core.embeddings import MovieEmbeddings
+                from src.data.indexer import vector_field_info
+                live_field = vector_field_info(self.client, 'idx:movies_vector') or {}
+                algorithm = live_field.get('algorithm') or self.config.vector_algorithm
+                self._ef_supported = supports_ef_runtime(algorithm)
+                self._embeddings_model = MovieEmbeddings(
+                    self.config.embedding_model, daemon_socket=self.config.embedding_socket,
+                    vector_type=live_field.get('type') or self.config.vector_type
+                )
+        return self._embeddings_model
+
+    def _refresh_vector_field(self):
+        """
+        re-read the live index's vector type and algorithm, True when they changed
+        """
+        model = self._get_model()
+        from src.data.indexer import vector_field_info
+        with self._model_lock:
+            try:
+                live_field = vector_field_info(self.client, 'idx:movies_vector')
+            except Exception:
+                return False
+            if not live_field:
+                return False
+            supported = supports_ef_runtime(live_field.get('algorithm') or self.config.vector_algorithm)
+            if live_field['type'] == model.vector_type and supported == self._ef_supported:
+                return False
+            model.vector_type = live_field['type']
+            self._ef_supported = supported
+            return True
+
+
+def _is_traditional(query):
+    """
+    traditional queries use FT.SEARCH syntax, anything else is natural language
+    """
+    stripped = query.lstrip()
+    return stripped.upper().startswith('FT.SEARCH') or stripped.startswith(('@', 'idx:'))
+
+
+def _group_queries(input_file, size):
+    """
+    stream (line_number, query) groups, skipping blank lines and # comments
+    """
+    group = []
+    for line_number, line in enumerate(input_file, start=1):
+        query = line.strip()
+        if not query or query.startswith('#'):
+            continue
+        group.append((line_number, query))
+        if len(group) >= size:
+            yield group
+            group = []
+    if group:
+        yield group
+
+
+def _write_records(records, output, counts, pipeline_latencies):
+    """
+    write json lines for one group, counting ok and failed queries and the
+    group's pipeline round trip once
+    """
+    pipeline_ms = None
+    for record in records:
+        if 'error' in record:
+            counts['errors'] += 1
+        else:
+            counts['ok'] += 1
+        pipeline_ms = record.get('pipeline_ms', pipeline_ms)
+        output.write(json.dumps(record, ensure_ascii=False) + "\n")
+    output.flush()
+    if pipeline_ms is not None:
+        pipeline_latencies.append(pipeline_ms / 1000)
+
+
+def _traditional_record(reply):
+    """
+    decode a raw FT.SEARCH reply into total + list of documents
+    """
+    results = []
+    for i in range(1, len(reply) - 1, 2):
+        fields = reply[i + 1]
+        results.append({
+            'key': _to_text(reply[i]),
+            'fields': {_to_text(fields[j]): _to_text(fields[j + 1]) for j in range(0, len(fields) - 1, 2)}
+        })
+    return {'total': reply[0], 'results': results}
+
+
+def _vector_record(reply):
+    """
+    decode a KNN reply through the same parser as VectorSearch
+    """
+    results = []
+    for key, score, data in parse_search_results(reply):
+        fields = {_to_text(name): _to_text(value) for name, value in data.items()}
+        fields.pop('score', None)
+        results.append({'key': _to_text(key), 'score': score, 'fields': fields})
+    return {'total': reply[0], 'results': results}
+
+
+def _to_text(value):
+    """
+    decode binary client values for json output
+    """
+    if isinstance(value, bytes):
+        return value.decode('utf-8', errors='replace')
+    return value
+
+
+def _display_batch_summary(summary):
+    """
+    print throughput and latency percentiles to stderr so stdout stays jsonl
+    """
+    click.echo("\nBatch search complete:", err=True)
+    click.echo(f"  Queries: {summary['count']} ok, {summary['errors']} errors", err=True)
+    click.echo(f"  Time: {summary['elapsed_seconds']:.2f} seconds "
+               f"({summary['throughput_per_second']:.1f} queries/second)", err=True)
+    if summary['pipelines']:
+        click.echo(f"  Pipeline round trip ({summary['pipelines']} pipelines): "
+                   f"p50 {summary['pipeline_p50_ms']:.1f} ms, p95 {summary['pipeline_p95_ms']:.1f} ms, "
+                   f"p99 {summary['pipeline_p99_ms']:.1f} ms", err=True)
+    click.echo(f"  Encode time: {summary['encode_seconds']:.2f} seconds", err=True)
@@ -0,0 +1,131 @@
+"""
+faceted search - genre counts, decade buckets and rating statistics from
+FT.AGGREGATE, fetched in the same round trip as the top hits
+"""
+
+import math
+
+DEFAULT_TOP_GENRES = 10
+
+
+def facet_commands(index_name, query, top_genres=DEFAULT_TOP_GENRES):
+    """
+    FT.AGGREGATE commands for the genre, decade and rating facets of query
+
+    fields are loaded explicitly so the facets work whether or not the
+    fields are SORTABLE in the index behind index_name
+    """
+    return [
+        (
+            "FT.AGGREGATE", index_name, query,
+            "LOAD", "1", "@genre",
+            "GROUPBY", "1", "@genre", "REDUCE", "COUNT", "0", "AS", "count",
+            "SORTBY", "2", "@count", "DESC",
+            "LIMIT", "0", str(top_genres),
+            "DIALECT", "2"
+        ),
+        (
+            "FT.AGGREGATE", index_name, query,
+            "LOAD", "1", "@release_year",
+            "FILTER", "exists(@release_year)",
+            "APPLY", "floor(@release_year / 10) * 10", "AS", "decade",
+            "GROUPBY", "1", "@decade", "REDUCE", "COUNT", "0", "AS", "count",
+            "SORTBY", "2", "@decade", "ASC",
+            "DIALECT", "2"
+        ),
+        (
+            "FT.AGGREGATE", index_name, query,
+            "LOAD", "1", "@rating",
+            "GROUPBY", "0",
+            "REDUCE", "COUNT", "0", "AS", "count",
+            "REDUCE", "AVG", "1", "@rating", "AS", "avg",
+            "REDUCE", "MIN", "1", "@rating", "AS", "min",
+            "REDUCE", "MAX", "1", "@rating", "AS", "max",
+            "DIALECT", "2"
+        ),
+    ]
+
+
+def run_faceted_search(client, index_name, query, hits_command, top_genres=DEFAULT_TOP_GENRES):
+    """
+    send the hits command and every facet aggregation in one pipeline
+
+    query is the filter the facets describe, '*' for the whole index.
+    returns (raw hits reply, facets dict), see parse_facets
+    """
+    pipe = client.pipeline(transaction=False)
+    pipe.execute_command(*hits_command)
+    for command in facet_commands(index_name, query, top_genres):
+        pipe.execute_command(*command)
+    hits, *facet_replies = pipe.execute()
+    return hits, parse_facets(facet_replies)
+
+
+def parse_facets(replies):
+    """
+    turn the facet_commands replies into structured data
+
+    {'total': n,
+     'genres': [{'genre': 'Action', 'count': 12}, ...],
+     'decades': [{'decade': 1990, 'count': 4}, ...],
+     'rating': {'count': n, 'avg': 7.1, 'min': 5.2, 'max': 8.9}}
+    """
+    genre_rows, decade_rows, rating_rows = (_aggregate_rows(reply) for reply in replies)
+    rating = rating_rows[0] if rating_rows else {}
+
+    return {
+        'total': _to_int(rating.get('count')),
+        'genres': [
+            {'genre': row.get('genre'), 'count': _to_int(row.get('count'))}
+            for row in genre_rows if row.get('genre') is not None
+        ],
+        'decades': [
+            {'decade': _to_int(row.get('decade')), 'count': _to_int(row.get('count'))}
+            for row in decade_rows if row.get('decade') is not None
+        ],
+        'rating': {
+            'count': _to_int(rating.get('count')),
+            'avg': _to_float(rating.get('avg')),
+            'min': _to_float(rating.get('min')),
+            'max': _to_float(rating.get('max')),
+        },
+    }
+
+
+def _aggregate_rows(reply):
+    """
+    FT.AGGREGATE reply rows as dicts with text keys and values
+    """
+    rows = []
+    for row in reply[1:]:
+        values = [_to_text(value) for value in row]
+        rows.append(dict(zip(values[0::2], values[1::2])))
+    return rows
+
+
+def _to_text(value):
+    """
+    decode binary client values
+    """
+    return value.decode('utf-8') if isinstance(value, bytes) else value
+
+
+def _to_int(value):
+    """
+    parse an aggregate count, 0 when missing
+    """
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return 0
+
+
+def _to_float(value):
+    """
+    parse an aggregate value, None when missing or not finite (no rated movies)
+    """
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    return round(value, 3) if math.isfinite(value) else None
@@ -0,0 +1,295 @@
+"""
+in-process exact vector index over a memory-mapped embedding matrix
+
+used for offline analysis, as ground truth when measuring HNSW recall and
+as a search backend when redis has no search module or vector index
+"""
+import json
+import os
+import time
+import numpy as np
+from src.core.embeddings import storage_to_vectors, vector_element_size
+from src.search.vector import exclude_keys, DEFAULT_RANGE_LIMIT
+from src.data.loader import _get_all_movie_keys, _chunk_keys
+
+READ_CHUNK_SIZE = 1000  # movies per pipeline when building from redis
+RESULT_FIELDS = ('title', 'plot', 'genre', 'release_year', 'rating')
+
+
+class FlatIndex:
+    """
+    exact cosine top-k over every movie embedding
+
+    vectors are stored unit-normalized in vectors.f32 and opened as a
+    read-only memmap, keys and the filter fields live in columnar arrays in
+    columns.npz. results come back in the shape of parse_search_results on
+    a binary client: (key bytes, cosine distance, {field bytes: value bytes})
+    """
+    def __init__(self, path, vectors, columns, meta):
+        self.path = path
+        self.vectors = vectors
+        self.keys = columns['keys']
+        self.genres = columns['genres']
+        self.years = columns['years']
+        self.ratings = columns['ratings']
+        self.titles = columns['titles']
+        self.plots = columns['plots']
+        self.meta = meta
+        self._rows = None
+        self._genre_masks = {}
+
+    @property
+    def dimension(self):
+        """
+        embedding dimension of the stored vectors
+        """
+        return self.vectors.shape[1]
+
+    def __len__(self):
+        return self.vectors.shape[0]
+
+    @classmethod
+    def exists(cls, path):
+        """
+        true when a built index is present at path
+        """
+        return os.path.exists(os.path.join(path, 'meta.json'))
+
+    @classmethod
+    def load(cls, path):
+        """
+        open a built index, the vectors stay on disk behind a memmap
+        """
+        with open(os.path.join(path, 'meta.json')) as f:
+            meta = json.load(f)
+        vectors = np.memmap(os.path.join(path, 'vectors.f32'), dtype=np.float32, mode='r',
+                            shape=(meta['count'], meta['dimension']))
+        with np.load(os.path.join(path, 'columns.npz'), allow_pickle=False) as data:
+            columns = {name: data[name] for name in data.files}
+        return cls(path, vectors, columns, meta)
+
+    @classmethod
+    def build_from_redis(cls, client, path, model_name=None, vector_type='FLOAT32'):
+        """
+        snapshot every movie with a plot_embedding into a new index at path
+
+        client must be a binary client, stored vectors of vector_type are
+        decoded to float32. returns the loaded index
+        """
+        keys = sorted(_get_all_movie_keys(client))
+        rows = []
+        for chunk in _chunk_keys(keys, READ_CHUNK_SIZE):
+            pipe = client.pipeline(transaction=False)
+            for key in chunk:
+                pipe.hmget(key, 'plot_embedding', 'embedding_type', *RESULT_FIELDS)
+            for key, values in zip(chunk, pipe.execute()):
+                # skip blobs of another type, e.g. halfway through a migration
+                if values[0] and _to_text(values[1] or 'FLOAT32') == vector_type:
+                    rows.append((key, values[:1] + values[2:]))
+        if not rows:
+            raise ValueError("no plot embeddings found - run setup first")
+
+        size = len(rows[0][1][0])
+        rows = [(key, values) for key, values in rows if len(values[0]) == size]
+        matrix = storage_to_vectors(b"".join(values[0] for _, values in rows), vector_type)
+        matrix = matrix.reshape(len(rows), size // vector_element_size(vector_type)).copy()
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        np.divide(matrix, norms, out=matrix, where=norms > 0)
+
+        columns = {
+            'keys': np.array([_to_text(key) for key, _ in rows]),
+            'titles': np.array([_to_text(values[1]) or '' for _, values in rows]),
+            'plots': np.array([_to_text(values[2]) or '' for _, values in rows]),
+            'genres': np.array([_to_text(values[3]) or '' for _, values in rows]),
+            'years': np.array([_to_number(values[4]) for _, values in rows], dtype=np.float32),
+            'ratings': np.array([_to_number(values[5]) for _, values in rows], dtype=np.float32),
+        }
+        meta = {
+            'count': len(rows), 'dimension': matrix.shape[1], 'model': model_name, 'source_type': vector_type,
+            'built_at': int(time.time()),
+        }
+
+        os.makedirs(path, exist_ok=True)
+        matrix.tofile(os.path.join(path, 'vectors.f32'))
+        np.savez(os.path.join(path, 'columns.npz'), **columns)
+        # meta last, so a half-written index is never picked up
+        with open(os.path.join(path, 'meta.json'), 'w') as f:
+            json.dump(meta, f)
+        return cls.load(path)
+
+    def search(self, query_vectors, k=5, filters=None):
+        """
+        exact top-k for a batch of query vectors, one result list per query
+
+        filters takes the same genre/year_min/year_max/rating_min dict as
+        hybrid_search and is applied before scoring
+        """
+        queries = np.atleast_2d(np.asarray(query_vectors, dtype=np.float32))
+        if queries.shape[1] != self.dimension:
+            raise ValueError(f"query dimension {queries.shape[1]} does not match index dimension {self.dimension}")
+        norms = np.linalg.norm(queries, axis=1, keepdims=True)
+        queries = np.divide(queries, norms, out=np.zeros_like(queries), where=norms > 0)
+
+        candidates = self.filter_rows(filters)
+        if len(candidates) == 0 or k <= 0:
+            return [[] for _ in queries]
+
+        vectors = self.vectors if len(candidates) == len(self) else self.vectors[candidates]
+        similarities = queries @ vectors.T
+        k = min(k, len(candidates))
+        top = np.argpartition(-similarities, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(similarities, top, axis=1)
+        order = np.argsort(-top_scores, axis=1, kind='stable')
+
+        results = []
+        for positions, scores, ranking in zip(top, top_scores, order):
+            results.append([
+                self._result(candidates[positions[i]], float(1.0 - scores[i]), filters)
+                for i in ranking
+            ])
+        return results
+
+    def search_similar(self, movie_keys, k=5):
+        """
+        neighbors of one or more indexed movies (centroid for several), seeds excluded
+        """
+        seeds = [movie_keys] if isinstance(movie_keys, (str, bytes)) else list(movie_keys)
+        rows = [self.row_of(key) for key in seeds]
+        rows = [row for row in rows if row is not None]
+        if not rows:
+            return []
+        query = np.asarray(self.vectors[rows], dtype=np.float32).mean(axis=0)
+        return exclude_keys(self.search(query, k + len(seeds))[0], seeds, k)
+
+    def row_of(self, movie_key):
+        """
+        row number of a movie key, None when it is not indexed
+        """
+        if self._rows is None:
+            self._rows = {key: row for row, key in enumerate(self.keys.tolist())}
+        return self._rows.get(_to_text(movie_key))
+
+    def filter_rows(self, filters=None):
+        """
+        row numbers passing the filters, matching build_filter_clause semantics
+        """
+        mask = np.ones(len(self), dtype=bool)
+        if filters:
+            if 'genre' in filters:
+                mask &= self._genre_mask(filters['genre'])
+            # missing numeric fields are NaN and never match a range, like FT.SEARCH
+            if 'year_min' in filters:
+                mask &= self.years >= float(filters['year_min'])
+            if 'year_max' in filters:
+                mask &= self.years <= float(filters['year_max'])
+            if 'rating_min' in filters:
+                mask &= self.ratings >= float(filters['rating_min'])
+        return np.flatnonzero(mask)
+
+    def _genre_mask(self, genre):
+        """
+        rows tagged with genre, case-insensitive like a TAG field
+        """
+        genre = genre.strip().lower()
+        if genre not in self._genre_masks:
+            self._genre_masks[genre] = np.array([
+                genre in {tag.strip().lower() for tag in tags.split(',')} for tags in self.genres.tolist()
+            ], dtype=bool)
+        return self._genre_masks[genre]
+
+    def _result(self, row, distance, filters):
+        """
+        one (key, score, fields) tuple shaped like a binary-client FT.SEARCH result
+        """
+        movie_data = {
+            b'title': self.titles[row].encode('utf-8'),
+            b'plot': self.plots[row].encode('utf-8'),
+            b'genre': self.genres[row].encode('utf-8'),
+        }
+        if not np.isnan(self.years[row]):
+            movie_data[b'release_year'] = _format_number(self.years[row])
+        if filters and not np.isnan(self.ratings[row]):
+            movie_data[b'rating'] = _format_number(self.ratings[row])
+        movie_data[b'score'] = repr(distance).encode('utf-8')
+        return (self.keys[row].encode('utf-8'), distance, movie_data)
+
+
+class LocalVectorSearch:
+    """
+    VectorSearch over a FlatIndex, for redis deployments without a vector index
+    """
+    def __init__(self, flat_index, embeddings_model, query_cache=None):
+        self.flat_index = flat_index
+        self.embeddings_model = embeddings_model
+        self.query_cache = query_cache
+        self.result_cache = None
+        self.last_cache_hit = False
+
+    def semantic_search(self, query_text, k=5, ef_runtime=None):
+        """
+        exact semantic search, returns (movie_key, score, movie_data) tuples
+        """
+        return self.hybrid_search(query_text, None, k)
+
+    def hybrid_search(self, query_text, filters=None, k=5, ef_runtime=None):
+        """
+        exact semantic search over the rows passing filters
+
+        ef_runtime is accepted for interface parity, exact search has no knob
+        """
+        query_embedding = self._encode_query(query_text)
+        if query_embedding is None:
+            return []
+        return self.flat_index.search(query_embedding, k, filters)[0]
+
+    def range_search(self, query_text, radius, filters=None, limit=DEFAULT_RANGE_LIMIT):
+        """
+        movies within radius cosine distance of the query, closest first, at most limit
+        """
+        query_embedding = self._encode_query(query_text)
+        if query_embedding is None:
+            return []
+        results = self.flat_index.search(query_embedding, limit, filters)[0]
+        return [result for result in results if result[1] <= radius]
+
+    def find_similar_movies(self, movie_keys, k=5):
+        """
+        movies similar to one or more seed movies, seeds excluded
+        """
+        return self.flat_index.search_similar(movie_keys, k)
+
+    def _encode_query(self, query_text):
+        """
+        embed query text, going through the query cache when one is configured
+        """
+        if self.query_cache is None:
+            return self.embeddings_model.generate_embedding(query_text)
+        return self.query_cache.get_or_encode(
+            self.embeddings_model.model_name, query_text,
+            self.embeddings_model.generate_embedding
+        )
+
+
+def _to_text(value):
+    """
+    decode binary client values
+    """
+    return value.decode('utf-8') if isinstance(value, bytes) else value
+
+
+def _to_number(value):
+    """
+    parse a numeric hash field, NaN when missing
+    """
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return float('nan')
+
+
+def _format_number(value):
+    """
+    numeric field as redis would return it - integers without a fraction
+    """
+    value = float(value)
+    return (str(int(value)) if value.is_integer() else repr(round(value, 6))).encode('utf-8')
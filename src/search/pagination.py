@@ -0,0 +1,94 @@
+"""
+streaming iteration over large result sets with FT.AGGREGATE cursors
+
+rows are read page_size at a time through FT.CURSOR READ and yielded as
+they arrive, so memory use does not grow with the size of the result set
+"""
+import csv
+import json
+
+DEFAULT_PAGE_SIZE = 100
+DEFAULT_FIELDS = ('title', 'genre', 'release_year', 'rating', 'plot')
+CURSOR_MAX_IDLE_MS = 300000  # server drops a cursor left unread this long
+
+
+def iter_search_results(client, index_name, query, fields=DEFAULT_FIELDS, page_size=DEFAULT_PAGE_SIZE,
+                        sortby=None, descending=False):
+    """
+    yield every match of query as a {'key': ..., field: value} dict
+
+    pages are fetched with WITHCURSOR/FT.CURSOR READ, one round trip per
+    page_size rows. sortby sorts the whole result set server-side first.
+    stopping early (break, close) deletes the server cursor
+    """
+    command = ["FT.AGGREGATE", index_name, query, "LOAD", str(len(fields) + 1), "@__key"]
+    command.extend(f"@{field}" for field in fields)
+    if sortby:
+        command.extend(["SORTBY", "2", f"@{sortby}", "DESC" if descending else "ASC", "MAX", "0"])
+    command.extend(["WITHCURSOR", "COUNT", str(page_size), "MAXIDLE", str(CURSOR_MAX_IDLE_MS), "DIALECT", "2"])
+
+    rows, cursor = client.execute_command(*command)
+    try:
+        while True:
+            for row in rows[1:]:
+                yield _row_dict(row)
+            if not int(cursor):
+                return
+            rows, cursor = client.execute_command("FT.CURSOR", "READ", index_name, cursor, "COUNT", str(page_size))
+    finally:
+        if int(cursor):
+            _delete_cursor(client, index_name, cursor)
+
+
+def iter_pages(rows, page_size=DEFAULT_PAGE_SIZE):
+    """
+    group a row iterator into lists of at most page_size rows
+    """
+    page = []
+    for row in rows:
+        page.append(row)
+        if len(page) >= page_size:
+            yield page
+            page = []
+    if page:
+        yield page
+
+
+def export_results(rows, output, fields=DEFAULT_FIELDS, output_format='jsonl'):
+    """
+    write rows to output as JSON lines or CSV, one row at a time
+
+    returns the number of rows written
+    """
+    count = 0
+    if output_format == 'csv':
+        writer = csv.DictWriter(output, fieldnames=['key'] + list(fields), extrasaction='ignore')
+        writer.writeheader()
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+    else:
+        for row in rows:
+            output.write(json.dumps(row, ensure_ascii=False) + "\n")
+            count += 1
+    output.flush()
+    return count
+
+
+def _row_dict(row):
+    """
+    one aggregate row as a dict, the document key under 'key'
+    """
+    values = [value.decode('utf-8') if isinstance(value, bytes) else value for value in row]
+    data = dict(zip(values[0::2], values[1::2]))
+    return {'key': data.pop('__key', None), **data}
+
+
+def _delete_cursor(client, index_name, cursor):
+    """
+    release a cursor that was not read to the end, ignoring cursors that already expired
+    """
+    try:
+        client.execute_command("FT.CURSOR", "DEL", index_name, cursor)
+    except Exception:
+        pass
@@ -0,0 +1,137 @@
+"""
+selectivity-aware planning for hybrid (filter + vector) searches
+
+a cheap LIMIT 0 0 count tells how many movies pass the filters. few
+candidates are fetched with their stored vectors and scored exactly on the
+client, more are left to a server-side brute force over the filtered set,
+and broad filters run through HNSW in batches sized to the selectivity
+"""
+import math
+import numpy as np
+from src.search.vector import build_filter_clause
+
+EXACT_RETURN_FIELDS = ('title', 'plot', 'genre', 'release_year', 'rating')
+MAX_BATCH_SIZE = 4096  # cap on HNSW batch size for very selective BATCHES plans
+BATCH_HEADROOM = 1.5  # batch size slack so one batch usually yields k matches
+
+
+class HybridPlanner:
+    """
+    picks an execution plan for a filtered KNN query from its candidate count
+
+    plans are dicts with a strategy ('empty', 'exact' or 'knn'), the
+    candidate and total counts and, for knn, the HYBRID_POLICY and
+    BATCH_SIZE to send
+    """
+    def __init__(self, client, exact_limit=1000, adhoc_limit=10000):
+        self.client = client
+        self.exact_limit = exact_limit
+        self.adhoc_limit = adhoc_limit
+
+    @classmethod
+    def from_config(cls, config, client):
+        """
+        build a planner with the limits from RedisConfig
+        """
+        return cls(client, exact_limit=config.hybrid_exact_limit, adhoc_limit=config.hybrid_adhoc_limit)
+
+    def plan(self, index_name, filters, k):
+        """
+        count the candidates of filters in one round trip and choose a plan
+        """
+        pipe = self.client.pipeline(transaction=False)
+        for command in count_commands(index_name, filters):
+            pipe.execute_command(*command)
+        return self.plan_from_counts(pipe.execute(), k)
+
+    def plan_from_counts(self, replies, k):
+        """
+        choose a plan from the replies to count_commands, for callers sending them themselves
+        """
+        candidates, total = (int(reply[0]) for reply in replies)
+        return choose_plan(candidates, total, k, self.exact_limit, self.adhoc_limit)
+
+    def exact_search(self, index_name, filters, query_bytes, embeddings_model, k, candidates):
+        """
+        fetch every candidate with its stored vector and rank them by cosine distance
+
+        returns (movie_key, score, movie_data) tuples shaped like parsed
+        FT.SEARCH results
+        """
+        reply = self.client.execute_command(*exact_search_command(index_name, filters, candidates))
+        return rank_candidates(reply, query_bytes, embeddings_model, k)
+
+
+def count_commands(index_name, filters):
+    """
+    LIMIT 0 0 searches counting the movies passing filters and all indexed movies
+    """
+    return [
+        ["FT.SEARCH", index_name, build_filter_clause(filters), "LIMIT", "0", "0", "DIALECT", "2"],
+        ["FT.SEARCH", index_name, "*", "LIMIT", "0", "0", "DIALECT", "2"],
+    ]
+
+
+def exact_search_command(index_name, filters, candidates):
+    """
+    FT.SEARCH fetching every candidate of filters with its stored vector
+    """
+    return [
+        "FT.SEARCH", index_name, build_filter_clause(filters),
+        "RETURN", str(len(EXACT_RETURN_FIELDS) + 1), *EXACT_RETURN_FIELDS, "plot_embedding",
+        "LIMIT", "0", str(candidates),
+        "DIALECT", "2"
+    ]
+
+
+def rank_candidates(reply, query_bytes, embeddings_model, k):
+    """
+    top k of an exact_search_command reply by cosine distance to the query
+    """
+    keys, blobs, documents = [], [], []
+    for i in range(1, len(reply) - 1, 2):
+        fields = reply[i + 1]
+        movie_data = {fields[j]: fields[j + 1] for j in range(0, len(fields) - 1, 2)}
+        blob = movie_data.pop(b'plot_embedding', None)
+        # movies without a vector, or with one of another type, never match a KNN query either
+        if blob and len(blob) == len(query_bytes):
+            keys.append(reply[i])
+            blobs.append(blob)
+            documents.append(movie_data)
+    if not keys:
+        return []
+
+    scores = embeddings_model.batch_cosine_similarity(
+        embeddings_model.bytes_to_embedding(query_bytes), embeddings_model.bytes_to_embeddings(blobs)
+    )
+    distances = 1.0 - scores
+    top = np.argsort(distances, kind='stable')[:k]
+
+    results = []
+    for row in top:
+        distance = float(distances[row])
+        documents[row][b'score'] = repr(distance).encode('utf-8')
+        results.append((keys[row], distance, documents[row]))
+    return results
+
+
+def choose_plan(candidates, total, k, exact_limit=1000, adhoc_limit=10000):
+    """
+    plan for a filter matching candidates of total documents
+
+    BATCH_SIZE is the number of HNSW neighbors that should hold k matches at
+    the filter's selectivity, with some headroom
+    """
+    plan = {'candidates': candidates, 'total': total}
+    if candidates == 0:
+        plan['strategy'] = 'empty'
+    elif candidates <= exact_limit:
+        plan['strategy'] = 'exact'
+    elif candidates <= adhoc_limit:
+        plan.update(strategy='knn', hybrid_policy='ADHOC_BF')
+    else:
+        selectivity = candidates / max(total, candidates)
+        batch_size = math.ceil(k / selectivity * BATCH_HEADROOM)
+        plan.update(strategy='knn', hybrid_policy='BATCHES', batch_size=max(k, min(batch_size, MAX_BATCH_SIZE)))
+    return plan
+
@@ -0,0 +1,134 @@
+"""
+in-process lru cache of query embeddings
+"""
+import threading
+import time
+from collections import OrderedDict
+
+
+class QueryEmbeddingCache:
+    """
+    bounded lru cache of query embeddings keyed on (model name, normalized query)
+
+    entries optionally expire after ttl seconds. every hit adds the encode
+    time recorded for that entry to the saved time, so the stats show how
+    much model latency the cache has absorbed. safe to share between threads,
+    the model itself runs outside the lock
+    """
+    def __init__(self, max_size=1024, ttl=None):
+        self.max_size = max_size
+        self.ttl = ttl if ttl else None
+        self.hits = 0
+        self.misses = 0
+        self.saved_seconds = 0.0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def normalize(query_text):
+        """
+        normalize query text so case and spacing variants share an entry
+        """
+        return " ".join(query_text.lower().split())
+
+    def get_or_encode(self, model_name, query_text, encode):
+        """
+        return the cached embedding for a query or encode and store it
+
+        encode is called with the original query text on a miss
+        """
+        key = (model_name, self.normalize(query_text))
+        with self._lock:
+            embedding = self._lookup(key)
+        if embedding is not None:
+            return embedding
+
+        start = time.perf_counter()
+        embedding = encode(query_text)
+        self._store(key, embedding, time.perf_counter() - start)
+        return embedding
+
+    def get_many_or_encode(self, model_name, query_texts, encode_batch):
+        """
+        embeddings for a list of queries, encoding all misses in one batch
+
+        encode_batch is called once with the distinct uncached query texts
+        """
+        embeddings = [None] * len(query_texts)
+        missing = {}
+        with self._lock:
+            for i, query_text in enumerate(query_texts):
+                key = (model_name, self.normalize(query_text))
+                if key in missing:
+                    missing[key].append(i)
+                    continue
+                embeddings[i] = self._lookup(key)
+                if embeddings[i] is None:
+                    missing[key] = [i]
+
+        if missing:
+            start = time.perf_counter()
+            encoded = encode_batch([query_texts[positions[0]] for positions in missing.values()])
+            encode_seconds = (time.perf_counter() - start) / len(missing)
+            for (key, positions), embedding in zip(missing.items(), encoded):
+                self._store(key, embedding, encode_seconds)
+                for i in positions:
+                    embeddings[i] = embedding
+        return embeddings
+
+    def clear(self):
+        """
+        drop all cached embeddings, counters are kept
+        """
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """
+        hit rate, saved encode time and occupancy
+        """
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'saved_seconds': self.saved_seconds,
+            'size': len(self._entries),
+            'max_size': self.max_size,
+        }
+
+    def _lookup(self, key):
+        """
+        fetch a live entry and update counters, caller holds the lock
+        """
+        entry = self._entries.get(key)
+        if entry is not None:
+            embedding, encode_seconds, stored_at = entry
+            if self.ttl is None or time.monotonic() - stored_at < self.ttl:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                self.saved_seconds += encode_seconds
+                return embedding
+            del self._entries[key]
+        self.misses += 1
+        return None
+
+    def _store(self, key, embedding, encode_seconds):
+        """
+        insert a fresh entry, dropping the least recently used one when full
+        """
+        if embedding is None or self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (embedding, encode_seconds, time.monotonic())
+            if len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    @classmethod
+    def from_config(cls, config):
+        """
+        build the cache sized from RedisConfig, None when disabled
+        """
+        if config.query_cache_size <= 0:
+            return None
+        return cls(max_size=config.query_cache_size, ttl=config.query_cache_ttl)
@@ -0,0 +1,154 @@
+"""
+redis-backed cache of FT.SEARCH replies with index-version invalidation
+"""
+import base64
+import hashlib
+import json
+
+VERSION_KEY = "search:version"
+CACHE_PREFIX = "cache:search:"
+
+# option keywords normalized to upper case when building cache keys
+_KEYWORDS = {"RETURN", "SORTBY", "ASC", "DESC", "LIMIT", "PARAMS", "DIALECT", "AS"}
+
+
+def bump_index_version(client):
+    """
+    invalidate every cached search result after a data load or index change
+    """
+    client.incr(VERSION_KEY)
+
+
+class SearchResultCache:
+    """
+    caches raw FT.SEARCH replies in redis
+
+    entries are keyed on the normalized index, query and PARAMS/RETURN/SORTBY/
+    LIMIT arguments and tagged with an index version made of the
+    search:version counter (bumped by the loader and indexer) and the FT.INFO
+    document counters, so any write to the index makes old entries stale.
+    a lookup costs one pipelined round trip
+    """
+    def __init__(self, client, ttl=300):
+        self.client = client
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    def execute(self, *args):
+        """
+        run an FT.SEARCH command through the cache
+
+        args are the full command starting with FT.SEARCH and the index name,
+        returns (results, cache_hit)
+        """
+        cache_key = CACHE_PREFIX + self._fingerprint(args)
+
+        pipe = self.client.pipeline(transaction=False)
+        pipe.get(VERSION_KEY)
+        pipe.execute_command("FT.INFO", args[1])
+        pipe.hmget(cache_key, "version", "reply")
+        version_counter, info, (cached_version, cached_reply) = pipe.execute(raise_on_error=False)
+
+        version = self._version_token(version_counter, info)
+        if cached_reply is not None and _to_str(cached_version) == version:
+            self.hits += 1
+            return _decode_reply(cached_reply), True
+
+        self.misses += 1
+        results = self.client.execute_command(*args)
+
+        pipe = self.client.pipeline(transaction=False)
+        pipe.hset(cache_key, mapping={"version": version, "reply": _encode_reply(results)})
+        pipe.expire(cache_key, self.ttl)
+        pipe.execute()
+        return results, False
+
+    def stats(self):
+        """
+        cache hit and miss counters for this process
+        """
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
+
+    def _fingerprint(self, args):
+        """
+        hash the normalized command so equivalent queries share an entry
+        """
+        digest = hashlib.sha256()
+        for arg in args[1:]:
+            if isinstance(arg, str):
+                arg = " ".join(arg.split())
+                if arg.upper() in _KEYWORDS:
+                    arg = arg.upper()
+                arg = arg.encode("utf-8")
+            elif not isinstance(arg, bytes):
+                arg = str(arg).encode("utf-8")
+            # length prefix keeps argument boundaries unambiguous
+            digest.update(len(arg).to_bytes(8, "big"))
+            digest.update(arg)
+        return digest.hexdigest()
+
+    def _version_token(self, version_counter, info):
+        """
+        combine the version key with FT.INFO counters into one comparable string
+        """
+        counter = _to_str(version_counter) if version_counter is not None else "0"
+        if isinstance(info, Exception):
+            return f"{counter}:unknown"
+
+        fields = {_to_str(info[i]): info[i + 1] for i in range(0, len(info) - 1, 2)}
+        counters = [_to_str(fields.get(name, "")) for name in ("num_docs", "max_doc_id", "indexing")]
+        return ":".join([counter] + counters)
+
+    @classmethod
+    def from_config(cls, config, client):
+        """
+        build the cache from RedisConfig, None when disabled
+        """
+        if config.result_cache_ttl <= 0:
+            return None
+        return cls(client, ttl=config.result_cache_ttl)
+
+
+def _to_str(value):
+    """
+    decode redis replies from binary clients
+    """
+    if isinstance(value, bytes):
+        return value.decode("utf-8")
+    return str(value)
+
+
+def _encode_reply(value):
+    """
+    serialize a raw reply to json, tagging bytes so they round trip exactly
+    """
+    return json.dumps(_to_json(value), separators=(",", ":"))
+
+
+def _decode_reply(payload):
+    """
+    rebuild a raw reply serialized by _encode_reply
+    """
+    return _from_json(json.loads(payload))
+
+
+def _to_json(value):
+    if isinstance(value, bytes):
+        return {"b": base64.b64encode(value).decode("ascii")}
+    if isinstance(value, (list, tuple)):
+        return [_to_json(item) for item in value]
+    return value
+
+
+def _from_json(value):
+    if isinstance(value, dict):
+        return base64.b64decode(value["b"])
+    if isinstance(value, list):
+        return [_from_json(item) for item in value]
+    return value
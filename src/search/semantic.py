@@ -4,9 +4,19 @@ semantic search interface for natural language queries
 import click
 from src.core.config import RedisConfig
 from src.core.embeddings import MovieEmbeddings
-from src.search.vector import VectorSearch
-from src.utils.parser import parse_semantic_filters, extract_k_parameter
-from src.utils.display import display_semantic_results, show_semantic_help
+from src.data.indexer import vector_field_info
+from src.search.vector import VectorSearch, DEFAULT_RANGE_LIMIT
+from src.search.planner import HybridPlanner
+from src.search.flat_index import FlatIndex, LocalVectorSearch
+from src.search.query_cache import QueryEmbeddingCache
+from src.search.result_cache import SearchResultCache
+from src.utils.parser import (
+    parse_semantic_filters, extract_k_parameter, extract_ef_parameter, extract_within_parameter
+)
+from src.utils.display import (
+    display_semantic_results, show_semantic_help, display_query_cache_stats, display_result_cache_stats,
+    display_facets
+)
 
 
 def run_semantic_search():
@@ -14,9 +24,9 @@ def run_semantic_search():
     run semantic search interface with natural language queries
     """
     # setup clients and models
-    config = RedisConfig(decode_responses=False)  # binary client for vectors
-    client = config.get_client()
-    text_client = RedisConfig(decode_responses=True).get_client()
+    config = RedisConfig()
+    client = config.get_binary_client()  # binary client for vectors
+    text_client = config.get_text_client()
     
     # test connection
     try:
@@ -25,9 +35,18 @@ def run_semantic_search():
         click.echo(f"Failed to connect to Redis: {e}")
         return
     
-    # initialize search components
-    embeddings_model = MovieEmbeddings()
-    vector_search = VectorSearch(client, embeddings_model)
+    # initialize search components, queries are encoded in the type of the live index
+    live_field = vector_field_info(text_client, "idx:movies_vector") or {}
+    embeddings_model = MovieEmbeddings(config.embedding_model, daemon_socket=config.embedding_socket,
+                                       vector_type=live_field.get('type') or config.vector_type)
+    vector_search = _local_vector_search(client, config, embeddings_model) or VectorSearch(
+        client, embeddings_model,
+        query_cache=QueryEmbeddingCache.from_config(config),
+        result_cache=SearchResultCache.from_config(config, client),
+        planner=HybridPlanner.from_config(config, client),
+        vector_algorithm=live_field.get('algorithm') or config.vector_algorithm,
+        vector_field_lookup=lambda: vector_field_info(text_client, "idx:movies_vector")
+    )
     
     click.echo("\nVector-Based Redis Search (type 'quit' to exit, 'help' for options)")
     click.echo("Natural language queries with optional filters")
@@ -42,6 +61,11 @@ def run_semantic_search():
         if command.lower() == 'help':
             show_semantic_help()
             continue
+        
+        if command.lower() == 'stats':
+            display_query_cache_stats(vector_search.query_cache)
+            display_result_cache_stats(vector_search.result_cache)
+            continue
             
         if not command.strip():
             continue
@@ -49,8 +73,11 @@ def run_semantic_search():
         try:
             if command.lower().startswith('similar to '):
                 # find similar movies
-                movie_key = command[11:].strip()
-                _find_similar_movies(movie_key, text_client, vector_search)
+                movie_keys = command[11:].replace(',', ' ').split()
+                _find_similar_movies(movie_keys, text_client, vector_search)
+            elif command.lower().startswith('facets '):
+                # hybrid search with facets of the filter part
+                _execute_faceted_search(command[7:], vector_search)
             else:
                 # semantic or hybrid search
                 _execute_semantic_search(command, vector_search)
@@ -59,12 +86,33 @@ def run_semantic_search():
             click.echo(f"\nError: {e}")
 
 
+def _local_vector_search(client, config, embeddings_model):
+    """
+    flat index backend when redis has no vector index, None otherwise
+    """
+    try:
+        client.execute_command("FT.INFO", "idx:movies_vector")
+        return None
+    except Exception as e:
+        if not FlatIndex.exists(config.flat_index_dir):
+            click.echo(f"Vector index unavailable ({e}) - run 'python3 run.py build-flat-index' "
+                       "against a Redis with embeddings to search locally")
+            return None
+    
+    flat_index = FlatIndex.load(config.flat_index_dir)
+    click.echo(f"Vector index unavailable - searching the local flat index "
+               f"({len(flat_index)} movies, built with {flat_index.meta.get('model')})")
+    return LocalVectorSearch(flat_index, embeddings_model, query_cache=QueryEmbeddingCache.from_config(config))
+
+
 def _execute_semantic_search(query, vector_search, default_k=5):
     """
     execute semantic search with optional filters
     """
     # extract k parameter if present
     clean_query, k_value = extract_k_parameter(query)
+    clean_query, ef_runtime = extract_ef_parameter(clean_query)
+    clean_query, radius = extract_within_parameter(clean_query)
     num_results = k_value if k_value is not None else default_k
     
     # check for filters using | separator
@@ -76,32 +124,67 @@ def _execute_semantic_search(query, vector_search, default_k=5):
         search_text = parts[0].strip()
         filters = parse_semantic_filters(parts[1])
     
-    # perform search
-    if filters:
-        results = vector_search.hybrid_search(search_text, filters, k=num_results)
+    # perform search, a radius returns everything inside it with k:N as the cap
+    if radius is not None:
+        limit = k_value if k_value is not None else DEFAULT_RANGE_LIMIT
+        results = vector_search.range_search(search_text, radius, filters, limit=limit)
+    elif filters:
+        results = vector_search.hybrid_search(search_text, filters, k=num_results, ef_runtime=ef_runtime)
     else:
-        results = vector_search.semantic_search(search_text, k=num_results)
+        results = vector_search.semantic_search(search_text, k=num_results, ef_runtime=ef_runtime)
+    
+    # display results, with the plan the planner chose for filtered queries
+    plan = getattr(vector_search, 'last_plan', None) if filters and radius is None else None
+    display_semantic_results(results, search_text, cached=vector_search.last_cache_hit, plan=plan, radius=radius)
+
+
+def _execute_faceted_search(query, vector_search, default_k=5):
+    """
+    hybrid search plus genre/decade/rating facets of the movies passing the filters
+    """
+    if not hasattr(vector_search, 'faceted_search'):
+        click.echo("\nFacets need the Redis vector index")
+        return
     
-    # display results
+    clean_query, k_value = extract_k_parameter(query)
+    num_results = k_value if k_value is not None else default_k
+    
+    search_text, filters = clean_query.strip(), None
+    if " | " in clean_query:
+        parts = clean_query.split(" | ", 1)
+        search_text = parts[0].strip()
+        filters = parse_semantic_filters(parts[1])
+    
+    results, facets = vector_search.faceted_search(search_text, filters, k=num_results)
     display_semantic_results(results, search_text)
+    display_facets(facets)
 
 
-def _find_similar_movies(movie_key, text_client, vector_search):
+def _find_similar_movies(movie_keys, text_client, vector_search):
     """
-    find movies similar to a given movie
+    find movies similar to one or more given movies
     """
-    # check if movie exists
-    movie_data = text_client.hgetall(movie_key)
-    if not movie_data:
-        click.echo(f"Movie {movie_key} not found")
+    if not movie_keys:
+        click.echo("Usage: similar to movie:1 [movie:2 ...]")
+        return
+    
+    # check the movies exist, reading only their titles
+    pipe = text_client.pipeline(transaction=False)
+    for movie_key in movie_keys:
+        pipe.hget(movie_key, 'title')
+    titles = pipe.execute()
+    
+    missing = [movie_key for movie_key, title in zip(movie_keys, titles) if title is None]
+    if missing:
+        click.echo(f"Movie {', '.join(missing)} not found")
         return
     
-    title = movie_data.get('title', 'Unknown')
+    title = ", ".join(titles)
     click.echo(f"\nFinding movies similar to: {title}")
     
     # find similar movies
-    results = vector_search.find_similar_movies(movie_key, k=5)
-    display_semantic_results(results, f"similar to {title}")
+    results = vector_search.find_similar_movies(movie_keys, k=5)
+    display_semantic_results(results, f"similar to {title}", cached=vector_search.last_cache_hit)
 
 
 if __name__ == "__main__":
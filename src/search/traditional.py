@@ -4,7 +4,10 @@ traditional redis search with FT.SEARCH syntax
 import click
 from src.core.config import RedisConfig
 from src.utils.parser import parse_redis_command, format_search_command
-from src.utils.display import display_traditional_results
+from src.search.result_cache import SearchResultCache
+from src.search.facets import run_faceted_search
+from src.search.pagination import iter_search_results, iter_pages
+from src.utils.display import display_traditional_results, display_result_cache_stats, display_facets, display_result_row
 
 def run_traditional_search():
     """
@@ -12,6 +15,7 @@ def run_traditional_search():
     """
     config = RedisConfig(decode_responses=True)
     client = config.get_client()
+    result_cache = SearchResultCache.from_config(config, client)
     
     # test connection
     try:
@@ -20,8 +24,10 @@ def run_traditional_search():
         click.echo(f"Failed to connect to Redis: {e}")
         return
     
-    click.echo("\nRedis Search (type 'quit' to exit)")
+    click.echo("\nRedis Search (type 'quit' to exit, 'stats' for cache stats)")
     click.echo("Format: FT.SEARCH index_name query [options]")
+    click.echo("Facets: facets @genre:{Action} @rating:[7 +inf]")
+    click.echo(f"Every match, {config.search_page_size} at a time: all @genre:{{Drama}} SORTBY rating DESC")
     click.echo("=" * 60)
     
     while True:
@@ -30,34 +36,103 @@ def run_traditional_search():
         if command.lower() == 'quit':
             click.echo("\nGoodbye!")
             break
+        
+        if command.lower() == 'stats':
+            display_result_cache_stats(result_cache)
+            continue
             
         if not command.strip():
             continue
         
         try:
-            # handle FT.SEARCH prefix
+            # handle FT.SEARCH prefix, or the facets prefix
             cmd = command.strip()
+            with_facets = cmd.lower().startswith('facets ')
+            if with_facets:
+                cmd = cmd[7:].strip()
+            stream_all = cmd.lower().startswith('all ')
+            if stream_all:
+                cmd = cmd[4:].strip()
             if cmd.upper().startswith('FT.SEARCH'):
                 cmd = cmd[9:].strip()
             
             # parse command preserving redis syntax
             parts = parse_redis_command(cmd)
             
-            if len(parts) < 2:
+            if len(parts) < 2 and not (with_facets or stream_all):
                 click.echo("Invalid command. Example: idx:movies 'star wars' or just '@title:star wars'")
                 continue
             
             # format with proper index and return clause
             parts = format_search_command(parts, 'idx:movies')
             
+            # hits and facets of the same query in one round trip
+            if with_facets:
+                query, options = _split_query(parts[1:])
+                results, facets = run_faceted_search(client, parts[0], query, ["FT.SEARCH", parts[0], query, *options])
+                display_traditional_results(results)
+                display_facets(facets)
+                continue
+            
+            # page through every match instead of the first LIMIT rows
+            if stream_all:
+                query, options = _split_query(parts[1:])
+                _stream_results(client, parts[0], query, options, config.search_page_size)
+                continue
+            
             # execute search
-            results = client.execute_command("FT.SEARCH", *parts)
+            if result_cache is not None:
+                results, cached = result_cache.execute("FT.SEARCH", *parts)
+            else:
+                results, cached = client.execute_command("FT.SEARCH", *parts), False
             
             # display results
-            display_traditional_results(results)
+            display_traditional_results(results, cached=cached)
             
         except Exception as e:
             click.echo(f"\nError: {e}")
 
+def _stream_results(client, index_name, query, options, page_size):
+    """
+    print every match of query a page at a time, asking before each further page
+    """
+    sortby, descending = _sort_option(options)
+    rows = iter_search_results(client, index_name, query, page_size=page_size, sortby=sortby, descending=descending)
+    shown = 0
+    try:
+        for page in iter_pages(rows, page_size):
+            for row in page:
+                display_result_row(row)
+            shown += len(page)
+            if len(page) < page_size or not click.confirm(f"\n{shown} shown. Next page?", default=True):
+                break
+    finally:
+        rows.close()  # frees the server-side cursor when paging stops early
+    click.echo(f"\n{shown} results shown")
+
+def _sort_option(options):
+    """
+    (field, descending) from a SORTBY option, (None, False) when absent
+    """
+    upper = [option.upper() for option in options]
+    if "SORTBY" not in upper:
+        return None, False
+    i = upper.index("SORTBY")
+    if i + 1 >= len(options):
+        return None, False
+    return options[i + 1], i + 2 < len(options) and upper[i + 2] == "DESC"
+
+# FT.SEARCH options that end the query part of a command
+_OPTION_KEYWORDS = {"RETURN", "SORTBY", "LIMIT", "PARAMS", "DIALECT", "NOCONTENT", "WITHSCORES", "INFIELDS", "INKEYS"}
+
+def _split_query(parts):
+    """
+    split tokens after the index name into (query string, option tokens)
+    """
+    for i, part in enumerate(parts):
+        if part.upper() in _OPTION_KEYWORDS:
+            return " ".join(parts[:i]) or "*", parts[i:]
+    return " ".join(parts) or "*", []
+
 if __name__ == "__main__":
     run_traditional_search()
\ No newline at end of file
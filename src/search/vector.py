@@ -1,168 +1,537 @@
 """
 vector search implementation for semantic movie search
 """
-import numpy as np
 import click
+from src.data.neighbor_keys import NEIGHBOR_HASHES_KEY, neighbor_key, vector_fingerprint
+from src.search.facets import run_faceted_search
+
+SIMILAR_RETURN_FIELDS = (b'title', b'plot', b'genre', b'release_year')
+DEFAULT_RANGE_LIMIT = 50  # result cap of a range search without k:N
 
 class VectorSearch:
     """
     handles vector-based semantic search operations
     """
-    def __init__(self, client, embeddings_model):
+    def __init__(self, client, embeddings_model, query_cache=None, result_cache=None, planner=None,
+                 vector_algorithm=None, vector_field_lookup=None):
         self.client = client
         self.embeddings_model = embeddings_model
+        self.query_cache = query_cache
+        self.result_cache = result_cache
+        self.planner = planner
+        self.last_cache_hit = False
+        self.last_plan = None
         self.index_name = "idx:movies_vector"
+        self.vector_algorithm = vector_algorithm  # FLAT indexes reject EF_RUNTIME
+        # returns the live index's {'type', 'algorithm'}, re-read when a vector query fails
+        self.vector_field_lookup = vector_field_lookup
     
-    def semantic_search(self, query_text, k=5):
+    def semantic_search(self, query_text, k=5, ef_runtime=None):
         """
         perform semantic search using vector similarity
         
         args:
             query_text: natural language query
             k: number of results
+            ef_runtime: HNSW candidate list size for this query, index default when None
         
         returns:
             list of (movie_key, score, movie_data) tuples
         """
         # generate embedding for query
-        query_embedding = self.embeddings_model.generate_embedding(query_text)
+        query_embedding = self._encode_query(query_text)
         if query_embedding is None:
             return []
         
-        # convert to bytes for redis
-        query_bytes = self.embeddings_model.embedding_to_bytes(query_embedding)
-        
-        # build KNN query
-        knn_query = f"*=>[KNN {k} @plot_embedding $query_vec AS score]"
+        def run():
+            # bytes and ef are rebuilt on a retry, the index type may have changed
+            query_bytes = self.embeddings_model.embedding_to_bytes(query_embedding)
+            return self._run_search(*semantic_search_command(
+                self.index_name, query_bytes, k, self._usable_ef(ef_runtime)
+            ))
         
         try:
             # execute vector search
-            results = self.client.execute_command(
-                "FT.SEARCH", self.index_name,
-                knn_query,
-                "PARAMS", "2", "query_vec", query_bytes,
-                "RETURN", "5", "title", "plot", "genre", "release_year", "score",
-                "SORTBY", "score",
-                "DIALECT", "2"
-            )
-            
-            return self._parse_search_results(results)
+            return self._parse_search_results(self._retry_on_type_change(run))
             
         except Exception as e:
             click.echo(f"Vector search error: {e}")
             return []
     
-    def hybrid_search(self, query_text, filters=None, k=5):
+    def hybrid_search(self, query_text, filters=None, k=5, ef_runtime=None):
         """
         combine vector search with traditional filters
         
+        with a planner the filter's candidate count picks the plan, which
+        is kept in last_plan: exact scoring of few candidates on the client
+        or a KNN query with a matching HYBRID_POLICY
+        
         args:
             query_text: natural language query
             filters: dict of filters (genre, year_min, etc)
             k: number of results
+            ef_runtime: HNSW candidate list size for this query, index default when None
         
         returns:
             list of (movie_key, score, movie_data) tuples
         """
         # generate embedding
-        query_embedding = self.embeddings_model.generate_embedding(query_text)
+        query_embedding = self._encode_query(query_text)
         if query_embedding is None:
             return []
         
-        query_bytes = self.embeddings_model.embedding_to_bytes(query_embedding)
+        try:
+            plan = self.last_plan = self.planner.plan(self.index_name, filters, k) if self.planner and filters else None
+            if plan and plan['strategy'] == 'empty':
+                self.last_cache_hit = False
+                return []
+            if plan and plan['strategy'] == 'exact':
+                self.last_cache_hit = False
+                results = self._exact_search(filters, query_embedding, k, plan['candidates'])
+                # stored vectors of another type never match the query, so no hits may mean a migration
+                if not results and self._refresh_vector_field():
+                    results = self._exact_search(filters, query_embedding, k, plan['candidates'])
+                return results
+            
+            def run():
+                query_bytes = self.embeddings_model.embedding_to_bytes(query_embedding)
+                return self._run_search(*hybrid_search_command(
+                    self.index_name, query_bytes, filters, k, self._usable_ef(ef_runtime),
+                    hybrid_policy=plan and plan.get('hybrid_policy'), batch_size=plan and plan.get('batch_size')
+                ))
+            
+            return self._parse_search_results(self._retry_on_type_change(run))
+            
+        except Exception as e:
+            click.echo(f"Hybrid search error: {e}")
+            return []
+    
+    def faceted_search(self, query_text, filters=None, k=5):
+        """
+        hybrid search plus facets of the filtered movies in one round trip
         
-        # build filter clause
-        filter_clause = self._build_filter_clause(filters)
+        the facets describe every movie passing filters (the whole index
+        without filters), not only the k nearest
         
-        # combine filters with KNN
-        if filter_clause:
-            query = f"({filter_clause})=>[KNN {k} @plot_embedding $query_vec AS score]"
-        else:
-            query = f"*=>[KNN {k} @plot_embedding $query_vec AS score]"
+        returns:
+            (list of (movie_key, score, movie_data) tuples, facets dict)
+        """
+        query_embedding = self._encode_query(query_text)
+        if query_embedding is None:
+            return [], None
         
-        try:
-            results = self.client.execute_command(
-                "FT.SEARCH", self.index_name,
-                query,
-                "PARAMS", "2", "query_vec", query_bytes,
-                "RETURN", "6", "title", "plot", "genre", "release_year", "rating", "score",
-                "SORTBY", "score",
-                "DIALECT", "2"
+        self.last_plan = None
+        self.last_cache_hit = False
+        
+        def run():
+            query_bytes = self.embeddings_model.embedding_to_bytes(query_embedding)
+            return run_faceted_search(
+                self.client, self.index_name, build_filter_clause(filters) or "*",
+                hybrid_search_command(self.index_name, query_bytes, filters, k)
             )
+        
+        try:
+            hits, facets = self._retry_on_type_change(run)
+            return self._parse_search_results(hits), facets
             
-            return self._parse_search_results(results)
+        except Exception as e:
+            click.echo(f"Faceted search error: {e}")
+            return [], None
+    
+    def range_search(self, query_text, radius, filters=None, limit=DEFAULT_RANGE_LIMIT):
+        """
+        every movie within a cosine distance of the query, closest first
+        
+        args:
+            query_text: natural language query
+            radius: maximum cosine distance (0 identical, 2 opposite)
+            filters: optional dict of filters (genre, year_min, etc)
+            limit: hard cap on the number of results
+        
+        returns:
+            list of (movie_key, score, movie_data) tuples
+        """
+        query_embedding = self._encode_query(query_text)
+        if query_embedding is None:
+            return []
+        
+        self.last_plan = None
+        
+        def run():
+            query_bytes = self.embeddings_model.embedding_to_bytes(query_embedding)
+            return self._run_search(*range_search_command(self.index_name, query_bytes, radius, filters, limit))
+        
+        try:
+            return self._parse_search_results(self._retry_on_type_change(run))
             
         except Exception as e:
-            click.echo(f"Hybrid search error: {e}")
+            click.echo(f"Range search error: {e}")
             return []
     
-    def find_similar_movies(self, movie_key, k=5):
+    def find_similar_movies(self, movie_keys, k=5):
         """
-        find movies similar to a given movie
+        find movies similar to one or more seed movies
+        
+        a single seed is answered from its precomputed neighbor set when
+        that is fresh. otherwise the stored plot_embedding of each seed is
+        used as the query vector, several seeds are searched with their
+        centroid. no model inference
         
         args:
-            movie_key: redis key of the movie
+            movie_keys: redis key of the movie, or a list of keys
             k: number of similar movies
         
         returns:
-            list of (movie_key, score, movie_data) tuples
+            list of (movie_key, score, movie_data) tuples, seeds excluded
         """
-        # get the movie's plot
-        movie_data = self.client.hgetall(movie_key)
-        plot = movie_data.get('plot', '')
+        seeds = [movie_keys] if isinstance(movie_keys, (str, bytes)) else list(movie_keys)
         
-        if not plot:
+        # a precomputed neighbor set answers single-seed lookups without a KNN query
+        if len(seeds) == 1:
+            stored = self._stored_neighbors(seeds[0], k)
+            if stored is not None:
+                self.last_cache_hit = False
+                return stored
+        
+        def run():
+            # fetch only the vectors, not the whole hashes
+            pipe = self.client.pipeline(transaction=False)
+            for key in seeds:
+                pipe.hget(key, 'plot_embedding')
+            query_bytes = seed_query_vector(self.embeddings_model, pipe.execute())
+            if query_bytes is None:
+                return None
+            # ask for room to drop the seeds, wherever they rank
+            return self._run_search(*semantic_search_command(self.index_name, query_bytes, k + len(seeds)))
+        
+        try:
+            results = self._retry_on_type_change(run)
+            if results is None:
+                return []
+            return exclude_keys(self._parse_search_results(results), seeds, k)
+            
+        except Exception as e:
+            click.echo(f"Similar movies error: {e}")
             return []
+
+    def _stored_neighbors(self, movie_key, k):
+        """
+        top k from the neighbor graph, None when the set is missing, too
+        short or was computed from an older vector of the movie or of any
+        of its neighbors
+        """
+        pipe = self.client.pipeline(transaction=False)
+        queue_neighbor_lookup(pipe, movie_key, k)
+        neighbors = fresh_neighbors(pipe.execute(), k)
+        if neighbors is None:
+            return None
         
-        # use the plot as query, skip the movie itself
-        return self.semantic_search(plot, k=k+1)[1:]
+        pipe = self.client.pipeline(transaction=False)
+        queue_neighbor_rows(pipe, neighbors)
+        return stored_neighbor_results(neighbors, pipe.execute())
+
+    def _exact_search(self, filters, query_embedding, k, candidates):
+        """
+        planner exact path with the query in the current vector type
+        """
+        query_bytes = self.embeddings_model.embedding_to_bytes(query_embedding)
+        return self.planner.exact_search(self.index_name, filters, query_bytes, self.embeddings_model, k, candidates)
+    
+    def _retry_on_type_change(self, run):
+        """
+        call run, and once more if it failed because migrate-vectors switched
+        the live index to another vector type or algorithm meanwhile
+        """
+        try:
+            return run()
+        except Exception:
+            if not self._refresh_vector_field():
+                raise
+        return run()
+    
+    def _refresh_vector_field(self):
+        """
+        re-read the live index's vector type and algorithm, True when they changed
+        """
+        if self.vector_field_lookup is None:
+            return False
+        try:
+            field = self.vector_field_lookup()
+        except Exception:
+            return False
+        if not field:
+            return False
+        algorithm = field.get('algorithm') or self.vector_algorithm
+        if field['type'] == self.embeddings_model.vector_type and algorithm == self.vector_algorithm:
+            return False
+        self.embeddings_model.vector_type = field['type']
+        self.vector_algorithm = algorithm
+        return True
+    
+    def _usable_ef(self, ef_runtime):
+        """
+        ef_runtime, or None with a notice when the index is FLAT and has no EF_RUNTIME
+        """
+        return usable_ef_runtime(ef_runtime, self.vector_algorithm)
+    
+    def _run_search(self, *args):
+        """
+        execute a search command, through the result cache when one is configured
+        """
+        if self.result_cache is None:
+            self.last_cache_hit = False
+            return self.client.execute_command(*args)
+        results, self.last_cache_hit = self.result_cache.execute(*args)
+        return results
+
+    def _encode_query(self, query_text):
+        """
+        embed query text, going through the query cache when one is configured
+        """
+        if self.query_cache is None:
+            return self.embeddings_model.generate_embedding(query_text)
+        return self.query_cache.get_or_encode(
+            self.embeddings_model.model_name, query_text,
+            self.embeddings_model.generate_embedding
+        )
 
     def _parse_search_results(self, results):
         """
         parse redis search results into structured format
         """
-        total = results[0]
-        movies = []
-        
-        for i in range(1, len(results), 2):
-            if i + 1 < len(results):
-                movie_key = results[i]
-                fields = results[i + 1]
-                
-                # convert fields list to dict
-                movie_data = {}
-                for j in range(0, len(fields), 2):
-                    if j + 1 < len(fields):
-                        field_name = fields[j]
-                        field_value = fields[j + 1]
-                        movie_data[field_name] = field_value
-                
-                # extract score from the data
-                score_value = movie_data.get(b'score', b'0')
-                if isinstance(score_value, bytes):
-                    score_value = float(score_value.decode('utf-8'))
-                else:
-                    score_value = float(score_value)
-                
-                movies.append((movie_key, score_value, movie_data))
-        
-        return movies
+        return parse_search_results(results)
     
     def _build_filter_clause(self, filters):
         """
         build redis filter clause from filter dict
         """
-        if not filters:
-            return ""
-        
-        filter_parts = []
-        if 'genre' in filters:
-            filter_parts.append(f"@genre:{{{filters['genre']}}}")
-        if 'year_min' in filters:
-            filter_parts.append(f"@release_year:[{filters['year_min']} +inf]")
-        if 'year_max' in filters:
-            filter_parts.append(f"@release_year:[-inf {filters['year_max']}]")
-        if 'rating_min' in filters:
-            filter_parts.append(f"@rating:[{filters['rating_min']} +inf]")
-        
-        return " ".join(filter_parts)
\ No newline at end of file
+        return build_filter_clause(filters)
+
+
+def semantic_search_command(index_name, query_bytes, k, ef_runtime=None):
+    """
+    FT.SEARCH arguments for a pure KNN query
+    
+    ef_runtime overrides the index's HNSW EF_RUNTIME for this query only
+    """
+    return (
+        "FT.SEARCH", index_name,
+        f"*=>[KNN {k} @plot_embedding $query_vec{_ef_clause(ef_runtime)} AS score]",
+        "PARAMS", "2", "query_vec", query_bytes,
+        "RETURN", "5", "title", "plot", "genre", "release_year", "score",
+        "SORTBY", "score",
+        "LIMIT", "0", str(k),
+        "DIALECT", "2"
+    )
+
+
+def hybrid_search_command(index_name, query_bytes, filters, k, ef_runtime=None, hybrid_policy=None, batch_size=None):
+    """
+    FT.SEARCH arguments for a KNN query pre-filtered by traditional fields
+    
+    hybrid_policy (ADHOC_BF or BATCHES) and batch_size override how redis
+    combines the filter with the vector index, when set
+    """
+    filter_clause = build_filter_clause(filters)
+    attributes = _ef_clause(ef_runtime)
+    if filter_clause and hybrid_policy:
+        attributes += f" HYBRID_POLICY {hybrid_policy}"
+        if batch_size and hybrid_policy == "BATCHES":
+            attributes += f" BATCH_SIZE {int(batch_size)}"
+    knn = f"[KNN {k} @plot_embedding $query_vec{attributes} AS score]"
+    
+    # combine filters with KNN
+    if filter_clause:
+        query = f"({filter_clause})=>{knn}"
+    else:
+        query = f"*=>{knn}"
+    
+    return (
+        "FT.SEARCH", index_name,
+        query,
+        "PARAMS", "2", "query_vec", query_bytes,
+        "RETURN", "6", "title", "plot", "genre", "release_year", "rating", "score",
+        "SORTBY", "score",
+        "LIMIT", "0", str(k),
+        "DIALECT", "2"
+    )
+
+
+def range_search_command(index_name, query_bytes, radius, filters=None, limit=DEFAULT_RANGE_LIMIT):
+    """
+    FT.SEARCH arguments for a VECTOR_RANGE query, optionally intersected with filters
+    
+    only documents within radius come back, sorted by distance and capped at limit
+    """
+    filter_clause = build_filter_clause(filters)
+    vector_range = "@plot_embedding:[VECTOR_RANGE $radius $query_vec]=>{$YIELD_DISTANCE_AS: score}"
+    query = f"({filter_clause}) {vector_range}" if filter_clause else vector_range
+    
+    return (
+        "FT.SEARCH", index_name,
+        query,
+        "PARAMS", "4", "query_vec", query_bytes, "radius", repr(float(radius)),
+        "RETURN", "6", "title", "plot", "genre", "release_year", "rating", "score",
+        "SORTBY", "score",
+        "LIMIT", "0", str(limit),
+        "DIALECT", "2"
+    )
+
+
+def supports_ef_runtime(algorithm):
+    """
+    whether KNN queries on an index of this algorithm accept EF_RUNTIME, unknown counts as yes
+    """
+    return (algorithm or 'HNSW').upper() != 'FLAT'
+
+
+def usable_ef_runtime(ef_runtime, algorithm):
+    """
+    ef_runtime, or None with a notice when algorithm has no EF_RUNTIME
+    """
+    if ef_runtime is not None and not supports_ef_runtime(algorithm):
+        click.echo(f"ef:{ef_runtime} ignored - the vector index is {algorithm}, not HNSW")
+        return None
+    return ef_runtime
+
+
+def _ef_clause(ef_runtime):
+    """
+    KNN attribute setting EF_RUNTIME, empty for the index default
+    """
+    return f" EF_RUNTIME {int(ef_runtime)}" if ef_runtime is not None else ""
+
+
+def parse_search_results(results):
+    """
+    parse redis search results into structured format
+    """
+    total = results[0]
+    movies = []
+    
+    for i in range(1, len(results), 2):
+        if i + 1 < len(results):
+            movie_key = results[i]
+            fields = results[i + 1]
+            
+            # convert fields list to dict
+            movie_data = {}
+            for j in range(0, len(fields), 2):
+                if j + 1 < len(fields):
+                    field_name = fields[j]
+                    field_value = fields[j + 1]
+                    movie_data[field_name] = field_value
+            
+            # extract score from the data
+            score_value = movie_data.get(b'score', b'0')
+            if isinstance(score_value, bytes):
+                score_value = float(score_value.decode('utf-8'))
+            else:
+                score_value = float(score_value)
+            
+            movies.append((movie_key, score_value, movie_data))
+    
+    return movies
+
+
+def seed_query_vector(embeddings_model, blobs):
+    """
+    query vector for a list of stored seed embeddings, None when none are set
+    
+    a single seed is passed through as is, several are averaged
+    """
+    blobs = [blob for blob in blobs if blob]
+    if not blobs:
+        return None
+    if len(blobs) == 1:
+        return blobs[0]
+    return embeddings_model.embedding_to_bytes(
+        embeddings_model.mean_embedding(embeddings_model.bytes_to_embeddings(blobs))
+    )
+
+
+def queue_neighbor_lookup(pipe, movie_key, k):
+    """
+    queue the reads for a seed's stored neighbor set: its vector
+    fingerprint inputs, the fingerprint of the graph and its top k
+    """
+    pipe.hmget(movie_key, 'embedding_model', 'plot_hash')
+    pipe.hget(NEIGHBOR_HASHES_KEY, movie_key)
+    pipe.zrange(neighbor_key(movie_key), 0, k - 1, withscores=True)
+
+
+def fresh_neighbors(replies, k):
+    """
+    the (neighbor, score) pairs from queue_neighbor_lookup replies, None
+    when the set is too short or the seed's vector changed since
+    """
+    (model_name, plot_hash), stored_fingerprint, neighbors = replies
+    if len(neighbors) < k or plot_hash is None or stored_fingerprint is None:
+        return None
+    if _key_text(stored_fingerprint) != vector_fingerprint(model_name or '', plot_hash):
+        return None
+    return neighbors
+
+
+def queue_neighbor_rows(pipe, neighbors):
+    """
+    queue the reads checking each neighbor's vector and fetching its fields
+    """
+    pipe.hmget(NEIGHBOR_HASHES_KEY, *[neighbor for neighbor, _ in neighbors])
+    for neighbor, _ in neighbors:
+        pipe.hmget(neighbor, 'embedding_model', 'plot_hash', *SIMILAR_RETURN_FIELDS)
+
+
+def stored_neighbor_results(neighbors, replies):
+    """
+    neighbors as (movie_key, score, movie_data) tuples from queue_neighbor_rows
+    replies, None when any neighbor's vector is not the one the graph was built from
+    """
+    neighbor_fingerprints, *rows = replies
+    for fingerprint, (model_name, plot_hash, *_) in zip(neighbor_fingerprints, rows):
+        if fingerprint is None or plot_hash is None:
+            return None
+        if _key_text(fingerprint) != vector_fingerprint(model_name or '', plot_hash):
+            return None
+    
+    results = []
+    for (neighbor, score), (_, _, *values) in zip(neighbors, rows):
+        movie_data = {field: value for field, value in zip(SIMILAR_RETURN_FIELDS, values) if value is not None}
+        movie_data[b'score'] = repr(score).encode('utf-8')
+        results.append((neighbor, score, movie_data))
+    return results
+
+
+def exclude_keys(results, keys, k):
+    """
+    drop results whose key is one of keys and keep the first k
+    """
+    excluded = {_key_text(key) for key in keys}
+    return [result for result in results if _key_text(result[0]) not in excluded][:k]
+
+
+def _key_text(key):
+    """
+    compare keys from binary and text clients alike
+    """
+    return key.decode('utf-8') if isinstance(key, bytes) else key
+
+
+def build_filter_clause(filters):
+    """
+    build redis filter clause from filter dict
+    """
+    if not filters:
+        return ""
+    
+    filter_parts = []
+    if 'genre' in filters:
+        filter_parts.append(f"@genre:{{{filters['genre']}}}")
+    if 'year_min' in filters:
+        filter_parts.append(f"@release_year:[{filters['year_min']} +inf]")
+    if 'year_max' in filters:
+        filter_parts.append(f"@release_year:[-inf {filters['year_max']}]")
+    if 'rating_min' in filters:
+        filter_parts.append(f"@rating:[{filters['rating_min']} +inf]")
+    
+    return " ".join(filter_parts)
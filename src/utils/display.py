@@ -4,7 +4,7 @@ display formatting for search results
 import click
 
 
-def display_traditional_results(results):
+def display_traditional_results(results, cached=False):
     """
     display results from traditional redis search
     
@@ -13,7 +13,7 @@ def display_traditional_results(results):
     - each result with key and fields
     """
     total_results = results[0]
-    click.echo(f"\nFound {total_results} results")
+    click.echo(f"\nFound {total_results} results{_cache_label(cached)}")
     
     if total_results > 0:
         # process results
@@ -39,14 +39,58 @@ def display_traditional_results(results):
                             click.echo(f"{field_name}: {field_value}")
 
 
-def display_semantic_results(results, query):
+def display_result_row(row):
+    """
+    display one row from a streaming search, as printed by display_traditional_results
+    """
+    click.echo(f"\n{'=' * 60}")
+    click.echo(f"Key: {row.get('key')}")
+    click.echo(f"{'=' * 60}")
+
+    for field_name, field_value in row.items():
+        if field_name == 'key':
+            continue
+        if len(str(field_value)) > 100:
+            click.echo(f"{field_name}: {str(field_value)[:100]}...")
+        else:
+            click.echo(f"{field_name}: {field_value}")
+
+
+def display_facets(facets):
+    """
+    display genre counts, decade buckets and rating statistics
+    """
+    if not facets:
+        return
+    
+    click.echo(f"\nFACETS ({facets['total']} matching movies)")
+    click.echo("-" * 40)
+    
+    click.echo("Genres:")
+    for row in facets['genres']:
+        click.echo(f"  {row['genre']:<20} {row['count']:>6}")
+    
+    click.echo("Decades:")
+    for row in facets['decades']:
+        click.echo(f"  {str(row['decade']) + 's':<20} {row['count']:>6}")
+    
+    rating = facets['rating']
+    if rating['avg'] is not None:
+        click.echo(f"Rating: avg {rating['avg']:.2f}, min {rating['min']:.1f}, max {rating['max']:.1f}")
+
+
+def display_semantic_results(results, query, cached=False, plan=None, radius=None):
     """
     display results from semantic vector search
     
-    includes similarity scores and distance metrics
+    includes similarity scores and distance metrics, the hybrid plan when
+    one was chosen and the radius of range searches
     """
     click.echo(f"\nSemantic search for: '{query}'")
-    click.echo(f"Found {len(results)} results")
+    if plan:
+        click.echo(f"Plan: {_plan_label(plan)}")
+    within = f" within distance {radius:g}" if radius is not None else ""
+    click.echo(f"Found {len(results)} results{within}{_cache_label(cached)}")
     
     for key, score, data in results:
         # decode key if it's bytes
@@ -77,6 +121,21 @@ def display_semantic_results(results, query):
 
 
 
+def _plan_label(plan):
+    """
+    one-line summary of a hybrid search plan
+    """
+    counts = f"{plan['candidates']} of {plan['total']} movies match the filters"
+    if plan['strategy'] == 'empty':
+        return f"no search ({counts})"
+    if plan['strategy'] == 'exact':
+        return f"exact client-side scoring ({counts})"
+    policy = f"KNN HYBRID_POLICY {plan['hybrid_policy']}"
+    if 'batch_size' in plan:
+        policy += f" BATCH_SIZE {plan['batch_size']}"
+    return f"{policy} ({counts})"
+
+
 def show_semantic_help(default_k=5):
     """
     display help for semantic-only interface
@@ -94,12 +153,59 @@ def show_semantic_help(default_k=5):
     
     click.echo("\nSIMILAR MOVIES:")
     click.echo("  similar to movie:1")
+    click.echo("  similar to movie:1, movie:2  (centroid of several movies)")
     
     click.echo("\nRESULT COUNT:")
     click.echo(f"  k:10 <query>  (default: {default_k})")
     
+    click.echo("\nFACETS (genre, decade and rating breakdown of the filtered movies):")
+    click.echo("  facets superhero movie | year>2000")
+    
+    click.echo("\nDISTANCE THRESHOLD:")
+    click.echo("  within:0.4 <query>  (only results within cosine distance 0.4, k:N caps the count)")
+    
+    click.echo("\nRECALL VS SPEED (HNSW profiles):")
+    click.echo("  ef:100 <query>  (larger candidate list, higher recall)")
+    
     click.echo("\nFILTERS:")
     click.echo("  genre:Action, year>2010, rating>7.5")
     
     click.echo("\nCOMMANDS:")
-    click.echo("  help, quit")
\ No newline at end of file
+    click.echo("  help, stats, quit")
+
+
+def display_query_cache_stats(query_cache):
+    """
+    display query embedding cache hit rate and saved encode time
+    """
+    if query_cache is None:
+        click.echo("\nQuery cache disabled (QUERY_CACHE_SIZE=0)")
+        return
+    
+    stats = query_cache.stats()
+    click.echo("\nQUERY CACHE")
+    click.echo("-" * 40)
+    click.echo(f"Hits: {stats['hits']}  Misses: {stats['misses']}  Hit rate: {stats['hit_rate']:.1%}")
+    click.echo(f"Encode time saved: {stats['saved_seconds'] * 1000:.1f} ms")
+    click.echo(f"Entries: {stats['size']}/{stats['max_size']}")
+
+
+def display_result_cache_stats(result_cache):
+    """
+    display search result cache hits, reported apart from the query cache
+    """
+    if result_cache is None:
+        click.echo("\nResult cache disabled (RESULT_CACHE_TTL=0)")
+        return
+    
+    stats = result_cache.stats()
+    click.echo("\nRESULT CACHE")
+    click.echo("-" * 40)
+    click.echo(f"Hits: {stats['hits']}  Misses: {stats['misses']}  Hit rate: {stats['hit_rate']:.1%}")
+
+
+def _cache_label(cached):
+    """
+    suffix marking results served from the result cache
+    """
+    return " (served from result cache)" if cached else ""
\ No newline at end of file
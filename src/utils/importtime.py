@@ -0,0 +1,44 @@
+"""
+import-time report so cli startup regressions are visible
+"""
+import subprocess
+import sys
+from pathlib import Path
+
+# modules that should only load inside commands that need them
+HEAVY_MODULES = ('torch', 'sentence_transformers', 'transformers', 'numpy', 'scipy', 'sklearn')
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
+
+def import_time_report(module='src.main', top=15):
+    """
+    import a module in a fresh interpreter under -X importtime
+
+    returns total import time, the slowest imports by cumulative time and
+    any heavy modules that got pulled in
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=PROJECT_ROOT, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "import failed")
+
+    entries = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|', 2)
+        entries.append((name.strip(), int(self_us), int(cumulative_us)))
+
+    heavy = sorted({name.split('.')[0] for name, _, _ in entries} & set(HEAVY_MODULES))
+    slowest = sorted(entries, key=lambda entry: entry[2], reverse=True)[:top]
+    return {
+        'module': module,
+        'total_ms': sum(self_us for _, self_us, _ in entries) / 1000,
+        'modules_imported': len(entries),
+        'slowest': [{'module': name, 'self_ms': self_us / 1000, 'cumulative_ms': cumulative_us / 1000}
+                    for name, self_us, cumulative_us in slowest],
+        'heavy_modules': heavy,
+    }
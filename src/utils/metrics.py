@@ -0,0 +1,40 @@
+"""
+latency, throughput and memory summaries for batch, benchmark and offline runs
+"""
+import sys
+
+
+def latency_summary(latencies, elapsed, percentiles=(50, 95, 99)):
+    """
+    summarize latencies (seconds) and wall time into a json-friendly dict
+
+    returns count, throughput per second and pXX latencies in milliseconds
+    """
+    import numpy as np
+
+    summary = {
+        'count': len(latencies),
+        'elapsed_seconds': round(elapsed, 4),
+        'throughput_per_second': round(len(latencies) / elapsed, 2) if elapsed > 0 else 0.0,
+    }
+    if latencies:
+        values = np.percentile(np.asarray(latencies, dtype=np.float64) * 1000, percentiles)
+        for point, value in zip(percentiles, values):
+            summary[f'p{point}_ms'] = round(float(value), 3)
+        summary['mean_ms'] = round(float(np.mean(latencies)) * 1000, 3)
+    return summary
+
+
+def peak_rss_mb():
+    """
+    peak resident set size of this process so far, None where the
+    unix-only resource module is missing
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # linux reports kilobytes, macos bytes
+    divisor = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    return round(peak / divisor, 1)
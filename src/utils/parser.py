@@ -102,6 +102,38 @@ def extract_k_parameter(query):
     return query, None
 
 
+def extract_ef_parameter(query):
+    """
+    extract the per-query HNSW EF_RUNTIME and return clean query + ef value
+    
+    examples:
+    - "ef:100 space movie" -> ("space movie", 100)
+    - "space movie" -> ("space movie", None)
+    """
+    ef_match = re.search(r'\bef:(\d+)\b', query)
+    if ef_match:
+        ef_value = int(ef_match.group(1))
+        clean_query = re.sub(r'\bef:\d+\b', '', query).strip()
+        return clean_query, ef_value
+    return query, None
+
+
+def extract_within_parameter(query):
+    """
+    extract a vector range radius from query and return clean query + radius
+    
+    examples:
+    - "within:0.4 space adventure" -> ("space adventure", 0.4)
+    - "space adventure" -> ("space adventure", None)
+    """
+    within_match = re.search(r'\bwithin:(\d+(?:\.\d+)?|\.\d+)', query)
+    if within_match:
+        radius = float(within_match.group(1))
+        clean_query = (query[:within_match.start()] + query[within_match.end():]).strip()
+        return clean_query, radius
+    return query, None
+
+
 def format_search_command(parts, index_name):
     """
     format search command parts with proper index and return clause
@@ -114,4 +146,80 @@ def format_search_command(parts, index_name):
     if "RETURN" not in [p.upper() for p in parts]:
         parts.extend(["RETURN", "5", "title", "plot", "genre", "release_year", "rating"])
     
-    return parts
\ No newline at end of file
+    return parts
+
+
+_ESCAPES = {ord('n'): b'\n', ord('r'): b'\r', ord('t'): b'\t', ord('b'): b'\b', ord('a'): b'\a'}
+_WHITESPACE = b' \t\r\n\x00'
+
+
+def split_redis_args(line):
+    """
+    split one line of a redis-cli command file into its arguments
+
+    follows redis-cli quoting rules:
+    - double quotes with \\", \\n, \\t and \\xHH escapes
+    - single quotes with \\' escapes
+    - a closing quote must be followed by whitespace or end of line
+
+    takes and returns bytes so values reach redis untouched,
+    raises ValueError on unbalanced quotes
+    """
+    args = []
+    i = 0
+    length = len(line)
+    
+    while True:
+        # skip blanks between arguments
+        while i < length and line[i] in _WHITESPACE:
+            i += 1
+        if i >= length:
+            return args
+        
+        token = bytearray()
+        quote = line[i] if line[i] in b'"\'' else None
+        if quote is not None:
+            i += 1
+        
+        while True:
+            if i >= length:
+                if quote is not None:
+                    raise ValueError("unbalanced quotes")
+                break
+            char = line[i]
+            
+            if quote is None:
+                if char in _WHITESPACE:
+                    break
+                token.append(char)
+            elif char == quote:
+                # closing quote must end the argument
+                if i + 1 < length and line[i + 1] not in _WHITESPACE:
+                    raise ValueError("closing quote must be followed by a space")
+                i += 1
+                break
+            elif char == ord('\\') and i + 1 < length:
+                nxt = line[i + 1]
+                if quote == ord('"') and nxt == ord('x') and _is_hex(line[i + 2:i + 4]):
+                    token.append(int(line[i + 2:i + 4], 16))
+                    i += 3
+                elif quote == ord('"'):
+                    token.extend(_ESCAPES.get(nxt, bytes([nxt])))
+                    i += 1
+                elif nxt == quote:
+                    token.append(nxt)
+                    i += 1
+                else:
+                    token.append(char)
+            else:
+                token.append(char)
+            i += 1
+        
+        args.append(bytes(token))
+
+
+def _is_hex(chars):
+    """
+    check for a two digit hex escape
+    """
+    return len(chars) == 2 and all(c in b'0123456789abcdefABCDEF' for c in chars)